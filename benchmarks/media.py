@@ -0,0 +1,106 @@
+"""Generation of the tiny test video the stand-ins hand out as the "download"."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+STANDIN_BIN = Path(__file__).resolve().parent / "standins" / "bin"
+
+
+def real_ffmpeg() -> str | None:
+    """Return the path of a real ``ffmpeg`` on ``PATH``, ignoring the stand-in."""
+
+    search = os.pathsep.join(
+        entry
+        for entry in os.environ.get("PATH", "").split(os.pathsep)
+        if entry and Path(entry).resolve() != STANDIN_BIN
+    )
+    return shutil.which("ffmpeg", path=search)
+
+
+def make_test_video(path: Path, *, seconds: float = 10.0) -> Path:
+    """Write a small H.264/AAC MP4 with a 2 s GOP to ``path`` and return it.
+
+    A real ``ffmpeg`` is used when one is installed. Otherwise a placeholder
+    file is written; it is only ever read by the ``ffmpeg`` stand-in.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ffmpeg = real_ffmpeg()
+    if ffmpeg is None:
+        path.write_bytes(b"\0" * 64 * 1024)
+        return path
+
+    subprocess.run(
+        [
+            ffmpeg,
+            "-y",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size=320x180:rate=25:duration={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            "50",
+            "-c:a",
+            "aac",
+            "-shortest",
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+def make_standin_video(
+    path: Path,
+    *,
+    seconds: float = 10.0,
+    rate: int = 25,
+    gop: float = 2.0,
+    offset: float = 0.0,
+    stream: dict | None = None,
+) -> Path:
+    """Write a video only the stand-ins understand: its stream header and frame list as JSON.
+
+    Frames are ``1 / rate`` apart starting at ``offset`` seconds, with a
+    keyframe every ``gop`` seconds. ``stream`` overrides the ffprobe stream
+    entries, which default to a 320x180 H.264 Main profile stream.
+    """
+
+    interval = round(gop * rate)
+    frames = [[round(offset + index / rate, 6), index % interval == 0] for index in range(round(seconds * rate))]
+    video = {
+        "stream": {
+            "codec_name": "h264",
+            "profile": "Main",
+            "level": 30,
+            "pix_fmt": "yuv420p",
+            "width": 320,
+            "height": 180,
+            "time_base": "1/15360",
+            **(stream or {}),
+        },
+        "frame_duration": 1 / rate,
+        "frames": frames,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(video), encoding="utf-8")
+    return path
+
+
+__all__ = ["STANDIN_BIN", "make_standin_video", "make_test_video", "real_ffmpeg"]
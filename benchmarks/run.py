@@ -0,0 +1,392 @@
+"""Offline benchmarks for the scoring, render and end-to-end pipeline paths.
+
+Nothing here touches the network: ``yt_dlp`` and ``youtube_transcript_api``
+are replaced by the stand-ins under ``benchmarks/standins`` and ``ffmpeg`` /
+``ffprobe`` by the scripts in ``benchmarks/standins/bin`` (pass
+``--real-ffmpeg`` to render the generated test video with a real ffmpeg).
+
+Run from the repository root::
+
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --quick --compare bench.json
+
+Every result records wall time per stage, throughput and the peak Python heap
+(``tracemalloc``) of a separate, untimed pass.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+ROOT = Path(__file__).resolve().parent.parent
+STANDINS = Path(__file__).resolve().parent / "standins"
+
+T = TypeVar("T")
+
+SUITES = ("scoring", "render", "audio", "transcripts", "pipeline")
+DEFAULT_MINUTES = (5.0, 60.0, 240.0, 660.0)
+DEFAULT_DENSITIES = (6.0, 15.0, 30.0)
+QUICK_MINUTES = (5.0, 60.0)
+QUICK_DENSITIES = (15.0,)
+
+
+def _install_standins(workspace: Path, source: Path) -> None:
+    """Route downloads, transcripts and caches into ``workspace`` via the stand-ins."""
+
+    sys.path.insert(0, str(STANDINS))
+    os.environ["VIRALCUT_BENCH_SOURCE"] = str(source)
+    os.environ["VIRALCUT_TRANSCRIPT_CACHE_DIR"] = str(workspace / "cache" / "transcripts")
+    os.environ["VIRALCUT_DOWNLOAD_STORE_DIR"] = str(workspace / "cache" / "downloads")
+    os.environ["VIRALCUT_LOCK_DIR"] = str(workspace / "locks")
+
+
+def _use_ffmpeg(real: bool) -> None:
+    from .media import STANDIN_BIN
+
+    entries = [entry for entry in os.environ.get("PATH", "").split(os.pathsep) if entry != str(STANDIN_BIN)]
+    if not real:
+        entries.insert(0, str(STANDIN_BIN))
+    os.environ["PATH"] = os.pathsep.join(entries)
+
+
+def _timed(function: Callable[[], T], repeat: int) -> tuple[float, T]:
+    """Return the best wall time of ``repeat`` calls and the last result."""
+
+    best = float("inf")
+    result: Any = None
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _peak_memory(function: Callable[[], object]) -> int:
+    """Return the peak Python heap allocated while ``function`` runs."""
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench_scoring(minutes: float, density: float, *, repeat: int) -> dict[str, Any]:
+    from viralcut.pipeline import (
+        _build_candidates,
+        _ClipScoringConfig,
+        _iter_candidates,
+        _materialize_text,
+        _select_top_clips,
+        _top_candidates,
+    )
+    from viralcut.transcript_table import TranscriptTable
+
+    from .synthetic import synthetic_transcript
+
+    segments = synthetic_transcript(minutes, density, seed=int(minutes * density))
+    table = TranscriptTable.from_segments(segments)
+    config = _ClipScoringConfig(clip_length=60.0, step=5.0, max_clips=3)
+
+    stages: dict[str, float] = {}
+    stages["candidates"], candidates = _timed(lambda: _build_candidates(segments, config), repeat)
+    stages["candidates_table"], _ = _timed(lambda: _build_candidates(table, config), repeat)
+    stages["selection"], selected = _timed(lambda: _select_top_clips(candidates, config.max_clips), repeat)
+    stages["materialize"], _ = _timed(lambda: _materialize_text(segments, selected), repeat)
+    # Scoring a prebuilt table is reported alongside, not as part of the list-based pass.
+    total = sum(seconds for stage, seconds in stages.items() if stage != "candidates_table")
+
+    def full_pass() -> None:
+        pool, _ = _top_candidates(_iter_candidates(table, config), config.pool_size)
+        chosen = _select_top_clips(pool, config.max_clips)
+        _materialize_text(table, chosen)
+
+    return {
+        "suite": "scoring",
+        "name": f"scoring-{minutes:g}m-{density:g}spm",
+        "params": {"minutes": minutes, "segments_per_minute": density, "segments": len(segments)},
+        "seconds": total,
+        "stages": stages,
+        "throughput": {
+            "segments_per_second": len(segments) / total if total else None,
+            "windows_per_second": len(candidates) / stages["candidates"] if stages["candidates"] else None,
+        },
+        "peak_memory_bytes": _peak_memory(full_pass),
+    }
+
+
+def bench_render(
+    source: Path,
+    workspace: Path,
+    clips: int,
+    mode: str,
+    *,
+    repeat: int,
+    profile: str = "copy",
+) -> dict[str, Any]:
+    from viralcut.clipping import render_clips
+    from viralcut.models import ClipCandidate
+
+    clip_length = 2.0
+    caption = "this is the moment NOBODY saw coming! would you do it?"
+    candidates = [
+        ClipCandidate(
+            start=float(index % 4) * clip_length,
+            end=float(index % 4 + 1) * clip_length,
+            text=caption,
+            score=1.0,
+        )
+        for index in range(clips)
+    ]
+    # Encoding profiles ignore the render mode, so they are named after the profile instead.
+    variant = mode if profile == "copy" else profile
+    output_dir = workspace / "render" / f"{variant}-{clips}"
+
+    def run() -> None:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        render_clips(source, candidates, output_dir, mode=mode, profile=profile)
+
+    seconds, _ = _timed(run, repeat)
+    return {
+        "suite": "render",
+        "name": f"render-{variant}-{clips}",
+        "params": {"clips": clips, "mode": mode, "profile": profile, "clip_seconds": clip_length},
+        "seconds": seconds,
+        "stages": {"render": seconds},
+        "throughput": {"clips_per_second": clips / seconds if seconds else None},
+        "peak_memory_bytes": _peak_memory(run),
+    }
+
+
+def bench_audio(source: Path, minutes: float, *, repeat: int) -> dict[str, Any]:
+    from viralcut.audio import read_envelope
+
+    os.environ["VIRALCUT_BENCH_DURATION"] = str(minutes * 60)
+    clip_length, step = 60.0, 5.0
+    starts = [index * step for index in range(max(int((minutes * 60 - clip_length) / step) + 1, 1))]
+    ends = [start + clip_length for start in starts]
+
+    def run() -> None:
+        read_envelope(source).window_scores(starts, ends)
+
+    stages: dict[str, float] = {}
+    stages["decode"], envelope = _timed(lambda: read_envelope(source), repeat)
+    stages["windows"], _ = _timed(lambda: envelope.window_scores(starts, ends), repeat)
+    total = sum(stages.values())
+    return {
+        "suite": "audio",
+        "name": f"audio-{minutes:g}m",
+        "params": {"minutes": minutes, "windows": len(starts)},
+        "seconds": total,
+        "stages": stages,
+        "throughput": {"audio_seconds_per_second": minutes * 60 / total if total else None},
+        "peak_memory_bytes": _peak_memory(run),
+    }
+
+
+def bench_transcripts(videos: int, variant: str) -> dict[str, Any]:
+    """Fetch ``videos`` transcripts from a local :class:`TranscriptServer`, one by one or batched."""
+
+    from viralcut.transcript import fetch_transcript, fetch_transcripts
+
+    from .transcript_server import TranscriptServer
+
+    video_ids = [f"synthetic-5m-15spm-{index}" for index in range(videos)]
+    with TranscriptServer(throttle_every=16 if variant == "batched-throttled" else 0) as server:
+        os.environ["VIRALCUT_BENCH_TRANSCRIPT_URL"] = server.url
+        try:
+            started = time.perf_counter()
+            if variant == "sequential":
+                fetched = [fetch_transcript(video_id, use_cache=False) for video_id in video_ids]
+            else:
+                fetched = [segments for _, segments in fetch_transcripts(video_ids, use_cache=False)]
+            seconds = time.perf_counter() - started
+        finally:
+            del os.environ["VIRALCUT_BENCH_TRANSCRIPT_URL"]
+
+    failed = sum(1 for segments in fetched if not isinstance(segments, list))
+    return {
+        "suite": "transcripts",
+        "name": f"transcripts-{variant}-{videos}",
+        "params": {
+            "videos": videos,
+            "variant": variant,
+            "latency": server.latency,
+            "connections": server.connections,
+            "throttled": server.throttled,
+            "failed": failed,
+        },
+        "seconds": seconds,
+        "stages": {"fetch": seconds},
+        "throughput": {"videos_per_second": videos / seconds if seconds else None},
+        "peak_memory_bytes": None,
+    }
+
+
+def bench_pipeline(workspace: Path, minutes: float, density: float, *, sections_only: bool) -> list[dict[str, Any]]:
+    from viralcut.pipeline import process_video_to_clips
+
+    os.environ["VIRALCUT_BENCH_DURATION"] = str(minutes * 60)
+    video_id = f"synthetic-{minutes:g}m-{density:g}spm"
+    variant = "sections" if sections_only else "full"
+    results = []
+    for phase in ("cold", "warm"):
+        working_dir = workspace / "pipeline" / f"{video_id}-{variant}-{phase}"
+
+        def run() -> Any:
+            shutil.rmtree(working_dir, ignore_errors=True)
+            return process_video_to_clips(
+                f"https://www.youtube.com/watch?v={video_id}",
+                sections_only=sections_only,
+                working_dir=working_dir,
+            )
+
+        started = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - started
+        results.append(
+            {
+                "suite": "pipeline",
+                "name": f"pipeline-{variant}-{phase}-{minutes:g}m-{density:g}spm",
+                "params": {"minutes": minutes, "segments_per_minute": density, "variant": variant, "phase": phase},
+                "seconds": seconds,
+                "stages": dict(result.stage_seconds),
+                "throughput": {"clips_per_second": len(result.clips) / seconds if seconds else None},
+                # The warm pass is served from the caches, so measure it as such.
+                "peak_memory_bytes": _peak_memory(run) if phase == "warm" else None,
+            }
+        )
+    return results
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _print_results(results: list[dict[str, Any]], baseline: dict[str, dict[str, Any]]) -> None:
+    for result in results:
+        stages = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in result["stages"].items())
+        peak = result["peak_memory_bytes"]
+        memory = f" peak={peak / 1024 / 1024:.1f}MiB" if peak is not None else ""
+        line = f"{result['name']:<44} {result['seconds'] * 1000:>10.1f}ms{memory}  {stages}"
+        previous = baseline.get(result["name"])
+        if previous and previous.get("seconds"):
+            line += f"  ({result['seconds'] / previous['seconds']:.2f}x baseline)"
+        print(line)
+
+
+def _float_list(value: str) -> tuple[float, ...]:
+    return tuple(float(item) for item in value.split(",") if item)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suite to run (repeatable; default all)")
+    parser.add_argument("--minutes", type=_float_list, help="Comma separated transcript lengths in minutes")
+    parser.add_argument("--densities", type=_float_list, help="Comma separated segments per minute")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions; the best one is reported")
+    parser.add_argument("--quick", action="store_true", help="Run a reduced matrix")
+    parser.add_argument("--real-ffmpeg", action="store_true", help="Render with the installed ffmpeg")
+    parser.add_argument("--json", type=Path, help="Write machine-readable results to this file")
+    parser.add_argument("--compare", type=Path, help="Previous --json output to compare against")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or list(SUITES)
+    minutes = args.minutes or (QUICK_MINUTES if args.quick else DEFAULT_MINUTES)
+    densities = args.densities or (QUICK_DENSITIES if args.quick else DEFAULT_DENSITIES)
+
+    from .media import make_test_video, real_ffmpeg
+
+    if args.real_ffmpeg and real_ffmpeg() is None:
+        parser.error("--real-ffmpeg requires ffmpeg on PATH")
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.compare is not None:
+        baseline = {result["name"]: result for result in json.loads(args.compare.read_text())["results"]}
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="viralcut-bench-") as directory:
+        workspace = Path(directory)
+        source = make_test_video(workspace / "source.mp4")
+        _install_standins(workspace, source)
+
+        if "scoring" in suites:
+            for length in minutes:
+                for density in densities:
+                    results.append(bench_scoring(length, density, repeat=args.repeat))
+
+        if "render" in suites:
+            _use_ffmpeg(args.real_ffmpeg)
+            for clips in (3, 12) if args.quick else (3, 12, 30):
+                for mode in ("per-clip", "single-pass"):
+                    results.append(bench_render(source, workspace, clips, mode, repeat=args.repeat))
+                for profile in ("vertical-crop", "vertical-crop-with-captions"):
+                    results.append(
+                        bench_render(source, workspace, clips, "per-clip", repeat=args.repeat, profile=profile)
+                    )
+
+        if "audio" in suites and importlib.util.find_spec("numpy") is not None:
+            # The stand-in synthesizes PCM of the requested length; a real
+            # ffmpeg would decode the short test video instead.
+            _use_ffmpeg(False)
+            for length in minutes:
+                results.append(bench_audio(source, length, repeat=args.repeat))
+
+        if "transcripts" in suites and importlib.util.find_spec("requests") is not None:
+            for videos in (50,) if args.quick else (50, 400):
+                for variant in ("sequential", "batched", "batched-throttled"):
+                    results.append(bench_transcripts(videos, variant))
+
+        if "pipeline" in suites:
+            # Transcript windows lie far past the end of the test video, so
+            # end-to-end runs always render with the stand-in.
+            _use_ffmpeg(False)
+            for length in minutes:
+                for sections_only in (False, True):
+                    results.extend(bench_pipeline(workspace, length, max(densities), sections_only=sections_only))
+
+    _print_results(results, baseline)
+
+    if args.json is not None:
+        payload = {
+            "meta": {
+                "created_at": time.time(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "real_ffmpeg": args.real_ffmpeg,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        args.json.write_text(json.dumps(payload, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Offline stand-in for ``youtube_transcript_api`` serving synthetic transcripts.
+
+Video ids of the form ``synthetic-<minutes>m-<density>spm[-<seed>]`` select the
+length and segment density; see :mod:`benchmarks.synthetic`. When
+``VIRALCUT_BENCH_TRANSCRIPT_URL`` points at a
+:class:`benchmarks.transcript_server.TranscriptServer`, transcripts are fetched
+from it over HTTP instead. Like the real library, the static API then opens a
+new session per call while instances use the ``http_client`` they were given.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from benchmarks.synthetic import parse_synthetic_id, synthetic_transcript
+
+__all__ = ["IpBlocked", "NoTranscriptFound", "RequestBlocked", "TranscriptsDisabled", "YouTubeTranscriptApi"]
+
+
+class NoTranscriptFound(Exception):
+    pass
+
+
+class TranscriptsDisabled(Exception):
+    pass
+
+
+class RequestBlocked(Exception):
+    pass
+
+
+class IpBlocked(RequestBlocked):
+    pass
+
+
+class FetchedTranscript:
+    def __init__(self, entries: list[dict[str, Any]]) -> None:
+        self._entries = entries
+
+    def to_raw_data(self) -> list[dict[str, Any]]:
+        return self._entries
+
+
+class YouTubeTranscriptApi:
+    def __init__(self, http_client: Any = None) -> None:
+        self._http_client = http_client
+
+    def fetch(self, video_id: str, languages: Any = ("en",)) -> FetchedTranscript:
+        return FetchedTranscript(_entries(video_id, self._http_client))
+
+    @staticmethod
+    def get_transcript(video_id: str, languages: list[str] | None = None) -> list[dict[str, Any]]:
+        return _entries(video_id, None)
+
+
+def _entries(video_id: str, http_client: Any) -> list[dict[str, Any]]:
+    url = os.environ.get("VIRALCUT_BENCH_TRANSCRIPT_URL")
+    if url:
+        if http_client is not None:
+            return _get(http_client, url, video_id)
+
+        import requests
+
+        with requests.Session() as session:
+            return _get(session, url, video_id)
+
+    minutes, density, seed = parse_synthetic_id(video_id)
+    return [
+        {"start": segment.start, "duration": segment.duration, "text": segment.text}
+        for segment in synthetic_transcript(minutes, density, seed=seed)
+    ]
+
+
+def _get(session: Any, url: str, video_id: str) -> list[dict[str, Any]]:
+    response = session.get(f"{url}/{video_id}", timeout=30)
+    if response.status_code == 429:
+        raise IpBlocked(video_id)
+    if response.status_code == 404:
+        raise NoTranscriptFound(video_id)
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,77 @@
+"""Offline stand-in for the parts of ``yt_dlp`` used by :mod:`viralcut.downloader`.
+
+Every "download" copies the clip named by ``VIRALCUT_BENCH_SOURCE`` instead of
+touching the network, and reports progress through the configured hooks the
+way yt-dlp does.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import urllib.parse
+from pathlib import Path
+from typing import Any
+
+from . import utils
+
+__all__ = ["YoutubeDL", "utils"]
+
+
+def _video_id(url: str) -> str:
+    parsed = urllib.parse.urlparse(url)
+    query = urllib.parse.parse_qs(parsed.query)
+    if "v" in query:
+        return query["v"][0]
+    return parsed.path.rstrip("/").rsplit("/", 1)[-1] or "video"
+
+
+class YoutubeDL:
+    def __init__(self, params: dict[str, Any] | None = None) -> None:
+        self.params = params or {}
+
+    def __enter__(self) -> "YoutubeDL":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def prepare_filename(self, info: dict[str, Any]) -> str:
+        return self.params["outtmpl"] % info
+
+    def extract_info(self, url: str, download: bool = True) -> dict[str, Any]:
+        info: dict[str, Any] = {"id": _video_id(url), "ext": "mp4", "protocol": "https", "requested_downloads": []}
+        if not download:
+            return info
+        return self.process_ie_result(info, download=True)
+
+    def process_ie_result(self, info: dict[str, Any], download: bool = True) -> dict[str, Any]:
+        source = Path(os.environ["VIRALCUT_BENCH_SOURCE"])
+        if not download:
+            return info
+
+        ranges = self.params.get("download_ranges")
+        if ranges is None:
+            target = Path(self.prepare_filename(info))
+            self._copy(source, target)
+            return info
+
+        for section in ranges(info, self):
+            section_info = {
+                **info,
+                "section_start": section["start_time"],
+                "section_end": section["end_time"],
+            }
+            target = Path(self.prepare_filename(section_info))
+            self._copy(source, target)
+            info["requested_downloads"].append({**section_info, "filepath": str(target)})
+        return info
+
+    def _copy(self, source: Path, target: Path) -> None:
+        total = source.stat().st_size
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for hook in self.params.get("progress_hooks", ()):
+            hook({"status": "downloading", "downloaded_bytes": 0, "total_bytes": total, "speed": None, "eta": None})
+        shutil.copyfile(source, target)
+        for hook in self.params.get("progress_hooks", ()):
+            hook({"status": "finished", "downloaded_bytes": total, "total_bytes": total, "filename": str(target)})
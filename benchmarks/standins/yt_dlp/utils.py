@@ -0,0 +1,24 @@
+"""Offline stand-in for ``yt_dlp.utils``."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def download_range_func(
+    chapters: Any,
+    ranges: list[tuple[float, float]],
+) -> Callable[[dict[str, Any], Any], Iterator[dict[str, float]]]:
+    def inner(info: dict[str, Any], ydl: Any) -> Iterator[dict[str, float]]:
+        for start, end in ranges:
+            yield {"start_time": start, "end_time": end}
+
+    return inner
@@ -0,0 +1,69 @@
+"""Deterministic synthetic transcripts for benchmarking the scoring path."""
+
+from __future__ import annotations
+
+import random
+
+from viralcut.models import TranscriptSegment
+
+_VOCABULARY = (
+    "então",
+    "isso",
+    "muito",
+    "gente",
+    "vídeo",
+    "hoje",
+    "olha",
+    "incrível",
+    "WOW",
+    "NUNCA",
+    "sério?",
+    "demais!",
+    "what",
+    "really",
+    "money",
+    "OMG",
+    "crazy!",
+    "why?",
+)
+
+
+def synthetic_transcript(
+    minutes: float,
+    segments_per_minute: float,
+    *,
+    seed: int = 0,
+) -> list[TranscriptSegment]:
+    """Return a transcript covering ``minutes`` with roughly ``segments_per_minute`` segments.
+
+    Segment lengths jitter around the mean and occasionally leave silent gaps
+    or overlap the next segment, like auto-generated YouTube captions.
+    """
+
+    rng = random.Random(seed)
+    total = minutes * 60.0
+    mean_duration = 60.0 / segments_per_minute
+    segments: list[TranscriptSegment] = []
+    start = 0.0
+    while start < total:
+        duration = max(rng.gauss(mean_duration, mean_duration / 4), 0.2)
+        words = rng.randint(2, 14)
+        text = " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+        segments.append(TranscriptSegment(start=round(start, 3), duration=round(duration, 3), text=text))
+        start += duration * rng.choice((0.9, 1.0, 1.0, 1.1, 1.6))
+    return segments
+
+
+def parse_synthetic_id(video_id: str) -> tuple[float, float, int]:
+    """Decode ``synthetic-<minutes>m-<density>spm[-<seed>]`` ids used by the stand-ins."""
+
+    parts = video_id.split("-")
+    if len(parts) < 3 or parts[0] != "synthetic":
+        return 10.0, 20.0, 0
+    minutes = float(parts[1].rstrip("m"))
+    density = float(parts[2].rstrip("spm"))
+    seed = int(parts[3]) if len(parts) > 3 else 0
+    return minutes, density, seed
+
+
+__all__ = ["parse_synthetic_id", "synthetic_transcript"]
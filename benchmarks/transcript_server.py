@@ -0,0 +1,116 @@
+"""Local HTTP stand-in for YouTube serving synthetic transcripts with latency and throttling."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Iterable
+
+from .synthetic import parse_synthetic_id, synthetic_transcript
+
+
+class TranscriptServer:
+    """Serve ``GET /<video_id>`` as the stand-in transcript JSON on a free local port.
+
+    Every response is delayed by ``latency`` seconds, standing in for the
+    round trip to YouTube. With ``throttle_every`` set, every n-th request is
+    answered with ``throttle_status`` (``429 Too Many Requests`` by default);
+    ``throttle_first`` does the same for the first n requests. ``connections``
+    counts the TCP connections accepted, which shows whether clients reuse
+    them. Video ids in ``missing`` are answered with ``404 Not Found``.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.02,
+        throttle_every: int = 0,
+        throttle_first: int = 0,
+        throttle_status: int = 429,
+        missing: Iterable[str] = (),
+    ) -> None:
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.throttle_first = throttle_first
+        self.throttle_status = throttle_status
+        self.missing = frozenset(missing)
+        self.requests = 0
+        self.throttled = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-transcripts", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "TranscriptServer":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                with server._lock:
+                    server.requests += 1
+                    throttled = server.requests <= server.throttle_first or (
+                        bool(server.throttle_every) and server.requests % server.throttle_every == 0
+                    )
+                    server.throttled += throttled
+                time.sleep(server.latency)
+                if throttled:
+                    self._send(server.throttle_status, b"{}")
+                    return
+                video_id = self.path.strip("/")
+                if video_id in server.missing:
+                    self._send(404, b"{}")
+                    return
+                try:
+                    minutes, density, seed = parse_synthetic_id(video_id)
+                except ValueError:
+                    self._send(404, b"{}")
+                    return
+                body = json.dumps(
+                    [
+                        {"start": segment.start, "duration": segment.duration, "text": segment.text}
+                        for segment in synthetic_transcript(minutes, density, seed=seed)
+                    ]
+                ).encode("utf-8")
+                self._send(200, body)
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import importlib.util
 import json
 import logging
 import os
+import stat as stat_module
+import urllib.parse
 from contextlib import asynccontextmanager
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Final
+from pathlib import Path
+from typing import Final, Literal
 
+from viralcut.system import resolve_listen_port
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
 
@@ -23,26 +29,7 @@ def _module_available(name: str) -> bool:
     return importlib.util.find_spec(name) is not None
 
 
-def _resolve_listen_port(default: int = 8000) -> int:
-    """Return the port the API should listen on, honoring the ``PORT`` env var."""
-
-    raw_port = os.environ.get("PORT")
-    if raw_port is None:
-        return default
-
-    try:
-        port = int(raw_port)
-    except ValueError:
-        logger.warning("Ignoring invalid PORT=%s; falling back to %s", raw_port, default)
-        return default
-
-    if not (0 < port < 65536):
-        logger.warning("Ignoring out-of-range PORT=%s; falling back to %s", raw_port, default)
-        return default
-
-    return port
-
-SERVER_PORT: Final[int] = _resolve_listen_port()
+SERVER_PORT: Final[int] = resolve_listen_port()
 
 
 _HAS_FASTAPI = _module_available("fastapi")
@@ -50,17 +37,75 @@ _HAS_PYDANTIC = _module_available("pydantic")
 
 
 if _HAS_FASTAPI and _HAS_PYDANTIC:
-    from fastapi import FastAPI, HTTPException
-    from pydantic import AnyHttpUrl, BaseModel, Field
+    from fastapi import FastAPI, Header, HTTPException, Response, status
+    from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+    from pydantic import AnyHttpUrl, BaseModel, Field, model_validator
 
     from viralcut import PipelineError, PipelineResult, process_video_to_clips
+    from viralcut.coalescing import PipelineCoalescer
+    from viralcut import metrics
+    from viralcut.batch import Batch, BatchManager, BatchStore
+    from viralcut.downloader import DownloadError, list_playlist
+    from viralcut.janitor import OutputJanitor, mark_used
+    from viralcut.jobs import QUEUED, RUNNING, JobManager, JobRecord, JobStore
+    from viralcut.models import PipelineEvent
     from viralcut.ngrok import maybe_start_ngrok, stop_ngrok
     from viralcut.pipeline import run_in_thread
+    from viralcut.sweep import sweep_video_clips
+
+    _coalescer = PipelineCoalescer(
+        process_video_to_clips,
+        max_entries=int(os.environ.get("VIRALCUT_RESULT_CACHE_SIZE", "256")),
+    )
+    _job_manager: JobManager | None = None
+    _batch_manager: BatchManager | None = None
+
+    MAX_BATCH_ITEMS: Final[int] = 10_000
+
+    def _job_counts() -> dict[tuple[str, ...], float]:
+        counts = _job_manager.store.count_by_status() if _job_manager is not None else {}
+        return {(state,): counts.get(state, 0) for state in (QUEUED, RUNNING)}
+
+    metrics.register_cache("result", _coalescer.stats)
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "viralcut_jobs",
+            "Background jobs waiting or running.",
+            _job_counts,
+            ("status",),
+        )
+    )
+
+    def _jobs() -> JobManager:
+        if _job_manager is None:
+            raise HTTPException(status_code=503, detail="Job workers are not running")
+        return _job_manager
+
+    def _batches() -> BatchManager:
+        if _batch_manager is None:
+            raise HTTPException(status_code=503, detail="Batch workers are not running")
+        return _batch_manager
 
     @asynccontextmanager
     async def _lifespan(_: FastAPI):
-        """Manage ngrok lifecycle while the FastAPI app is running."""
+        """Manage ngrok, job and batch workers and the output janitor while the app is running."""
 
+        global _batch_manager, _job_manager
+
+        _job_manager = JobManager(
+            JobStore.from_env(),
+            _coalescer.run,
+            max_workers=int(os.environ.get("VIRALCUT_JOB_WORKERS", "2")),
+        )
+        _job_manager.start()
+        _batch_manager = BatchManager(
+            _coalescer.run,
+            max_workers=int(os.environ.get("VIRALCUT_BATCH_WORKERS", "16")),
+            store=BatchStore.from_env(),
+        )
+        _batch_manager.start()
+        janitor = OutputJanitor.from_env(_coalescer.output_root)
+        janitor.start()
         tunnel_url = maybe_start_ngrok(SERVER_PORT)
         if tunnel_url:
             print("Servidor e túnel ngrok iniciados com sucesso")
@@ -73,17 +118,62 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
         try:
             yield
         finally:
+            janitor.shutdown()
+            _batch_manager.shutdown()
+            _batch_manager = None
+            _job_manager.shutdown()
+            _job_manager = None
             stop_ngrok()
 
     app = FastAPI(title="ViralCut API", lifespan=_lifespan)
 
-    class ClipRequest(BaseModel):
-        """Parameters accepted by the clip generation endpoint."""
+    class ClipOptions(BaseModel):
+        """Clip selection and rendering parameters shared by every endpoint."""
 
-        video_url: AnyHttpUrl = Field(..., description="Full YouTube video URL")
         clip_length: int = Field(60, ge=15, le=120, description="Target length (seconds) for each clip")
         max_clips: int = Field(3, ge=1, le=10, description="Maximum number of clips to generate")
         step: int = Field(5, ge=1, le=30, description="Step used when scanning for candidates")
+        min_gap: int = Field(0, ge=0, le=600, description="Minimum spacing (seconds) between selected clips")
+        sections_only: bool = Field(
+            False,
+            description="Download only the selected time ranges instead of the full video",
+        )
+        smart_cut: bool = Field(
+            False,
+            description="Cut exactly at each clip start, re-encoding only the first partial GOP",
+        )
+        profile: Literal["copy", "vertical-crop", "vertical-crop-with-captions"] | None = Field(
+            None,
+            description="Render profile; vertical profiles reframe to 1080x1920 (default: VIRALCUT_RENDER_PROFILE)",
+        )
+        audio: bool = Field(
+            False,
+            description="Combine the transcript score with audio energy; videos without captions are scored by audio",
+        )
+
+    class ClipRequest(ClipOptions):
+        """Parameters accepted by the clip generation endpoint."""
+
+        video_url: AnyHttpUrl = Field(..., description="Full YouTube video URL")
+
+    class BatchRequest(ClipOptions):
+        """Videos processed by a batch, given explicitly or as a playlist."""
+
+        video_urls: list[AnyHttpUrl] = Field(
+            default_factory=list,
+            max_length=MAX_BATCH_ITEMS,
+            description="YouTube video URLs to process",
+        )
+        playlist_url: AnyHttpUrl | None = Field(
+            None,
+            description="YouTube playlist or channel URL whose videos are processed",
+        )
+
+        @model_validator(mode="after")
+        def _require_one_source(self) -> "BatchRequest":
+            if bool(self.video_urls) == (self.playlist_url is not None):
+                raise ValueError("Provide either video_urls or playlist_url")
+            return self
 
     class ClipMetadata(BaseModel):
         """Metadata returned for each generated clip file."""
@@ -93,6 +183,10 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
         score: float
         transcript: str
         file_path: str
+        download_url: str | None = Field(
+            None,
+            description="Path of this clip under the ``/files`` endpoint, if it is served there",
+        )
 
     class ClipResponse(BaseModel):
         """Response structure returning generated clips and bookkeeping info."""
@@ -101,6 +195,77 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
         source_video: str
         output_directory: str
         clips: list[ClipMetadata]
+        stage_seconds: dict[str, float] = Field(
+            default_factory=dict,
+            description="Seconds each stage added to the request's critical path",
+        )
+
+    class JobResponse(BaseModel):
+        """State of an asynchronous clip generation job."""
+
+        job_id: str
+        status: str
+        created_at: float
+        updated_at: float
+        attempts: int = 0
+        error: str | None = None
+        result: ClipResponse | None = None
+
+    class SweepConfigRequest(BaseModel):
+        """One ``(clip_length, step)`` combination to score."""
+
+        clip_length: int = Field(..., ge=15, le=120, description="Target length (seconds) for each clip")
+        step: int = Field(5, ge=1, le=30, description="Step used when scanning for candidates")
+
+    class SweepRequest(BaseModel):
+        """Score one video under several clip configurations without rendering."""
+
+        video_url: AnyHttpUrl = Field(..., description="Full YouTube video URL")
+        configs: list[SweepConfigRequest] = Field(..., min_length=1, max_length=32)
+        max_clips: int = Field(3, ge=1, le=10, description="Maximum number of clips per configuration")
+        min_gap: int = Field(0, ge=0, le=600, description="Minimum spacing (seconds) between selected clips")
+
+    class SweepClip(BaseModel):
+        """A selected clip window that has not been rendered."""
+
+        start: float
+        end: float
+        score: float
+        transcript: str
+
+    class SweepConfigResponse(BaseModel):
+        """Top clips for one configuration of a sweep."""
+
+        clip_length: int
+        step: int
+        clips: list[SweepClip]
+
+    class SweepResponse(BaseModel):
+        """Top clips for every requested configuration."""
+
+        video_id: str
+        configs: list[SweepConfigResponse]
+
+    class BatchItemResponse(BaseModel):
+        """Progress and, once finished, outcome of one video in a batch."""
+
+        index: int
+        video_url: str
+        status: str
+        stage: str | None = None
+        error: str | None = None
+        result: ClipResponse | None = None
+
+    class BatchResponse(BaseModel):
+        """State of a batch, with partial results for finished videos."""
+
+        batch_id: str
+        status: str
+        created_at: float
+        updated_at: float
+        total: int
+        counts: dict[str, int]
+        items: list[BatchItemResponse]
 
     @app.get("/", summary="Health check")
     async def read_root() -> dict[str, str]:
@@ -108,6 +273,13 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
 
         return {"message": "ViralCut FastAPI backend is up and running"}
 
+    @app.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+    async def read_metrics() -> PlainTextResponse:
+        """Expose stage latencies, cache ratios, downloads and ffmpeg usage."""
+
+        body = await run_in_thread(metrics.REGISTRY.render)
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
     @app.post("/clips", response_model=ClipResponse, summary="Generate viral-ready clips")
     async def create_clips(payload: ClipRequest) -> ClipResponse:
         """Run the ViralCut processing pipeline for ``payload.video_url``."""
@@ -121,15 +293,256 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
 
         return _serialize_result(result)
 
+    @app.post("/clips/stream", summary="Generate clips while streaming progress events")
+    async def stream_clips(payload: ClipRequest) -> StreamingResponse:
+        """Run the pipeline and stream its progress as Server-Sent Events.
+
+        ``progress`` events carry a serialized :class:`PipelineEvent` (download
+        progress, transcript, candidate count, each rendered clip). The stream
+        ends with a ``result`` event holding the ``/clips`` response, or an
+        ``error`` event.
+        """
+
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue[PipelineEvent | None] = asyncio.Queue()
+
+        def publish(event: PipelineEvent) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        task = asyncio.ensure_future(_coalescer.run_async(progress=publish, **_pipeline_kwargs(payload)))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+
+        async def stream():
+            while (event := await events.get()) is not None:
+                yield _sse("progress", dataclasses.asdict(event))
+
+            try:
+                result = task.result()
+            except PipelineError as exc:
+                yield _sse("error", {"detail": str(exc)})
+            except Exception:  # pragma: no cover - defensive programming
+                logger.exception("Unexpected error while streaming clips")
+                yield _sse("error", {"detail": "Unexpected error while generating clips"})
+            else:
+                yield _sse("result", _serialize_result(result).model_dump())
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/clips/sweep", response_model=SweepResponse, summary="Compare clip configurations")
+    async def sweep_clips(payload: SweepRequest) -> SweepResponse:
+        """Return the top clips of ``payload.video_url`` for each ``(clip_length, step)``.
+
+        The transcript is scored once for all configurations and nothing is
+        downloaded or rendered; pick a configuration and call ``/clips`` with it.
+        """
+
+        configs = [(float(config.clip_length), float(config.step)) for config in payload.configs]
+        try:
+            video_id, selections = await run_in_thread(
+                sweep_video_clips,
+                str(payload.video_url),
+                configs,
+                max_clips=payload.max_clips,
+                min_gap=float(payload.min_gap),
+            )
+        except PipelineError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return SweepResponse(
+            video_id=video_id,
+            configs=[
+                SweepConfigResponse(
+                    clip_length=int(clip_length),
+                    step=int(step),
+                    clips=[
+                        SweepClip(start=clip.start, end=clip.end, score=clip.score, transcript=clip.text)
+                        for clip in clips
+                    ],
+                )
+                for (clip_length, step), clips in selections.items()
+            ],
+        )
+
+    def _sse(event: str, data: object) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    @app.post(
+        "/jobs",
+        response_model=JobResponse,
+        status_code=status.HTTP_202_ACCEPTED,
+        summary="Queue clip generation in the background",
+    )
+    async def create_job(payload: ClipRequest) -> JobResponse:
+        """Persist a clip generation job and return its id immediately."""
+
+        record = await run_in_thread(_jobs().submit, _pipeline_kwargs(payload))
+        return _serialize_job(record)
+
+    @app.get("/jobs/{job_id}", response_model=JobResponse, summary="Inspect a background job")
+    async def read_job(job_id: str) -> JobResponse:
+        """Return the status, and once finished the clips, of ``job_id``."""
+
+        record = await run_in_thread(_jobs().get, job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return _serialize_job(record)
+
+    @app.post(
+        "/batches",
+        response_model=BatchResponse,
+        status_code=status.HTTP_202_ACCEPTED,
+        summary="Generate clips for many videos or a playlist",
+    )
+    async def create_batch(payload: BatchRequest) -> BatchResponse:
+        """Queue every video of ``payload`` on the shared download, transcript and render pools."""
+
+        video_urls = [str(url) for url in payload.video_urls]
+        if payload.playlist_url is not None:
+            try:
+                video_urls = await run_in_thread(list_playlist, str(payload.playlist_url))
+            except DownloadError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            if len(video_urls) > MAX_BATCH_ITEMS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Playlist has {len(video_urls)} videos; at most {MAX_BATCH_ITEMS} are accepted",
+                )
+
+        batch = await run_in_thread(_batches().submit, video_urls, _pipeline_options(payload))
+        return _serialize_batch(batch)
+
+    @app.get("/batches/{batch_id}", response_model=BatchResponse, summary="Inspect a batch")
+    async def read_batch(batch_id: str) -> BatchResponse:
+        """Return per-video progress and the results finished so far for ``batch_id``."""
+
+        batch = await run_in_thread(_batches().get, batch_id)
+        if batch is None:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return _serialize_batch(batch)
+
+    @app.api_route("/files/{file_path:path}", methods=["GET", "HEAD"], summary="Download a generated clip")
+    async def read_clip_file(
+        file_path: str,
+        if_none_match: str | None = Header(None),
+    ) -> Response:
+        """Stream a rendered clip from the output directory.
+
+        ``Range`` requests are answered with ``206 Partial Content`` so players
+        can seek, and ``If-None-Match`` with the clip's ``ETag`` yields ``304 Not
+        Modified``. The file is streamed from disk (or handed to the server's
+        ``pathsend`` support) and never loaded into memory whole.
+        """
+
+        path, stat = await run_in_thread(_resolve_clip_file, file_path)
+        mark_used(path.parent.parent)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return FileResponse(
+            path,
+            media_type="video/mp4",
+            filename=path.name,
+            content_disposition_type="inline",
+            headers=headers,
+            stat_result=stat,
+        )
+
+    def _resolve_clip_file(file_path: str) -> tuple[Path, os.stat_result]:
+        """Map ``file_path`` to a clip inside the output root, rejecting anything else.
+
+        Only regular files in a ``clips`` directory are served, which keeps
+        downloads, caches and the job database private.
+        """
+
+        root = _coalescer.output_root.resolve()
+        path = (root / file_path).resolve()
+        if path.is_relative_to(root) and path.parent.name == "clips":
+            try:
+                stat = path.stat()
+            except OSError:
+                pass
+            else:
+                if stat_module.S_ISREG(stat.st_mode):
+                    return path, stat
+        raise HTTPException(status_code=404, detail="File not found")
+
+    def _etag_matches(header: str, etag: str) -> bool:
+        candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+        return "*" in candidates or etag in candidates
+
+    def _clip_url(file_path: str) -> str | None:
+        try:
+            relative = Path(file_path).resolve().relative_to(_coalescer.output_root.resolve())
+        except ValueError:
+            return None
+        return "/files/" + urllib.parse.quote(relative.as_posix())
+
+    def _pipeline_kwargs(payload: ClipRequest) -> dict[str, object]:
+        return {"video_url": str(payload.video_url), **_pipeline_options(payload)}
+
+    def _pipeline_options(payload: ClipOptions) -> dict[str, object]:
+        return {
+            "clip_length": float(payload.clip_length),
+            "max_clips": payload.max_clips,
+            "step": float(payload.step),
+            "min_gap": float(payload.min_gap),
+            "sections_only": payload.sections_only,
+            "smart_cut": payload.smart_cut,
+            "profile": payload.profile,
+            "audio": payload.audio,
+        }
+
     async def _run_pipeline(payload: ClipRequest) -> PipelineResult:
-        return await run_in_thread(
-            process_video_to_clips,
-            str(payload.video_url),
-            clip_length=float(payload.clip_length),
-            max_clips=payload.max_clips,
-            step=float(payload.step),
+        return await _coalescer.run_async(**_pipeline_kwargs(payload))
+
+    def _serialize_job(record: JobRecord) -> JobResponse:
+        return JobResponse(
+            job_id=record.id,
+            status=record.status,
+            created_at=record.created_at,
+            updated_at=record.updated_at,
+            attempts=record.attempts,
+            error=record.error,
+            result=_stored_result(record.result),
+        )
+
+    def _serialize_batch(batch: Batch) -> BatchResponse:
+        return BatchResponse(
+            batch_id=batch.id,
+            status=batch.status,
+            created_at=batch.created_at,
+            updated_at=batch.updated_at,
+            total=len(batch.items),
+            counts={name: count for name, count in batch.counts.items() if count},
+            items=[
+                BatchItemResponse(
+                    index=item.index,
+                    video_url=item.video_url,
+                    status=item.status,
+                    stage=item.stage,
+                    error=item.error,
+                    result=_stored_result(item.result),
+                )
+                for item in batch.items
+            ],
         )
 
+    def _stored_result(data: dict[str, object] | None) -> ClipResponse | None:
+        """Rebuild a :class:`ClipResponse` from :func:`pipeline_result_to_dict` output."""
+
+        if data is None:
+            return None
+        response = ClipResponse(**data)
+        for clip in response.clips:
+            clip.download_url = _clip_url(clip.file_path)
+        return response
+
     def _serialize_result(result: PipelineResult) -> ClipResponse:
         clips = [
             ClipMetadata(
@@ -138,6 +551,7 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
                 score=clip.score,
                 transcript=clip.transcript,
                 file_path=str(clip.path),
+                download_url=_clip_url(str(clip.path)),
             )
             for clip in result.clips
         ]
@@ -147,10 +561,20 @@ if _HAS_FASTAPI and _HAS_PYDANTIC:
             source_video=str(result.source_video),
             output_directory=str(result.output_dir),
             clips=clips,
+            stage_seconds=result.stage_seconds,
         )
 
     def main() -> None:
-        """Start the development server, enabling ngrok when available."""
+        """Start the development server, enabling ngrok when available.
+
+        With ``VIRALCUT_SERVER_MODE=production`` the process is replaced by the
+        multi-worker launcher of :mod:`viralcut.server` instead.
+        """
+
+        from viralcut.server import PRODUCTION, exec_production, server_mode
+
+        if server_mode() == PRODUCTION:
+            exec_production(Path(__file__).resolve().parent)
 
         if os.environ.get("ENABLE_NGROK") is None and _module_available("pyngrok"):
             os.environ["ENABLE_NGROK"] = "1"
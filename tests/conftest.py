@@ -0,0 +1,60 @@
+"""Shared fixtures: tests run against the offline stand-ins used by the benchmarks."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+STANDINS = ROOT / "benchmarks" / "standins"
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(STANDINS))
+
+from benchmarks.media import STANDIN_BIN  # noqa: E402
+from benchmarks.transcript_server import TranscriptServer  # noqa: E402
+from viralcut import transcript  # noqa: E402
+
+
+@pytest.fixture()
+def transcript_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> transcript.TranscriptCache:
+    """Replace the process-wide transcript cache with an empty one under ``tmp_path``."""
+
+    cache = transcript.TranscriptCache(tmp_path / "transcripts")
+    monkeypatch.setattr(transcript, "_cache", cache)
+    return cache
+
+
+@pytest.fixture()
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Shrink the throttling backoff so retries happen at once."""
+
+    monkeypatch.setattr(transcript, "_BACKOFF_SECONDS", 0.001)
+
+
+@pytest.fixture()
+def serve_transcripts(monkeypatch: pytest.MonkeyPatch) -> Iterator:
+    """Start :class:`TranscriptServer` instances the stand-in transcript API fetches from."""
+
+    servers: list[TranscriptServer] = []
+
+    def start(**options) -> TranscriptServer:
+        server = TranscriptServer(**options).__enter__()
+        servers.append(server)
+        monkeypatch.setenv("VIRALCUT_BENCH_TRANSCRIPT_URL", server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+@pytest.fixture()
+def standin_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Resolve ``ffmpeg`` and ``ffprobe`` to the stand-ins for the duration of a test."""
+
+    monkeypatch.setenv("PATH", os.pathsep.join([str(STANDIN_BIN), os.environ.get("PATH", "")]))
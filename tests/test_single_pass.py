@@ -0,0 +1,38 @@
+"""Single-pass rendering checked against per-clip stream copies with the stand-in ffmpeg."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.media import make_standin_video
+from viralcut.clipping import render_clips
+from viralcut.models import ClipCandidate
+
+WINDOWS = [(3.0, 7.0), (9.5, 12.0), (15.1, 18.0)]
+
+
+def _frames(clips) -> list[list]:
+    return [json.loads(clip.path.read_text(encoding="utf-8"))["frames"] for clip in clips]
+
+
+@pytest.mark.usefixtures("standin_ffmpeg")
+def test_single_pass_clips_match_per_clip_copies(tmp_path: Path) -> None:
+    source = make_standin_video(tmp_path / "source.mp4", seconds=20)
+    candidates = [ClipCandidate(start, end, "", 1.0) for start, end in WINDOWS]
+    notified: list[int] = []
+
+    single = render_clips(
+        source,
+        candidates,
+        tmp_path / "single",
+        mode="single-pass",
+        on_clip=lambda index, clip: notified.append(index),
+    )
+    per_clip = render_clips(source, candidates, tmp_path / "per-clip", mode="per-clip")
+
+    assert _frames(single) == _frames(per_clip)
+    assert all(frames[0][1] for frames in _frames(single)), "every clip must open on a keyframe"
+    assert notified == [1, 2, 3]
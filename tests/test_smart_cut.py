@@ -0,0 +1,51 @@
+"""Smart cuts spliced from an encoded head GOP and a copied tail, checked with the stand-in ffmpeg."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.media import make_standin_video
+from viralcut.clipping import render_clips
+from viralcut.models import ClipCandidate
+
+RATE = 25
+
+# Keyframe timestamps just past whole milliseconds, as a 1/15360 timebase produces them.
+OFFSET = 0.0004
+
+
+def _cut(source: Path, output_dir: Path, start: float, end: float) -> dict:
+    [clip] = render_clips(source, [ClipCandidate(start, end, "", 1.0)], output_dir, smart_cut=True)
+    return json.loads(clip.path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.usefixtures("standin_ffmpeg")
+def test_head_is_spliced_onto_copied_tail(tmp_path: Path) -> None:
+    source = make_standin_video(tmp_path / "source.mp4", seconds=20, rate=RATE, offset=OFFSET)
+    stream = json.loads(source.read_text(encoding="utf-8"))["stream"]
+
+    clip = _cut(source, tmp_path / "clips", 3.0, 9.0)
+
+    times = [pts for pts, _ in clip["frames"]]
+    assert len(times) == 6 * RATE
+    assert times == sorted(set(times))
+    assert times[-1] + clip["frame_duration"] == pytest.approx(6.0, abs=1e-3)
+    # One keyframe opens the encoded head, the copied tail keeps the source's from 4 s on.
+    assert [index for index, (_, key) in enumerate(clip["frames"]) if key] == [0, RATE, 3 * RATE, 5 * RATE]
+    assert clip["parameter_sets"] == [stream]
+
+
+@pytest.mark.usefixtures("standin_ffmpeg")
+def test_head_that_cannot_match_the_source_is_reencoded_in_full(tmp_path: Path) -> None:
+    source = make_standin_video(
+        tmp_path / "source.mp4", seconds=20, rate=RATE, offset=OFFSET, stream={"profile": "Extended"}
+    )
+
+    clip = _cut(source, tmp_path / "clips", 3.0, 9.0)
+
+    assert len(clip["frames"]) == 6 * RATE
+    assert [index for index, (_, key) in enumerate(clip["frames"]) if key] == [0]
+    assert len(clip["parameter_sets"]) == 1
@@ -0,0 +1,82 @@
+"""Batched transcript fetching against the local stand-in transcript server."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from viralcut.transcript import TranscriptError, _inflight, fetch_transcript, fetch_transcripts
+
+VIDEO = "synthetic-1m-10spm"
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_throttled_request_is_retried(serve_transcripts, no_backoff, status: int) -> None:
+    server = serve_transcripts(throttle_first=2, throttle_status=status)
+
+    [(video_id, outcome)] = fetch_transcripts([VIDEO], retries=3, use_cache=False)
+
+    assert video_id == VIDEO
+    assert isinstance(outcome, list) and outcome
+    assert server.throttled == 2
+    assert server.requests == 3
+
+
+def test_gives_up_after_retries(serve_transcripts, no_backoff) -> None:
+    server = serve_transcripts(throttle_first=100)
+
+    [(_, outcome)] = fetch_transcripts([VIDEO], retries=2, use_cache=False)
+
+    assert isinstance(outcome, TranscriptError)
+    assert "throttling" in str(outcome)
+    assert server.requests == 3
+
+
+def test_failures_are_reported_per_video(serve_transcripts) -> None:
+    serve_transcripts(missing={"missing-video"})
+    ids = [VIDEO, "missing-video", "synthetic-2m-10spm"]
+
+    outcomes = dict(fetch_transcripts(ids, concurrency=2, use_cache=False))
+
+    assert outcomes.keys() == set(ids)
+    assert isinstance(outcomes["missing-video"], TranscriptError)
+    assert isinstance(outcomes[VIDEO], list) and outcomes[VIDEO]
+    assert isinstance(outcomes["synthetic-2m-10spm"], list) and outcomes["synthetic-2m-10spm"]
+
+
+def test_video_ids_are_consumed_lazily(serve_transcripts) -> None:
+    serve_transcripts()
+    consumed: list[str] = []
+
+    def ids():
+        for seed in range(100):
+            video_id = f"{VIDEO}-{seed}"
+            consumed.append(video_id)
+            yield video_id
+
+    batch = fetch_transcripts(ids(), concurrency=2, use_cache=False)
+    next(batch)
+    assert len(consumed) == 2
+    next(batch)
+    assert len(consumed) == 3
+    batch.close()
+
+
+def test_fetch_transcript_waits_for_inflight_prefetch(serve_transcripts, transcript_cache) -> None:
+    server = serve_transcripts(latency=0.3)
+    prefetched: list = []
+    prefetch = threading.Thread(target=lambda: prefetched.extend(fetch_transcripts([VIDEO])))
+    prefetch.start()
+    deadline = time.monotonic() + 5
+    while not _inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _inflight, "the prefetch never started"
+
+    segments = fetch_transcript(VIDEO)
+    prefetch.join()
+
+    [(_, expected)] = prefetched
+    assert segments == expected
+    assert server.requests == 1
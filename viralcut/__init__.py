@@ -1,9 +1,26 @@
-"""Utility modules powering the ViralCut FastAPI backend."""
+"""Utility modules powering the ViralCut FastAPI backend.
 
-from .pipeline import PipelineError, PipelineResult, process_video_to_clips
+The pipeline is imported on first use of the names below, so lightweight
+modules such as :mod:`viralcut.server` load without it.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .pipeline import PipelineError, PipelineResult, process_video_to_clips
 
 __all__ = [
     "PipelineError",
     "PipelineResult",
     "process_video_to_clips",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        from . import pipeline
+
+        return getattr(pipeline, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
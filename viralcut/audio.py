@@ -0,0 +1,184 @@
+"""Score clip windows by audio energy streamed from ``ffmpeg`` as low-rate PCM."""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+from .clipping import FFMPEG_ACTIVE, FFMPEG_RUNS, _reap, _render_budget
+
+if TYPE_CHECKING:  # pragma: no cover - used only for static analysis
+    import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+# Mono 16-bit PCM at 8 kHz keeps speech and music dynamics while costing
+# 16 KB per second of audio; loudness is tracked per half-second frame.
+SAMPLE_RATE = 8_000
+FRAME_SECONDS = 0.5
+
+# Frames decoded per read from the pipe (two minutes of audio, ~1.9 MB).
+_CHUNK_FRAMES = 240
+
+# Floor for silent frames, in dBFS.
+_SILENCE_DB = -100.0
+
+
+class AudioEnergyError(RuntimeError):
+    """Raised when the audio track cannot be decoded or scored."""
+
+
+@dataclass(slots=True)
+class AudioEnvelope:
+    """Loudness in dBFS of consecutive ``frame_seconds`` frames of a track."""
+
+    frame_seconds: float
+    loudness: "np.ndarray"
+
+    @property
+    def duration(self) -> float:
+        """Length of the decoded audio in seconds."""
+
+        return len(self.loudness) * self.frame_seconds
+
+    def window_scores(self, starts: Sequence[float], ends: Sequence[float]) -> list[float]:
+        """Score the ``[start, end)`` windows by how loud and eventful they are.
+
+        A window earns the mean number of decibels its frames rise above the
+        track's median loudness, plus up to 10 points for the share of its
+        frames among the track's loudest tenth. Both terms come from prefix
+        sums, so any number of windows costs two lookups each.
+        """
+
+        import numpy as np
+
+        if not len(self.loudness):
+            return [0.0] * len(starts)
+
+        median = float(np.median(self.loudness))
+        excess = np.maximum(self.loudness - median, 0.0)
+        peaks = (self.loudness >= np.percentile(self.loudness, 90)) & (self.loudness > median)
+        excess_totals = np.concatenate([[0.0], np.cumsum(excess, dtype=np.float64)])
+        peak_totals = np.concatenate([[0], np.cumsum(peaks, dtype=np.int64)])
+
+        frames = len(self.loudness)
+        first = np.clip(np.floor(np.asarray(starts, dtype=np.float64) / self.frame_seconds), 0, frames).astype(np.int64)
+        last = np.clip(np.ceil(np.asarray(ends, dtype=np.float64) / self.frame_seconds), 0, frames).astype(np.int64)
+        last = np.maximum(last, first)
+        counts = np.maximum(last - first, 1)
+        scores = (excess_totals[last] - excess_totals[first]) / counts
+        scores += 10.0 * (peak_totals[last] - peak_totals[first]) / counts
+        return scores.tolist()
+
+
+def read_envelope(
+    source: Path,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    frame_seconds: float = FRAME_SECONDS,
+) -> AudioEnvelope:
+    """Decode the first audio stream of ``source`` and return its loudness envelope.
+
+    ``ffmpeg`` downmixes and resamples the track to mono ``sample_rate`` PCM
+    on a pipe, which is read a fixed number of frames at a time; only one
+    chunk of samples and one float per frame are ever held in memory, so
+    memory stays flat even for ten-hour streams. The decoder holds one core of
+    the process-wide ``ffmpeg`` budget.
+
+    Raises
+    ------
+    AudioEnergyError
+        When NumPy is missing, ``ffmpeg`` is unavailable or the source has no
+        decodable audio.
+    """
+
+    try:
+        import numpy as np
+    except ModuleNotFoundError as exc:
+        raise AudioEnergyError("Audio scoring requires NumPy. Install it with 'pip install numpy'.") from exc
+
+    frame_samples = max(int(sample_rate * frame_seconds), 1)
+    chunk_bytes = frame_samples * 2 * _CHUNK_FRAMES
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-i",
+        str(source),
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "s16le",
+        "-",
+    ]
+
+    chunks: list[np.ndarray] = []
+    with _render_budget.reserve(1), FFMPEG_ACTIVE.track_inprogress(), tempfile.TemporaryFile() as errors:
+        try:
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=errors)
+        except FileNotFoundError as exc:  # pragma: no cover - environment guard
+            FFMPEG_RUNS.inc(outcome="missing")
+            raise AudioEnergyError("ffmpeg is required to score audio") from exc
+
+        assert process.stdout is not None
+        with process.stdout:
+            while data := process.stdout.read(chunk_bytes):
+                samples = np.frombuffer(data[: len(data) - len(data) % 2], dtype="<i2").astype(np.float32)
+                whole = len(samples) // frame_samples * frame_samples
+                frames = [samples[:whole].reshape(-1, frame_samples)] if whole else []
+                if whole < len(samples):
+                    frames.append(samples[whole:].reshape(1, -1))
+                for block in frames:
+                    rms = np.sqrt(np.mean(np.square(block / 32768.0), axis=1))
+                    chunks.append(20.0 * np.log10(np.maximum(rms, 10 ** (_SILENCE_DB / 20))))
+        returncode = _reap(process)
+        errors.seek(0)
+        stderr = errors.read().decode(errors="replace").strip()
+
+    if returncode != 0:
+        FFMPEG_RUNS.inc(outcome="failed")
+        raise AudioEnergyError(stderr or "ffmpeg could not decode the audio track")
+    FFMPEG_RUNS.inc(outcome="succeeded")
+
+    loudness = np.concatenate(chunks).astype(np.float32) if chunks else np.zeros(0, dtype=np.float32)
+    if not len(loudness):
+        raise AudioEnergyError(f"{source} has no audio")
+    LOGGER.info("Decoded %.0fs of audio from %s", len(loudness) * frame_seconds, source)
+    return AudioEnvelope(frame_seconds=frame_seconds, loudness=loudness)
+
+
+def audio_weight() -> float:
+    """Return ``VIRALCUT_AUDIO_WEIGHT``, the multiplier applied to audio scores (``1`` when unset or invalid)."""
+
+    raw = os.environ.get("VIRALCUT_AUDIO_WEIGHT")
+    if raw:
+        try:
+            weight = float(raw)
+        except ValueError:
+            weight = math.nan
+        if math.isfinite(weight):
+            return weight
+        LOGGER.warning("Ignoring invalid VIRALCUT_AUDIO_WEIGHT=%s", raw)
+    return 1.0
+
+
+__all__ = [
+    "AudioEnergyError",
+    "AudioEnvelope",
+    "FRAME_SECONDS",
+    "SAMPLE_RATE",
+    "audio_weight",
+    "read_envelope",
+]
@@ -0,0 +1,396 @@
+"""Batches of pipeline runs sharing the process-wide stage pools."""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from . import locks
+from .jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, pipeline_result_to_dict
+from .models import PipelineEvent, PipelineResult
+from .pipeline import PipelineError, _extract_video_id
+from .transcript import TranscriptError, fetch_transcripts
+
+LOGGER = logging.getLogger(__name__)
+
+COMPLETED = "completed"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS batches (
+        id TEXT PRIMARY KEY,
+        params TEXT NOT NULL,
+        owner TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS batch_items (
+        batch_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        video_url TEXT NOT NULL,
+        status TEXT NOT NULL,
+        stage TEXT,
+        result TEXT,
+        error TEXT,
+        PRIMARY KEY (batch_id, idx)
+    )
+    """,
+)
+
+
+@dataclass(slots=True)
+class BatchItem:
+    """One video of a :class:`Batch` and what is known about it so far."""
+
+    index: int
+    video_url: str
+    status: str = QUEUED
+    stage: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class Batch:
+    """A set of videos processed with the same clip parameters."""
+
+    id: str
+    params: dict[str, Any]
+    items: list[BatchItem]
+    created_at: float
+    updated_at: float
+    counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def status(self) -> str:
+        """``queued`` until an item starts, ``running`` until all items finished."""
+
+        queued = self.counts.get(QUEUED, 0)
+        if self.items and queued == len(self.items):
+            return QUEUED
+        if queued or self.counts.get(RUNNING, 0):
+            return RUNNING
+        return COMPLETED
+
+
+class BatchStore:
+    """Batches persisted in SQLite so that every server worker can report on them.
+
+    Items still run only in the process that accepted the batch (its
+    ``owner``). Like :class:`viralcut.jobs.JobStore`, each operation opens its
+    own short-lived connection.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> "BatchStore":
+        """Build a store in the job database ``VIRALCUT_JOB_DB`` (default ``output/jobs.sqlite3``)."""
+
+        return cls(Path(os.environ.get("VIRALCUT_JOB_DB", "output/jobs.sqlite3")))
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def create(self, batch: Batch, owner: str | None = None) -> None:
+        """Persist ``batch`` and all of its items."""
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO batches (id, params, owner, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (batch.id, json.dumps(batch.params), owner, batch.created_at, batch.updated_at),
+            )
+            connection.executemany(
+                "INSERT INTO batch_items (batch_id, idx, video_url, status) VALUES (?, ?, ?, ?)",
+                [(batch.id, item.index, item.video_url, item.status) for item in batch.items],
+            )
+
+    def update_item(self, batch_id: str, item: BatchItem, updated_at: float) -> None:
+        """Persist the current state of ``item``."""
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE batch_items SET status = ?, stage = ?, result = ?, error = ? WHERE batch_id = ? AND idx = ?",
+                (
+                    item.status,
+                    item.stage,
+                    json.dumps(item.result) if item.result is not None else None,
+                    item.error,
+                    batch_id,
+                    item.index,
+                ),
+            )
+            connection.execute("UPDATE batches SET updated_at = ? WHERE id = ?", (updated_at, batch_id))
+
+    def get(self, batch_id: str) -> Batch | None:
+        """Return ``batch_id`` as last persisted, or ``None`` if it does not exist."""
+
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+            if row is None:
+                return None
+            item_rows = connection.execute(
+                "SELECT * FROM batch_items WHERE batch_id = ? ORDER BY idx", (batch_id,)
+            ).fetchall()
+
+        items = [
+            BatchItem(
+                index=item["idx"],
+                video_url=item["video_url"],
+                status=item["status"],
+                stage=item["stage"],
+                result=json.loads(item["result"]) if item["result"] else None,
+                error=item["error"],
+            )
+            for item in item_rows
+        ]
+        counts: dict[str, int] = {}
+        for item in items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return Batch(
+            id=row["id"],
+            params=json.loads(row["params"]),
+            items=items,
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            counts=counts,
+        )
+
+    def fail_interrupted(self) -> int:
+        """Fail unfinished items of batches whose owning process is gone; return how many."""
+
+        now = time.time()
+        failed = 0
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute(
+                "SELECT DISTINCT b.id, b.owner FROM batches b JOIN batch_items i ON i.batch_id = b.id "
+                "WHERE i.status IN (?, ?)",
+                (QUEUED, RUNNING),
+            ).fetchall()
+            for row in rows:
+                if row["owner"] is not None and locks.process_alive(row["owner"]):
+                    continue
+                cursor = connection.execute(
+                    "UPDATE batch_items SET status = ?, stage = NULL, error = ? "
+                    "WHERE batch_id = ? AND status IN (?, ?)",
+                    (FAILED, "Batch was interrupted by a server restart", row["id"], QUEUED, RUNNING),
+                )
+                connection.execute("UPDATE batches SET updated_at = ? WHERE id = ?", (now, row["id"]))
+                failed += cursor.rowcount
+        return failed
+
+    def prune(self, keep: int) -> None:
+        """Delete all but the ``keep`` most recently updated finished batches."""
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM batches WHERE id IN ("
+                "SELECT id FROM batches b WHERE NOT EXISTS ("
+                "SELECT 1 FROM batch_items i WHERE i.batch_id = b.id AND i.status IN (?, ?)"
+                ") ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (QUEUED, RUNNING, keep),
+            )
+            connection.execute("DELETE FROM batch_items WHERE batch_id NOT IN (SELECT id FROM batches)")
+
+
+class BatchManager:
+    """Run every item of every batch on one bounded item pool.
+
+    Items only orchestrate; the actual work happens in the shared download and
+    transcript pools of :mod:`viralcut.pipeline` and the process-wide ffmpeg
+    slots of :mod:`viralcut.clipping`. ``max_workers`` therefore only needs to
+    be large enough to keep those pools busy. Batches live in memory; the
+    ``max_batches`` most recent finished ones are kept for inspection. With a
+    ``store`` every change is also persisted, so :meth:`get` can report
+    batches accepted by other server processes.
+
+    With ``prefetch_transcripts`` each batch also fetches its transcripts
+    through :func:`viralcut.transcript.fetch_transcripts`, at most
+    ``2 * max_workers`` items ahead of the item pool, so items find them
+    cached instead of fetching them one at a time.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., PipelineResult],
+        *,
+        max_workers: int = 16,
+        max_batches: int = 64,
+        store: BatchStore | None = None,
+        prefetch_transcripts: bool = True,
+    ) -> None:
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_batches = max_batches
+        self.store = store
+        self.prefetch_transcripts = prefetch_transcripts
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._batches: OrderedDict[str, Batch] = OrderedDict()
+        self._lookahead: dict[str, threading.Semaphore] = {}
+
+    def start(self) -> None:
+        """Start the item pool and fail persisted items abandoned by a dead process."""
+
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="viralcut-batch",
+            )
+
+        if self.store is not None:
+            interrupted = self.store.fail_interrupted()
+            if interrupted:
+                LOGGER.info("Marked %d interrupted batch items as failed", interrupted)
+
+    def shutdown(self) -> None:
+        """Stop the item pool; items that have not started are dropped."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, video_urls: list[str], params: dict[str, Any]) -> Batch:
+        """Create a batch for ``video_urls`` and queue all of its items."""
+
+        now = time.time()
+        batch = Batch(
+            id=uuid.uuid4().hex,
+            params=dict(params),
+            items=[BatchItem(index=index, video_url=url) for index, url in enumerate(video_urls)],
+            created_at=now,
+            updated_at=now,
+            counts={QUEUED: len(video_urls)},
+        )
+
+        if self.store is not None:
+            self.store.create(batch, locks.process_token())
+            self.store.prune(self.max_batches)
+
+        with self._lock:
+            if self._executor is None:
+                raise RuntimeError("BatchManager.start() must be called before submitting batches")
+            self._batches[batch.id] = batch
+            self._evict()
+            if self.prefetch_transcripts:
+                lookahead = self._lookahead[batch.id] = threading.Semaphore(2 * self.max_workers)
+                threading.Thread(
+                    target=self._prefetch,
+                    args=(batch, lookahead),
+                    name="viralcut-batch-prefetch",
+                    daemon=True,
+                ).start()
+            for item in batch.items:
+                self._executor.submit(self._run, batch, item)
+            snapshot = copy.deepcopy(batch)
+
+        LOGGER.info("Queued batch %s with %d videos", batch.id, len(video_urls))
+        return snapshot
+
+    def get(self, batch_id: str) -> Batch | None:
+        """Return a consistent snapshot of ``batch_id``, including partial results."""
+
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is not None:
+                return copy.deepcopy(batch)
+        return self.store.get(batch_id) if self.store is not None else None
+
+    def _evict(self) -> None:
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.status == COMPLETED]
+        for batch_id in finished[: max(len(self._batches) - self.max_batches, 0)]:
+            del self._batches[batch_id]
+
+    def _update(self, batch: Batch, item: BatchItem, **changes: Any) -> None:
+        with self._lock:
+            status = changes.get("status")
+            if status is not None and status != item.status:
+                batch.counts[item.status] -= 1
+                batch.counts[status] = batch.counts.get(status, 0) + 1
+            for name, value in changes.items():
+                setattr(item, name, value)
+            batch.updated_at = time.time()
+            snapshot = copy.copy(item)
+            updated_at = batch.updated_at
+        if self.store is not None:
+            try:
+                self.store.update_item(batch.id, snapshot, updated_at)
+            except sqlite3.Error as exc:  # pragma: no cover - the in-memory state stays authoritative
+                LOGGER.warning("Unable to persist batch %s item %d: %s", batch.id, item.index, exc)
+
+    def _prefetch(self, batch: Batch, lookahead: threading.Semaphore) -> None:
+        def video_ids() -> Iterator[str]:
+            for item in batch.items:
+                while not lookahead.acquire(timeout=1.0):
+                    if self._executor is None:
+                        return
+                try:
+                    video_id = _extract_video_id(item.video_url)
+                except PipelineError:
+                    continue
+                yield video_id
+
+        try:
+            fetched = failed = 0
+            for video_id, outcome in fetch_transcripts(video_ids()):
+                if isinstance(outcome, TranscriptError):
+                    failed += 1
+                    LOGGER.debug("Batch %s could not prefetch %s: %s", batch.id, video_id, outcome)
+                else:
+                    fetched += 1
+            LOGGER.info("Batch %s prefetched %d transcripts (%d unavailable)", batch.id, fetched, failed)
+        except TranscriptError as exc:
+            LOGGER.warning("Not prefetching the transcripts of batch %s: %s", batch.id, exc)
+        except Exception:  # pragma: no cover - prefetching is best effort
+            LOGGER.exception("Prefetching the transcripts of batch %s failed", batch.id)
+        finally:
+            with self._lock:
+                self._lookahead.pop(batch.id, None)
+
+    def _run(self, batch: Batch, item: BatchItem) -> None:
+        def progress(event: PipelineEvent) -> None:
+            if event.status == "started":
+                self._update(batch, item, stage=event.stage)
+
+        self._update(batch, item, status=RUNNING)
+        try:
+            result = self.runner(item.video_url, progress=progress, **batch.params)
+        except Exception as exc:
+            LOGGER.warning("Batch %s item %d failed: %s", batch.id, item.index, exc)
+            self._update(batch, item, status=FAILED, stage=None, error=str(exc) or exc.__class__.__name__)
+            return
+        finally:
+            with self._lock:
+                lookahead = self._lookahead.get(batch.id)
+            if lookahead is not None:
+                lookahead.release()
+
+        self._update(batch, item, status=SUCCEEDED, stage=None, result=pipeline_result_to_dict(result))
+
+
+__all__ = ["COMPLETED", "Batch", "BatchItem", "BatchManager", "BatchStore"]
@@ -0,0 +1,220 @@
+"""Per-working-directory checkpoints that let an interrupted pipeline resume."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+from .models import ClipCandidate, ClipFile
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Bytes hashed from each end of the source; hashing multi-gigabyte sources in
+# full would cost more than most of the stages a resume skips.
+_SOURCE_SAMPLE_BYTES = 4 * 1024**2
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 digest of ``path``."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(1024**2):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_checksum(path: Path) -> str:
+    """Return a checksum of ``path`` built from its size and its first and last bytes."""
+
+    size = path.stat().st_size
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with path.open("rb") as handle:
+        digest.update(handle.read(_SOURCE_SAMPLE_BYTES))
+        if size > _SOURCE_SAMPLE_BYTES:
+            handle.seek(max(size - _SOURCE_SAMPLE_BYTES, _SOURCE_SAMPLE_BYTES))
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+class CheckpointManifest:
+    """Progress of one pipeline working directory, saved after every change.
+
+    The manifest records the parameters it was produced with, the completed
+    stages, a checksum of the source video, the selected clip windows as
+    scored, before any keyframe alignment (with their transcript text) and
+    the size and SHA-256 of every clip rendered so far.
+    A manifest written with different parameters is ignored.
+    """
+
+    def __init__(self, path: Path, video_id: str, params: dict[str, Any]) -> None:
+        self.path = path
+        self.video_id = video_id
+        self.params = params
+        self.stages: list[str] = []
+        self.source: dict[str, Any] | None = None
+        self.candidates: list[ClipCandidate] | None = None
+        self.clips: dict[int, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, working_dir: Path, video_id: str, params: dict[str, Any]) -> "CheckpointManifest":
+        """Return the manifest of ``working_dir``, or an empty one if it cannot be reused."""
+
+        manifest = cls(working_dir / MANIFEST_NAME, video_id, params)
+        try:
+            payload = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Ignoring unreadable checkpoint %s: %s", manifest.path, exc)
+            return manifest
+
+        if (
+            payload.get("version") != MANIFEST_VERSION
+            or payload.get("video_id") != video_id
+            or payload.get("params") != params
+        ):
+            LOGGER.info("Ignoring checkpoint %s written for other parameters", manifest.path)
+            return manifest
+
+        try:
+            manifest.stages = list(payload["stages"])
+            manifest.source = payload["source"]
+            if payload["candidates"] is not None:
+                manifest.candidates = [ClipCandidate(**candidate) for candidate in payload["candidates"]]
+            manifest.clips = {int(index): clip for index, clip in payload["clips"].items()}
+        except (KeyError, TypeError, ValueError) as exc:
+            LOGGER.warning("Ignoring malformed checkpoint %s: %s", manifest.path, exc)
+            return cls(manifest.path, video_id, params)
+        return manifest
+
+    def complete(self, stage: str) -> None:
+        """Mark ``stage`` as finished."""
+
+        with self._lock:
+            if stage not in self.stages:
+                self.stages.append(stage)
+                self._save()
+
+    def set_candidates(self, candidates: list[ClipCandidate]) -> None:
+        """Record the selected clip windows; previously rendered clips no longer apply."""
+
+        with self._lock:
+            self.candidates = [
+                ClipCandidate(start=candidate.start, end=candidate.end, text=candidate.text, score=candidate.score)
+                for candidate in candidates
+            ]
+            self.clips = {}
+            self._save()
+
+    def set_source(self, source: Path) -> bool:
+        """Record the checksum of ``source``; return ``False`` if it differs from the recorded one.
+
+        A changed source invalidates every rendered clip.
+        """
+
+        checksum = source_checksum(source)
+        with self._lock:
+            unchanged = self.source is None or self.source.get("checksum") == checksum
+            if not unchanged:
+                self.clips = {}
+            self.source = {"path": str(source), "size": source.stat().st_size, "checksum": checksum}
+            self._save()
+        return unchanged
+
+    def record_clip(self, index: int, clip: ClipFile) -> None:
+        """Record the clip at 1-based position ``index`` as successfully written."""
+
+        try:
+            entry = {"path": clip.path.name, "size": clip.path.stat().st_size, "sha256": file_sha256(clip.path)}
+        except OSError as exc:
+            LOGGER.warning("Unable to checkpoint clip %s: %s", clip.path, exc)
+            return
+        with self._lock:
+            self.clips[index] = entry
+            self._save()
+
+    def verified_clips(
+        self,
+        clips_dir: Path,
+        windows: list[ClipCandidate] | None = None,
+    ) -> dict[int, ClipFile]:
+        """Return recorded clips whose files in ``clips_dir`` are still intact, by position.
+
+        ``windows`` are the windows the clips were cut from when they differ
+        from the recorded candidates, such as their keyframe-aligned copies.
+        """
+
+        if self.candidates is None:
+            return {}
+
+        verified: dict[int, ClipFile] = {}
+        for index, entry in sorted(self.clips.items()):
+            if not 1 <= index <= len(self.candidates):
+                continue
+            path = clips_dir / entry["path"]
+            try:
+                intact = path.stat().st_size == entry["size"] and file_sha256(path) == entry["sha256"]
+            except OSError:
+                intact = False
+            if not intact:
+                LOGGER.info("Clip %s is missing or corrupt; it will be rendered again", path)
+                continue
+            candidate = (windows or self.candidates)[index - 1]
+            verified[index] = ClipFile(
+                start=candidate.start,
+                end=candidate.end,
+                score=candidate.score,
+                transcript=candidate.text,
+                path=path,
+            )
+        return verified
+
+    def _save(self) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "video_id": self.video_id,
+            "params": self.params,
+            "stages": self.stages,
+            "source": self.source,
+            "candidates": (
+                [
+                    {"start": candidate.start, "end": candidate.end, "text": candidate.text, "score": candidate.score}
+                    for candidate in self.candidates
+                ]
+                if self.candidates is not None
+                else None
+            ),
+            "clips": {str(index): clip for index, clip in sorted(self.clips.items())},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.path.parent,
+                suffix=".tmp",
+                delete=False,
+            ) as handle:
+                json.dump(payload, handle)
+            os.replace(handle.name, self.path)
+        except OSError as exc:  # pragma: no cover - checkpoints are best effort
+            LOGGER.warning("Unable to write checkpoint %s: %s", self.path, exc)
+
+
+__all__ = [
+    "CheckpointManifest",
+    "MANIFEST_NAME",
+    "file_sha256",
+    "source_checksum",
+]
@@ -2,23 +2,689 @@
 
 from __future__ import annotations
 
+import logging
+import math
+import os
 import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator, Mapping
 
+from . import metrics
+from .keyframes import (
+    KeyframeIndex,
+    KeyframeIndexError,
+    StreamParameters,
+    load_keyframe_index,
+    probe_stream_parameters,
+)
 from .models import ClipCandidate, ClipFile
+from .system import available_cores
+
+LOGGER = logging.getLogger(__name__)
 
 
 class ClipGenerationError(RuntimeError):
     """Raised when ``ffmpeg`` fails to render a clip."""
 
 
+ClipRendered = Callable[[int, ClipFile], None]
+
+
+def _render_concurrency() -> int:
+    """Return how many ``ffmpeg`` processes may run at once in this process."""
+
+    raw = os.environ.get("VIRALCUT_RENDER_CONCURRENCY")
+    if raw:
+        try:
+            return max(int(raw), 1)
+        except ValueError:
+            LOGGER.warning("Ignoring invalid VIRALCUT_RENDER_CONCURRENCY=%s", raw)
+    return available_cores()
+
+
+RENDER_CONCURRENCY = _render_concurrency()
+
+
+class _RenderBudget:
+    """Cores available to ``ffmpeg`` in this process, shared by every request.
+
+    A stream copy holds one core; an encode holds as many as the threads it
+    was given, so concurrent jobs cannot oversubscribe the host.
+    """
+
+    def __init__(self, cores: int) -> None:
+        self.cores = cores
+        self._available = cores
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, cores: int = 1) -> Iterator[None]:
+        cores = min(max(cores, 1), self.cores)
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= cores)
+            self._available -= cores
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._available += cores
+                self._condition.notify_all()
+
+
+_render_budget = _RenderBudget(RENDER_CONCURRENCY)
+
+RENDER_MODES = ("auto", "per-clip", "single-pass")
+
+FFMPEG_RUNS = metrics.counter("viralcut_ffmpeg_runs_total", "ffmpeg invocations by outcome.", ("outcome",))
+FFMPEG_ACTIVE = metrics.gauge("viralcut_ffmpeg_active", "ffmpeg processes currently running.")
+FFMPEG_CPU_SECONDS = metrics.histogram(
+    "viralcut_ffmpeg_cpu_seconds",
+    "User plus system CPU time of each ffmpeg child process.",
+)
+FFMPEG_MAX_RSS_BYTES = metrics.histogram(
+    "viralcut_ffmpeg_max_rss_bytes",
+    "Peak resident set size of each ffmpeg child process.",
+    buckets=tuple(2**power * 1024**2 for power in range(4, 14)),
+)
+
+# Clip count from which one demux pass beats reopening the source per clip.
+SINGLE_PASS_MIN_CLIPS = int(os.environ.get("VIRALCUT_SINGLE_PASS_MIN_CLIPS", "6"))
+
+# Encoders able to produce a head GOP that can be concatenated with copied packets.
+_SMART_CUT_ENCODERS = {
+    "av1": "libsvtav1",
+    "h264": "libx264",
+    "hevc": "libx265",
+    "mpeg4": "mpeg4",
+    "vp9": "libvpx-vp9",
+}
+
+# ``-profile:v`` values of libx264 for the H.264 profiles ffprobe reports.
+_H264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+
+# Seconds the copied tail of a smart cut is seeked past its keyframe.
+_SPLICE_NUDGE = 0.001
+
+_NETWORK_FILESYSTEMS = frozenset(
+    {
+        "9p",
+        "afs",
+        "ceph",
+        "cifs",
+        "fuse.gcsfuse",
+        "fuse.rclone",
+        "fuse.s3fs",
+        "fuse.sshfs",
+        "glusterfs",
+        "lustre",
+        "nfs",
+        "nfs4",
+        "smb3",
+        "smbfs",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RenderProfile:
+    """How each clip is written.
+
+    Profiles without a frame size stream-copy the source. The others decode
+    the clip window, centre-crop it to the ``width``:``height`` aspect ratio,
+    scale it to that size and encode it with ``libx264``, optionally burning
+    in the clip transcript as captions.
+    """
+
+    name: str
+    width: int | None = None
+    height: int | None = None
+    captions: bool = False
+    preset: str = "veryfast"
+    crf: int = 23
+    audio_bitrate: str = "128k"
+
+    @property
+    def reencodes(self) -> bool:
+        """``True`` when clips are decoded and encoded rather than stream-copied."""
+
+        return self.width is not None and self.height is not None
+
+
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    profile.name: profile
+    for profile in (
+        RenderProfile("copy"),
+        RenderProfile("vertical-crop", width=1080, height=1920),
+        RenderProfile("vertical-crop-with-captions", width=1080, height=1920, captions=True),
+    )
+}
+
+
+def resolve_render_profile(profile: str | RenderProfile | None = None) -> RenderProfile:
+    """Return ``profile``, looking names up in ``RENDER_PROFILES``; ``None`` uses ``VIRALCUT_RENDER_PROFILE``."""
+
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = profile or os.environ.get("VIRALCUT_RENDER_PROFILE", "copy")
+    try:
+        return RENDER_PROFILES[name]
+    except KeyError:
+        raise ClipGenerationError(
+            f"Unknown render profile {name!r}; expected one of {', '.join(RENDER_PROFILES)}"
+        ) from None
+
+
+# Threads given to one encoder. Encoding clips side by side scales almost
+# linearly, while x264 gains little from more than ~8 threads on a short clip
+# and needs a couple for its lookahead to keep up.
+_ENCODER_MIN_THREADS = 2
+_ENCODER_MAX_THREADS = 8
+
+
+@dataclass(frozen=True, slots=True)
+class EncodePlan:
+    """How many clips are encoded at once and how many threads each encoder uses."""
+
+    concurrency: int
+    threads: int
+
+
+def plan_encodes(clips: int, cores: int = RENDER_CONCURRENCY) -> EncodePlan:
+    """Split ``cores`` between the encoders of ``clips`` clips to maximize clips per minute.
+
+    As many clips as possible are encoded at once while each encoder keeps at
+    least ``_ENCODER_MIN_THREADS`` threads; the remaining cores are spread over
+    them, up to ``_ENCODER_MAX_THREADS`` each. Encoders reserve their threads
+    from the process-wide ffmpeg budget, so concurrent requests queue instead
+    of oversubscribing the host.
+    """
+
+    cores = max(cores, 1)
+    concurrency = max(1, min(clips, cores // _ENCODER_MIN_THREADS))
+    threads = max(1, min(_ENCODER_MAX_THREADS, cores // concurrency))
+    return EncodePlan(concurrency=concurrency, threads=threads)
+
+
+# Words per caption cue; short cues stay readable on a phone screen.
+_CAPTION_WORDS = 6
+
+
+def _caption_cues(text: str, duration: float) -> list[tuple[float, float, str]]:
+    """Split ``text`` into cues spread over ``duration`` in proportion to their length.
+
+    Clips only carry their transcript text, not per-word timings, so cue
+    timing is an approximation that assumes a steady speaking rate.
+    """
+
+    words = text.split()
+    if not words or duration <= 0:
+        return []
+    chunks = [" ".join(words[index : index + _CAPTION_WORDS]) for index in range(0, len(words), _CAPTION_WORDS)]
+    total = sum(len(chunk) for chunk in chunks)
+    cues = []
+    elapsed = 0.0
+    for chunk in chunks:
+        end = elapsed + duration * len(chunk) / total
+        cues.append((elapsed, end, chunk))
+        elapsed = end
+    return cues
+
+
+def _ass_time(seconds: float) -> str:
+    centiseconds = round(seconds * 100)
+    hours, centiseconds = divmod(centiseconds, 360_000)
+    minutes, centiseconds = divmod(centiseconds, 6_000)
+    whole, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{whole:02d}.{centiseconds:02d}"
+
+
+def _write_captions(path: Path, text: str, duration: float, profile: RenderProfile) -> None:
+    """Write ``text`` as an ASS subtitle file styled for ``profile``'s frame."""
+
+    assert profile.width is not None and profile.height is not None
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {profile.width}",
+        f"PlayResY: {profile.height}",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, "
+        "Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, "
+        "MarginR, MarginV, Encoding",
+        f"Style: Default,Arial,{profile.height // 24},&H00FFFFFF,&H00FFFFFF,&H00000000,&H64000000,-1,0,0,0,100,100,"
+        f"0,0,1,4,0,2,{profile.width // 18},{profile.width // 18},{profile.height // 6},1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for start, end, cue in _caption_cues(text, duration):
+        cue = cue.replace("\\", "/").replace("{", "(").replace("}", ")")
+        lines.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{cue}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _reap(process: subprocess.Popen) -> int:
+    """Wait for ``process`` and record its CPU time and peak memory from ``rusage``."""
+
+    if not hasattr(os, "wait4"):  # pragma: no cover - non-POSIX platforms
+        return process.wait()
+
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    FFMPEG_CPU_SECONDS.observe(usage.ru_utime + usage.ru_stime)
+    # ``ru_maxrss`` is reported in kilobytes on Linux and in bytes on macOS.
+    FFMPEG_MAX_RSS_BYTES.observe(usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024))
+    return process.returncode
+
+
+def _run_ffmpeg(command: list[str], *, threads: int = 1, cwd: Path | None = None) -> None:
+    with _render_budget.reserve(threads), FFMPEG_ACTIVE.track_inprogress():
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=cwd)
+        except FileNotFoundError as exc:  # pragma: no cover - environment guard
+            FFMPEG_RUNS.inc(outcome="missing")
+            raise ClipGenerationError(
+                "ffmpeg is required to render clips. Please install it and ensure it is on your PATH."
+            ) from exc
+
+        with process.stderr:
+            stderr = process.stderr.read()
+        returncode = _reap(process)
+
+    if returncode != 0:
+        FFMPEG_RUNS.inc(outcome="failed")
+        raise ClipGenerationError(stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    FFMPEG_RUNS.inc(outcome="succeeded")
+
+
+def _clip_file(candidate: ClipCandidate, filename: Path) -> ClipFile:
+    return ClipFile(
+        start=candidate.start,
+        end=candidate.end,
+        score=candidate.score,
+        transcript=candidate.text,
+        path=filename,
+    )
+
+
+def _render_clip(source: Path, candidate: ClipCandidate, filename: Path) -> ClipFile:
+    duration = max(candidate.end - candidate.start, 0.1)
+    command = [
+        "ffmpeg",
+        "-y",
+        "-ss",
+        f"{candidate.start:.2f}",
+        "-i",
+        str(source),
+        "-t",
+        f"{duration:.2f}",
+        "-c",
+        "copy",
+        str(filename),
+    ]
+    _run_ffmpeg(command)
+    return _clip_file(candidate, filename)
+
+
+def _matching_encoder_args(stream: StreamParameters) -> list[str]:
+    """Return encoder options reproducing the parameters of ``stream`` that a splice must keep."""
+
+    arguments = ["-pix_fmt", stream.pix_fmt, "-s", f"{stream.width}x{stream.height}"]
+    _, _, timescale = stream.time_base.partition("/")
+    if timescale:
+        arguments += ["-video_track_timescale", timescale]
+    if stream.codec == "h264":
+        if stream.profile in _H264_PROFILES:
+            arguments += ["-profile:v", _H264_PROFILES[stream.profile]]
+        if stream.level > 0:
+            arguments += ["-level:v", f"{stream.level / 10:.1f}"]
+    elif stream.codec == "hevc":
+        if stream.profile:
+            arguments += ["-profile:v", stream.profile.lower().replace(" ", "")]
+        if stream.level > 0:
+            arguments += ["-x265-params", f"level-idc={stream.level / 30:.1f}"]
+    return arguments
+
+
+def _reencode_clip(
+    source: Path,
+    candidate: ClipCandidate,
+    filename: Path,
+    encoder: str,
+    threads: int,
+) -> ClipFile:
+    start = candidate.start
+    end = max(candidate.end, start + 0.1)
+    _run_ffmpeg(
+        [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            f"{start:.3f}",
+            "-i",
+            str(source),
+            "-t",
+            f"{end - start:.3f}",
+            "-c:v",
+            encoder,
+            "-threads",
+            str(threads),
+            "-c:a",
+            "copy",
+            str(filename),
+        ],
+        threads=threads,
+    )
+    return _clip_file(candidate, filename)
+
+
+def _render_smart_clip(
+    source: Path,
+    candidate: ClipCandidate,
+    filename: Path,
+    keyframes: KeyframeIndex,
+    stream: StreamParameters | None,
+    threads: int = 1,
+) -> ClipFile:
+    """Re-encode only the partial GOP before the first keyframe and copy the rest.
+
+    The head is encoded with the profile, level, pixel format, size and
+    timebase of the source ``stream`` and probed before it is concatenated
+    with the copied packets. Clips that already start on a keyframe are
+    stream-copied as-is; clips without an interior keyframe, in a codec we
+    cannot match, of unknown ``stream`` parameters or whose head does not
+    match them are re-encoded in full. Encodes run with ``threads`` threads,
+    reserved from the process-wide ffmpeg budget.
+    """
+
+    start = candidate.start
+    end = max(candidate.end, start + 0.1)
+    boundary = keyframes.following(start)
+    if boundary is not None and boundary - start < 0.01:
+        return _render_clip(source, candidate, filename)
+
+    encoder = _SMART_CUT_ENCODERS.get(keyframes.codec)
+    # The head stops short of the keyframe and the tail seeks just past it, so
+    # millisecond rounding can neither repeat the keyframe nor pull the copied
+    # tail back to the previous one.
+    seek = round(start, 3)
+    tail_start = round(boundary + _SPLICE_NUDGE, 3) if boundary is not None else end
+    if encoder is None or stream is None or tail_start >= end:
+        return _reencode_clip(source, candidate, filename, encoder or "libx264", threads)
+
+    head_seconds = math.floor((boundary - seek) * 1000) / 1000
+    with tempfile.TemporaryDirectory(dir=filename.parent, prefix=f".{filename.stem}-") as scratch:
+        head = Path(scratch) / "head.mp4"
+        tail = Path(scratch) / "tail.mp4"
+        parts = Path(scratch) / "parts.txt"
+        _run_ffmpeg(
+            [
+                "ffmpeg",
+                "-y",
+                "-ss",
+                f"{seek:.3f}",
+                "-i",
+                str(source),
+                "-t",
+                f"{head_seconds:.3f}",
+                "-c:v",
+                encoder,
+                *_matching_encoder_args(stream),
+                "-threads",
+                str(threads),
+                "-c:a",
+                "copy",
+                str(head),
+            ],
+            threads=threads,
+        )
+        try:
+            encoded: StreamParameters | None = probe_stream_parameters(head)
+        except KeyframeIndexError:
+            encoded = None
+        if encoded != stream:
+            LOGGER.warning(
+                "Head of %s was encoded as %s instead of %s; re-encoding the clip in full",
+                filename.name,
+                encoded,
+                stream,
+            )
+            return _reencode_clip(source, candidate, filename, encoder, threads)
+
+        _run_ffmpeg(
+            [
+                "ffmpeg",
+                "-y",
+                "-ss",
+                f"{tail_start:.3f}",
+                "-i",
+                str(source),
+                "-t",
+                f"{end - tail_start:.3f}",
+                "-c",
+                "copy",
+                str(tail),
+            ]
+        )
+        parts.write_text(f"file '{head}'\nfile '{tail}'\n", encoding="utf-8")
+        _run_ffmpeg(
+            ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(parts), "-c", "copy", str(filename)]
+        )
+
+    return _clip_file(candidate, filename)
+
+
+def _encode_clip(
+    source: Path,
+    offset: float,
+    candidate: ClipCandidate,
+    filename: Path,
+    profile: RenderProfile,
+    threads: int,
+) -> ClipFile:
+    """Encode ``candidate``, found ``offset`` seconds into ``source``, through ``profile``."""
+
+    width, height = profile.width, profile.height
+    duration = max(candidate.end - candidate.start, 0.1)
+    filters = [
+        f"crop='min(iw,ih*{width}/{height})':'min(ih,iw*{height}/{width})'",
+        f"scale={width}:{height}",
+        "setsar=1",
+    ]
+    with tempfile.TemporaryDirectory(dir=filename.parent, prefix=f".{filename.stem}-") as scratch:
+        if profile.captions and candidate.text.strip():
+            # Referenced relative to ffmpeg's working directory so the path needs no filtergraph escaping.
+            _write_captions(Path(scratch) / "captions.ass", candidate.text, duration, profile)
+            filters.append("subtitles=captions.ass")
+        _run_ffmpeg(
+            [
+                "ffmpeg",
+                "-y",
+                "-filter_threads",
+                str(threads),
+                "-threads",
+                str(threads),
+                "-ss",
+                f"{offset:.3f}",
+                "-i",
+                str(source.resolve()),
+                "-t",
+                f"{duration:.3f}",
+                "-vf",
+                ",".join(filters),
+                "-c:v",
+                "libx264",
+                "-preset",
+                profile.preset,
+                "-crf",
+                str(profile.crf),
+                "-threads",
+                str(threads),
+                "-pix_fmt",
+                "yuv420p",
+                "-c:a",
+                "aac",
+                "-b:a",
+                profile.audio_bitrate,
+                "-movflags",
+                "+faststart",
+                str(filename.resolve()),
+            ],
+            threads=threads,
+            cwd=Path(scratch),
+        )
+    return _clip_file(candidate, filename)
+
+
+def _encode_all(
+    jobs: list[tuple[int, Path, float, ClipCandidate, Path]],
+    profile: RenderProfile,
+    on_clip: ClipRendered | None,
+) -> dict[int, ClipFile]:
+    """Encode ``(position, source, offset, candidate, filename)`` jobs as planned by :func:`plan_encodes`."""
+
+    plan = plan_encodes(len(jobs))
+    LOGGER.info(
+        "Encoding %d clips with profile %s: %d at a time, %d threads each",
+        len(jobs),
+        profile.name,
+        plan.concurrency,
+        plan.threads,
+    )
+    with ThreadPoolExecutor(max_workers=plan.concurrency, thread_name_prefix="viralcut-encode") as executor:
+        futures = {
+            position: executor.submit(_encode_clip, source, offset, candidate, filename, profile, plan.threads)
+            for position, source, offset, candidate, filename in jobs
+        }
+        return _collect(futures, on_clip)
+
+
+def _collect(futures: dict[int, Future], on_clip: ClipRendered | None) -> dict[int, ClipFile]:
+    """Wait for the clip ``futures`` by position; the first failure cancels those not started."""
+
+    if on_clip is not None:
+        for index, future in futures.items():
+            future.add_done_callback(_notify_rendered(on_clip, index))
+    _, not_started = wait(futures.values(), return_when=FIRST_EXCEPTION)
+    for future in not_started:
+        future.cancel()
+
+    for future in futures.values():
+        if not future.cancelled() and future.exception() is not None:
+            raise future.exception()  # type: ignore[misc]
+    return {index: future.result() for index, future in futures.items()}
+
+
+def _filesystem_type(path: Path) -> str | None:
+    """Return the filesystem type of the mount holding ``path`` (Linux only)."""
+
+    try:
+        mounts = Path("/proc/mounts").read_text().splitlines()
+    except OSError:
+        return None
+
+    resolved = str(path.resolve())
+    best_mount = ""
+    best_type: str | None = None
+    for line in mounts:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        mount_point = fields[1].replace("\\040", " ")
+        prefix = mount_point.rstrip("/") + "/"
+        if (resolved == mount_point or resolved.startswith(prefix)) and len(mount_point) >= len(best_mount):
+            best_mount, best_type = mount_point, fields[2]
+    return best_type
+
+
+def _resolve_render_mode(source: Path, candidates: list[ClipCandidate], mode: str | None) -> str:
+    mode = mode or os.environ.get("VIRALCUT_RENDER_MODE", "auto")
+    if mode not in RENDER_MODES:
+        raise ClipGenerationError(f"Unknown render mode {mode!r}; expected one of {', '.join(RENDER_MODES)}")
+    if mode != "auto":
+        return mode
+    if len(candidates) < 2:
+        return "per-clip"
+    if len(candidates) >= SINGLE_PASS_MIN_CLIPS or _filesystem_type(source) in _NETWORK_FILESYSTEMS:
+        return "single-pass"
+    return "per-clip"
+
+
+def _render_single_pass(
+    source: Path,
+    candidates: list[ClipCandidate],
+    filenames: list[Path],
+) -> list[ClipFile]:
+    """Write every clip with one ``ffmpeg`` process instead of one per clip.
+
+    ``source`` is opened once per clip with the seek on that input, so each
+    output starts on the keyframe a per-clip stream copy would start at and
+    only the clip windows are read.
+    """
+
+    command = ["ffmpeg", "-y"]
+    for candidate in candidates:
+        duration = max(candidate.end - candidate.start, 0.1)
+        command += ["-ss", f"{candidate.start:.2f}", "-t", f"{duration:.2f}", "-i", str(source)]
+    for position, filename in enumerate(filenames):
+        command += ["-map", str(position), "-c", "copy", str(filename)]
+    _run_ffmpeg(command)
+
+    return [_clip_file(candidate, filename) for candidate, filename in zip(candidates, filenames)]
+
+
+def _notify_rendered(on_clip: ClipRendered, index: int):
+    def callback(future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            on_clip(index, future.result())
+
+    return callback
+
+
 def render_clips(
     source: Path,
     candidates: list[ClipCandidate],
     output_dir: Path,
+    *,
+    mode: str | None = None,
+    smart_cut: bool = False,
+    on_clip: ClipRendered | None = None,
+    reuse: Mapping[int, ClipFile] | None = None,
+    profile: str | RenderProfile | None = None,
 ) -> list[ClipFile]:
     """Render ``candidates`` from ``source`` video into ``output_dir``.
 
+    In ``per-clip`` mode clips are rendered concurrently, bounded by a
+    process-wide budget of ``RENDER_CONCURRENCY`` ``ffmpeg`` processes
+    (``VIRALCUT_RENDER_CONCURRENCY``, defaulting to the available cores). The
+    first failure cancels the clips that have not started yet and is raised
+    as :class:`ClipGenerationError`. ``single-pass`` mode writes all clips from
+    one ``ffmpeg`` invocation instead. ``auto`` (the default, overridable with
+    ``VIRALCUT_RENDER_MODE``) picks single-pass for at least
+    ``SINGLE_PASS_MIN_CLIPS`` clips or when ``source`` is on a network mount.
+    ``smart_cut`` renders each clip frame-accurately by re-encoding only the
+    partial GOP at its head (see :func:`_render_smart_clip`); it always uses
+    per-clip rendering.
+
+    Profiles that re-encode (see ``RENDER_PROFILES``) cut every clip exactly,
+    so ``mode`` and ``smart_cut`` do not apply; their encoders are scheduled
+    by :func:`plan_encodes`.
+
     Parameters
     ----------
     source:
@@ -27,48 +693,126 @@ def render_clips(
         Clip candidates already sorted in the desired delivery order.
     output_dir:
         Directory that will receive the generated MP4 files.
+    mode:
+        One of ``RENDER_MODES``; ``None`` uses ``VIRALCUT_RENDER_MODE``.
+    smart_cut:
+        Cut exactly at the candidate start instead of the preceding keyframe.
+    on_clip:
+        Called with the 1-based position and :class:`ClipFile` of each clip as
+        soon as it is written, possibly from a worker thread and out of order.
+        A single pass writes all clips together, so it is called for each of
+        them once the whole pass has finished.
+    reuse:
+        Clips already on disk, keyed by 1-based position. They are returned
+        as-is, without rendering and without calling ``on_clip``.
+    profile:
+        A :class:`RenderProfile` or the name of one in ``RENDER_PROFILES``;
+        ``None`` uses ``VIRALCUT_RENDER_PROFILE`` (default ``copy``).
+
+    Returns
+    -------
+    list[ClipFile]
+        Rendered clips in the same order as ``candidates``.
     """
 
+    profile = resolve_render_profile(profile)
     output_dir.mkdir(parents=True, exist_ok=True)
+    reuse = reuse or {}
+    positions = [index for index in range(1, len(candidates) + 1) if index not in reuse]
+    if not positions:
+        return [reuse[index] for index in range(1, len(candidates) + 1)]
 
-    rendered: list[ClipFile] = []
-    for index, candidate in enumerate(candidates, start=1):
-        filename = output_dir / f"clip_{index:02d}.mp4"
-        duration = max(candidate.end - candidate.start, 0.1)
-        command = [
-            "ffmpeg",
-            "-y",
-            "-ss",
-            f"{candidate.start:.2f}",
-            "-i",
-            str(source),
-            "-t",
-            f"{duration:.2f}",
-            "-c",
-            "copy",
-            str(filename),
+    pending = [candidates[index - 1] for index in positions]
+    filenames = [output_dir / f"clip_{index:02d}.mp4" for index in positions]
+    if profile.reencodes:
+        jobs = [
+            (index, source, candidate.start, candidate, filename)
+            for index, candidate, filename in zip(positions, pending, filenames)
         ]
-
+        return _in_order(candidates, reuse, _encode_all(jobs, profile, on_clip))
+    if smart_cut:
         try:
-            subprocess.run(command, check=True, capture_output=True)
-        except FileNotFoundError as exc:  # pragma: no cover - environment guard
-            raise ClipGenerationError(
-                "ffmpeg is required to render clips. Please install it and ensure it is on your PATH."
-            ) from exc
-        except subprocess.CalledProcessError as exc:  # pragma: no cover - passthrough
-            raise ClipGenerationError(exc.stderr.decode().strip() or "ffmpeg failed") from exc
-
-        rendered.append(
-            ClipFile(
-                start=candidate.start,
-                end=candidate.end,
-                score=candidate.score,
-                transcript=candidate.text,
-                path=filename,
-            )
-        )
+            keyframes = load_keyframe_index(source)
+        except KeyframeIndexError as exc:
+            raise ClipGenerationError(str(exc)) from exc
+        try:
+            stream = probe_stream_parameters(source)
+        except KeyframeIndexError as exc:
+            LOGGER.warning("Smart cuts of %s will be re-encoded in full: %s", source.name, exc)
+            stream = None
+    elif _resolve_render_mode(source, pending, mode) == "single-pass":
+        rendered = _render_single_pass(source, pending, filenames)
+        if on_clip is not None:
+            for index, clip in zip(positions, rendered):
+                on_clip(index, clip)
+        return _in_order(candidates, reuse, dict(zip(positions, rendered)))
+
+    workers = min(len(pending), RENDER_CONCURRENCY)
+    # Smart cuts encode the head GOP (or the whole clip); size their encoders like a profile encode.
+    threads = plan_encodes(len(pending)).threads
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="viralcut-render") as executor:
+        futures = {
+            index: executor.submit(_render_smart_clip, source, candidate, filename, keyframes, stream, threads)
+            if smart_cut
+            else executor.submit(_render_clip, source, candidate, filename)
+            for index, candidate, filename in zip(positions, pending, filenames)
+        }
+        rendered = _collect(futures, on_clip)
+
+    return _in_order(candidates, reuse, rendered)
+
 
-    return rendered
+def render_sections(
+    sections: Mapping[int, tuple[Path, ClipCandidate]],
+    output_dir: Path,
+    *,
+    profile: str | RenderProfile | None = None,
+    on_clip: ClipRendered | None = None,
+) -> dict[int, ClipFile]:
+    """Turn downloaded sections, each holding exactly one clip window, into clips.
+
+    ``sections`` maps 1-based positions to the section file and its
+    candidate. With a stream-copy profile each file is simply moved to its
+    clip name in ``output_dir``; otherwise it is encoded through ``profile``
+    like :func:`render_clips` would and the section file is removed.
+    ``on_clip`` is called as each clip is written.
+    """
+
+    profile = resolve_render_profile(profile)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    filenames = {index: output_dir / f"clip_{index:02d}.mp4" for index in sections}
+    if not profile.reencodes:
+        clips = {}
+        for index, (path, candidate) in sections.items():
+            clips[index] = _clip_file(candidate, path.replace(filenames[index]))
+            if on_clip is not None:
+                on_clip(index, clips[index])
+        return clips
+
+    jobs = [(index, path, 0.0, candidate, filenames[index]) for index, (path, candidate) in sections.items()]
+    clips = _encode_all(jobs, profile, on_clip)
+    for path, _ in sections.values():
+        path.unlink(missing_ok=True)
+    return clips
+
+
+def _in_order(
+    candidates: list[ClipCandidate],
+    reused: Mapping[int, ClipFile],
+    rendered: Mapping[int, ClipFile],
+) -> list[ClipFile]:
+    return [reused.get(index) or rendered[index] for index in range(1, len(candidates) + 1)]
 
 
-__all__ = ["ClipGenerationError", "render_clips"]
+__all__ = [
+    "ClipGenerationError",
+    "EncodePlan",
+    "RENDER_CONCURRENCY",
+    "RENDER_MODES",
+    "RENDER_PROFILES",
+    "RenderProfile",
+    "plan_encodes",
+    "render_clips",
+    "render_sections",
+    "resolve_render_profile",
+]
@@ -0,0 +1,193 @@
+"""Single-flight execution and result caching for identical pipeline requests."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable
+
+from .models import PipelineEvent, PipelineResult, ProgressCallback
+from .pipeline import _extract_video_id
+
+LOGGER = logging.getLogger(__name__)
+
+# Parameters that change which clips are produced; everything else is ignored in the key.
+_KEY_PARAMETERS = ("clip_length", "max_clips", "step", "min_gap", "sections_only", "smart_cut", "profile", "audio")
+
+RequestKey = tuple[Any, ...]
+
+_MISSING = (-1, -1)
+
+
+class PipelineCoalescer:
+    """Deduplicate concurrent pipeline runs and cache their results.
+
+    Requests are keyed by the video id and the parameters in
+    ``_KEY_PARAMETERS``. While a run for a key is in flight, every other caller
+    with the same key waits for that run instead of starting its own. Finished
+    results are kept in a bounded LRU cache and served again as long as every
+    clip file is still on disk unchanged. Progress callbacks of every caller
+    sharing a run receive that run's events from the moment they join. Each
+    key renders into its own
+    ``<output_root>/<video_id>/<digest>`` directory so differently configured
+    requests never overwrite each other's clips.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., PipelineResult],
+        *,
+        output_root: Path = Path("output"),
+        max_entries: int = 256,
+    ) -> None:
+        self.runner = runner
+        self._defaults = {
+            name: parameter.default
+            for name, parameter in inspect.signature(runner).parameters.items()
+            if parameter.default is not inspect.Parameter.empty
+        }
+        self.output_root = output_root
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._in_flight: dict[RequestKey, Future[PipelineResult]] = {}
+        self._listeners: dict[RequestKey, list[ProgressCallback]] = {}
+        self._results: OrderedDict[RequestKey, tuple[PipelineResult, list[tuple[int, int]]]] = OrderedDict()
+
+    def run(
+        self,
+        video_url: str,
+        *,
+        progress: ProgressCallback | None = None,
+        **kwargs: Any,
+    ) -> PipelineResult:
+        """Return the result for ``video_url``, sharing any identical in-flight run."""
+
+        key = self._key(video_url, kwargs)
+        future, leader = self._join(key, progress)
+        if leader:
+            self._lead(future, key, video_url, kwargs)
+        return future.result()
+
+    async def run_async(
+        self,
+        video_url: str,
+        *,
+        progress: ProgressCallback | None = None,
+        **kwargs: Any,
+    ) -> PipelineResult:
+        """Async variant of :meth:`run`; waiting callers do not occupy a thread."""
+
+        key = self._key(video_url, kwargs)
+        future, leader = self._join(key, progress)
+        if leader:
+            await asyncio.to_thread(self._lead, future, key, video_url, kwargs)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, int]:
+        """Return cache hit/miss and coalescing counters."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "entries": len(self._results),
+                "in_flight": len(self._in_flight),
+            }
+
+    def _key(self, video_url: str, kwargs: dict[str, Any]) -> RequestKey:
+        return (
+            _extract_video_id(video_url),
+            *(kwargs.get(name, self._defaults.get(name)) for name in _KEY_PARAMETERS),
+        )
+
+    def _join(
+        self,
+        key: RequestKey,
+        progress: ProgressCallback | None,
+    ) -> tuple[Future[PipelineResult], bool]:
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                result, fingerprint = cached
+                if _MISSING not in fingerprint and _fingerprint(result) == fingerprint:
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    future: Future[PipelineResult] = Future()
+                    future.set_result(result)
+                    return future, False
+                del self._results[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                if progress is not None:
+                    self._listeners[key].append(progress)
+                self.coalesced += 1
+                LOGGER.info("Joining in-flight pipeline run for %s", key[0])
+                return in_flight, False
+
+            self.misses += 1
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            self._listeners[key] = [progress] if progress is not None else []
+            return future, True
+
+    def _lead(
+        self,
+        future: Future[PipelineResult],
+        key: RequestKey,
+        video_url: str,
+        kwargs: dict[str, Any],
+    ) -> None:
+        digest = hashlib.sha256(repr(key[1:]).encode("utf-8")).hexdigest()[:12]
+        kwargs = {"working_dir": self.output_root / key[0] / digest, **kwargs}
+
+        def broadcast(event: PipelineEvent) -> None:
+            with self._lock:
+                listeners = list(self._listeners.get(key, ()))
+            for listener in listeners:
+                listener(event)
+
+        try:
+            result = self.runner(video_url, progress=broadcast, **kwargs)
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[key]
+                del self._listeners[key]
+            future.set_exception(exc)
+            return
+
+        with self._lock:
+            del self._in_flight[key]
+            del self._listeners[key]
+            self._results[key] = (result, _fingerprint(result))
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        future.set_result(result)
+
+
+def _fingerprint(result: PipelineResult) -> list[tuple[int, int]]:
+    """Return ``(size, mtime_ns)`` of every clip file, with ``_MISSING`` for missing ones."""
+
+    fingerprint: list[tuple[int, int]] = []
+    for clip in result.clips:
+        try:
+            stat = clip.path.stat()
+        except OSError:
+            fingerprint.append(_MISSING)
+        else:
+            fingerprint.append((stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+__all__ = ["PipelineCoalescer"]
@@ -2,15 +2,71 @@
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
+
+from . import locks, metrics
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FORMAT = "bv*+ba/best"
+
+# Files kept next to a stored source that are not the source itself.
+_SIDECAR_SUFFIXES = frozenset({".json", ".tmp"})
+
+# Minimum seconds between two forwarded yt-dlp progress updates.
+_PROGRESS_INTERVAL = 0.5
+
+DownloadProgress = Callable[[dict[str, Any]], None]
+
+# Staging directories older than this are leftovers from crashed downloads.
+_STALE_STAGING_SECONDS = 6 * 3600
+
+# Protocols yt-dlp hands to its ffmpeg downloader for ``download_ranges``;
+# formats served any other way can only be downloaded in full.
+_SECTION_PROTOCOLS = frozenset({"http", "https", "m3u8", "m3u8_native", "http_dash_segments"})
+
+# yt-dlp's error when the ffmpeg process cutting the ranges fails.
+_SECTION_FFMPEG_FAILURE = "ffmpeg exited with code"
+
+
+DOWNLOADED_BYTES = metrics.counter(
+    "viralcut_downloaded_bytes_total",
+    "Bytes of video written by yt-dlp.",
+    ("mode",),
+)
+DOWNLOAD_SECONDS = metrics.histogram(
+    "viralcut_download_seconds",
+    "Wall-clock time of each yt-dlp download.",
+    ("mode",),
+)
 
 
 class DownloadError(RuntimeError):
     """Raised when a video cannot be downloaded."""
 
 
-def download_video(video_url: str, output_dir: Path) -> Path:
+class SectionDownloadUnsupported(DownloadError):
+    """Raised when only a full download is possible for a video."""
+
+
+def download_video(
+    video_url: str,
+    output_dir: Path,
+    *,
+    fmt: str = DEFAULT_FORMAT,
+    cancel: threading.Event | None = None,
+    progress: DownloadProgress | None = None,
+) -> Path:
     """Download the best available MP4 for ``video_url``.
 
     Parameters
@@ -19,6 +75,14 @@ def download_video(video_url: str, output_dir: Path) -> Path:
         The YouTube video URL to download.
     output_dir:
         Directory where the resulting video file should be placed.
+    fmt:
+        yt-dlp format selection expression.
+    cancel:
+        Optional event; once set, the transfer is aborted at the next progress
+        update and :class:`DownloadError` is raised.
+    progress:
+        Optional callable receiving ``downloaded_bytes``, ``total_bytes``,
+        ``speed`` and ``eta`` at most every half second.
 
     Returns
     -------
@@ -36,16 +100,26 @@ def download_video(video_url: str, output_dir: Path) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
 
     ydl_opts: dict[str, Any] = {
-        "format": "bv*+ba/best",
+        "format": fmt,
         "merge_output_format": "mp4",
         "noplaylist": True,
         "quiet": True,
         "outtmpl": str(output_dir / "%(id)s.%(ext)s"),
     }
+    hooks: list[Callable[[dict[str, Any]], None]] = []
+    if cancel is not None:
+        hooks.append(_cancellation_hook(cancel, yt_dlp.utils.DownloadCancelled))
+    if progress is not None:
+        hooks.append(_progress_hook(progress))
+    if hooks:
+        ydl_opts["progress_hooks"] = hooks
 
+    started = time.perf_counter()
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(video_url, download=True)
+    except yt_dlp.utils.DownloadCancelled as exc:
+        raise DownloadError("Video download was cancelled") from exc
     except yt_dlp.utils.DownloadError as exc:  # pragma: no cover - passthrough
         raise DownloadError(str(exc)) from exc
 
@@ -58,7 +132,470 @@ def download_video(video_url: str, output_dir: Path) -> Path:
     if not path.exists():
         raise DownloadError("Video download did not produce an MP4 file")
 
+    DOWNLOAD_SECONDS.observe(time.perf_counter() - started, mode="full")
+    DOWNLOADED_BYTES.inc(path.stat().st_size, mode="full")
     return path
 
 
-__all__ = ["DownloadError", "download_video"]
+def _cancellation_hook(cancel: threading.Event, cancelled: type[Exception]):
+    """Return a yt-dlp progress hook that aborts the transfer once ``cancel`` is set."""
+
+    def hook(_: dict[str, Any]) -> None:
+        if cancel.is_set():
+            raise cancelled("Download cancelled")
+
+    return hook
+
+
+def _progress_hook(progress: DownloadProgress) -> Callable[[dict[str, Any]], None]:
+    """Return a yt-dlp progress hook forwarding throttled byte counts to ``progress``."""
+
+    last_sent = 0.0
+
+    def hook(status: dict[str, Any]) -> None:
+        nonlocal last_sent
+        now = time.monotonic()
+        finished = status.get("status") == "finished"
+        if not finished and now - last_sent < _PROGRESS_INTERVAL:
+            return
+        last_sent = now
+        progress(
+            {
+                "downloaded_bytes": status.get("downloaded_bytes"),
+                "total_bytes": status.get("total_bytes") or status.get("total_bytes_estimate"),
+                "speed": status.get("speed"),
+                "eta": status.get("eta"),
+                "finished": finished,
+            }
+        )
+
+    return hook
+
+
+def download_sections(
+    video_url: str,
+    output_dir: Path,
+    sections: list[tuple[float, float]],
+    *,
+    fmt: str = DEFAULT_FORMAT,
+) -> list[Path]:
+    """Download only ``sections`` of ``video_url``, one file per ``(start, end)`` pair.
+
+    Uses yt-dlp's ``download_ranges`` support with keyframes forced at the cut
+    points. The video is extracted first, so formats whose protocol cannot
+    be cut into ranges are detected before anything is downloaded. Returns
+    paths in the same order as ``sections``.
+
+    Raises
+    ------
+    SectionDownloadUnsupported
+        When yt-dlp, ``ffmpeg`` or the selected format cannot perform ranged
+        downloads, so the caller can fall back to :func:`download_video`.
+    DownloadError
+        When the video cannot be downloaded at all, for example because it is
+        private, removed, geo-blocked or the network failed.
+    """
+
+    try:
+        import yt_dlp
+        from yt_dlp.utils import download_range_func
+    except ModuleNotFoundError as exc:  # pragma: no cover - environment guard
+        raise DownloadError(
+            "The 'yt-dlp' package is required to download videos. Install it with 'pip install yt-dlp'."
+        ) from exc
+    except ImportError as exc:  # pragma: no cover - old yt-dlp releases
+        raise SectionDownloadUnsupported("Installed yt-dlp does not support section downloads") from exc
+
+    if shutil.which("ffmpeg") is None:
+        raise SectionDownloadUnsupported("ffmpeg is required to download video sections")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    ydl_opts: dict[str, Any] = {
+        "format": fmt,
+        "merge_output_format": "mp4",
+        "noplaylist": True,
+        "quiet": True,
+        "outtmpl": str(output_dir / "%(id)s.%(section_start)s-%(section_end)s.%(ext)s"),
+        "download_ranges": download_range_func(None, [tuple(section) for section in sections]),
+        "force_keyframes_at_cuts": True,
+    }
+
+    started = time.perf_counter()
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        try:
+            info = ydl.extract_info(video_url, download=False)
+        except yt_dlp.utils.DownloadError as exc:  # pragma: no cover - passthrough
+            raise DownloadError(str(exc)) from exc
+
+        protocols = {
+            protocol
+            for selected in info.get("requested_formats") or [info]
+            for protocol in str(selected.get("protocol") or "https").split("+")
+        }
+        if not protocols <= _SECTION_PROTOCOLS:
+            raise SectionDownloadUnsupported(
+                f"Format protocol {'+'.join(sorted(protocols - _SECTION_PROTOCOLS))} cannot be downloaded in sections"
+            )
+
+        try:
+            info = ydl.process_ie_result(info, download=True)
+        except yt_dlp.utils.DownloadError as exc:  # pragma: no cover - passthrough
+            if _SECTION_FFMPEG_FAILURE in str(exc):
+                raise SectionDownloadUnsupported(f"ffmpeg could not cut the sections: {exc}") from exc
+            raise DownloadError(str(exc)) from exc
+    DOWNLOAD_SECONDS.observe(time.perf_counter() - started, mode="sections")
+
+    by_start: dict[float, Path] = {}
+    for download in info.get("requested_downloads") or []:
+        filepath = download.get("filepath")
+        section_start = download.get("section_start")
+        if filepath and section_start is not None and Path(filepath).exists():
+            by_start[round(float(section_start), 2)] = Path(filepath)
+
+    paths = [by_start.get(round(float(start), 2)) for start, _ in sections]
+    if any(path is None for path in paths):
+        raise SectionDownloadUnsupported("yt-dlp did not report a file for every requested section")
+
+    resolved = [path for path in paths if path is not None]
+    DOWNLOADED_BYTES.inc(sum(path.stat().st_size for path in resolved), mode="sections")
+    return resolved
+
+
+def list_playlist(playlist_url: str) -> list[str]:
+    """Return the watch URLs of every video in ``playlist_url``, in playlist order.
+
+    Only the playlist page is fetched (``extract_flat``), so listing a channel
+    back-catalog does not resolve each video's formats.
+    """
+
+    try:
+        import yt_dlp
+    except ModuleNotFoundError as exc:  # pragma: no cover - environment guard
+        raise DownloadError(
+            "The 'yt-dlp' package is required to list playlists. Install it with 'pip install yt-dlp'."
+        ) from exc
+
+    ydl_opts: dict[str, Any] = {"extract_flat": "in_playlist", "quiet": True, "skip_download": True}
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(playlist_url, download=False)
+    except yt_dlp.utils.DownloadError as exc:  # pragma: no cover - passthrough
+        raise DownloadError(str(exc)) from exc
+
+    urls: list[str] = []
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue
+        video_id = entry.get("id")
+        if video_id:
+            urls.append(f"https://www.youtube.com/watch?v={video_id}")
+        elif entry.get("url"):
+            urls.append(entry["url"])
+    if not urls:
+        raise DownloadError("Playlist does not contain any videos")
+    return urls
+
+
+class DownloadStore:
+    """Shared, quota-bounded store of downloaded source videos.
+
+    Each entry lives in ``<root>/<key>/`` where ``key`` hashes the video id and
+    the yt-dlp format selection. Downloads run inside ``<root>/.staging`` and
+    the finished directory is renamed into place, so an entry directory only
+    ever exists once its file is complete. Entries are evicted least recently
+    used first whenever the store grows beyond ``quota_bytes``; entries leased
+    by a running job are never evicted.
+
+    Several worker processes may share one store: downloads of the same key
+    are serialized through a file lock, and leases are shared file locks that
+    eviction in any process respects.
+    """
+
+    def __init__(self, root: Path, *, quota_bytes: int = 20 * 1024**3) -> None:
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._leases: Counter[str] = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "DownloadStore":
+        """Build a store configured through ``VIRALCUT_DOWNLOAD_STORE_*`` variables."""
+
+        return cls(
+            Path(os.environ.get("VIRALCUT_DOWNLOAD_STORE_DIR", "output/.cache/downloads")),
+            quota_bytes=int(float(os.environ.get("VIRALCUT_DOWNLOAD_STORE_QUOTA_MB", "20480")) * 1024**2),
+        )
+
+    @staticmethod
+    def key_for(video_id: str, fmt: str = DEFAULT_FORMAT) -> str:
+        """Return the content key used for ``video_id`` downloaded with ``fmt``."""
+
+        return hashlib.sha256(f"{video_id}\0{fmt}".encode("utf-8")).hexdigest()[:24]
+
+    def lookup(self, video_id: str, fmt: str = DEFAULT_FORMAT) -> Path | None:
+        """Return the stored file for ``video_id`` if a complete copy exists."""
+
+        entry = self.root / self.key_for(video_id, fmt)
+        try:
+            candidates = sorted(
+                child
+                for child in entry.iterdir()
+                if child.is_file() and child.suffix not in _SIDECAR_SUFFIXES
+            )
+        except OSError:
+            return None
+
+        for candidate in candidates:
+            try:
+                os.utime(candidate)
+            except OSError:  # pragma: no cover - evicted concurrently
+                return None
+            return candidate
+        return None
+
+    def fetch(
+        self,
+        video_url: str,
+        video_id: str,
+        fmt: str = DEFAULT_FORMAT,
+        *,
+        cancel: threading.Event | None = None,
+        progress: DownloadProgress | None = None,
+    ) -> Path:
+        """Return a complete local copy of ``video_url``, downloading it if needed."""
+
+        key = self.key_for(video_id, fmt)
+        with self._key_lock(key), self._file_lock("fetch", key):
+            existing = self.lookup(video_id, fmt)
+            if existing is not None:
+                LOGGER.info("Reusing stored download for %s", video_id)
+                with self._lock:
+                    self.hits += 1
+                return existing
+            with self._lock:
+                self.misses += 1
+
+            staging_root = self.root / ".staging"
+            staging_root.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=f"{key}-", dir=staging_root))
+            try:
+                downloaded = download_video(
+                    video_url,
+                    staging,
+                    fmt=fmt,
+                    cancel=cancel,
+                    progress=progress,
+                )
+                for leftover in staging.iterdir():
+                    if leftover != downloaded:
+                        _remove(leftover)
+
+                self._install(staging, key, video_id, fmt)
+            finally:
+                if staging.exists():
+                    shutil.rmtree(staging, ignore_errors=True)
+
+            path = self.lookup(video_id, fmt)
+            if path is None:  # pragma: no cover - evicted between rename and lookup
+                raise DownloadError("Video download did not produce an MP4 file")
+
+        self.evict(keep=key)
+        return path
+
+    def _install(self, staging: Path, key: str, video_id: str, fmt: str) -> None:
+        """Rename the finished ``staging`` directory to entry ``key``; call with the fetch locks held.
+
+        An entry directory without a complete file, such as one left behind by
+        a crash or copied in by hand, is removed and the rename retried.
+        """
+
+        entry = self.root / key
+        try:
+            os.rename(staging, entry)
+            return
+        except OSError as exc:
+            if self.lookup(video_id, fmt) is not None:
+                return
+            if not os.path.lexists(entry):
+                raise DownloadError(f"Unable to store the download of {video_id}: {exc}") from exc
+            LOGGER.warning("Replacing incomplete stored download %s: %s", entry, exc)
+        _remove(entry)
+        try:
+            os.rename(staging, entry)
+        except OSError as exc:
+            raise DownloadError(f"Unable to store the download of {video_id}: {exc}") from exc
+
+    @contextmanager
+    def hold(self, video_id: str, fmt: str = DEFAULT_FORMAT) -> Iterator[None]:
+        """Protect the entry for ``video_id`` from eviction for the duration of the block."""
+
+        key = self.key_for(video_id, fmt)
+        with self._lock:
+            self._leases[key] += 1
+        try:
+            with self._file_lock("lease", key, shared=True):
+                yield
+        finally:
+            with self._lock:
+                self._leases[key] -= 1
+                if self._leases[key] <= 0:
+                    del self._leases[key]
+
+    @contextmanager
+    def lease(self, video_url: str, video_id: str, fmt: str = DEFAULT_FORMAT) -> Iterator[Path]:
+        """Fetch ``video_url`` and protect its entry from eviction while in use."""
+
+        with self.hold(video_id, fmt):
+            yield self.fetch(video_url, video_id, fmt)
+
+    def evict(self, *, keep: str | None = None) -> list[Path]:
+        """Remove least recently used entries until the store fits its quota.
+
+        Leased entries and the entry named ``keep`` are skipped.
+        """
+
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        if not self.root.exists():
+            return []
+
+        for entry in self.root.iterdir():
+            if entry.name == ".staging":
+                self._purge_stale_staging(entry)
+                continue
+            if not entry.is_dir():
+                continue
+            size, last_used = _usage(entry)
+            entries.append((last_used, size, entry))
+            total += size
+
+        evicted: list[Path] = []
+        entries.sort()
+        with self._lock:
+            for _, size, entry in entries:
+                if total <= self.quota_bytes:
+                    break
+                if entry.name == keep or self._leases.get(entry.name):
+                    continue
+                if not self._remove_unleased(entry.name):
+                    continue
+                total -= size
+                evicted.append(entry)
+                LOGGER.info("Evicted stored download %s (%d bytes)", entry.name, size)
+
+        return evicted
+
+    def entries(self) -> list[tuple[str, int, float]]:
+        """Return ``(key, size_in_bytes, last_used)`` for every complete entry."""
+
+        if not self.root.exists():
+            return []
+        entries = []
+        for entry in self.root.iterdir():
+            if entry.name == ".staging" or not entry.is_dir():
+                continue
+            size, last_used = _usage(entry)
+            entries.append((entry.name, size, last_used))
+        return entries
+
+    def discard(self, key: str) -> bool:
+        """Remove the entry ``key`` unless a running job holds it; return whether it was removed."""
+
+        with self._lock:
+            if self._leases.get(key) or not self._remove_unleased(key):
+                return False
+        LOGGER.info("Discarded stored download %s", key)
+        return True
+
+    def _remove_unleased(self, key: str) -> bool:
+        """Delete entry ``key`` unless another process leases it; call with ``_lock`` held."""
+
+        lease = self._file_lock("lease", key)
+        if not lease.acquire(blocking=False):
+            return False
+        try:
+            shutil.rmtree(self.root / key, ignore_errors=True)
+        finally:
+            lease.release()
+        return True
+
+    def _purge_stale_staging(self, staging_root: Path) -> None:
+        cutoff = time.time() - _STALE_STAGING_SECONDS
+        for staging in staging_root.iterdir():
+            try:
+                if staging.stat().st_mtime < cutoff:
+                    shutil.rmtree(staging, ignore_errors=True)
+            except OSError:  # pragma: no cover - removed concurrently
+                continue
+
+    def stats(self) -> dict[str, int]:
+        """Return how often :meth:`fetch` reused a stored file or had to download."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _file_lock(self, kind: str, key: str, *, shared: bool = False) -> locks.FileLock:
+        return locks.FileLock(
+            locks.lock_path(f"download-{kind}", f"{self.root.resolve()}\0{key}"),
+            shared=shared,
+        )
+
+
+def _usage(entry: Path) -> tuple[int, float]:
+    """Return ``(size_in_bytes, last_used_timestamp)`` for a store entry."""
+
+    size = 0
+    last_used = 0.0
+    for child in entry.iterdir():
+        try:
+            stat = child.stat()
+        except OSError:  # pragma: no cover - removed concurrently
+            continue
+        size += stat.st_size
+        last_used = max(last_used, stat.st_mtime)
+    return size, last_used
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+_store: DownloadStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_download_store() -> DownloadStore:
+    """Return the process-wide download store, creating it on first use."""
+
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = DownloadStore.from_env()
+        return _store
+
+
+metrics.register_cache("download", lambda: get_download_store().stats())
+
+
+__all__ = [
+    "DEFAULT_FORMAT",
+    "DownloadError",
+    "DownloadStore",
+    "SectionDownloadUnsupported",
+    "download_sections",
+    "download_video",
+    "get_download_store",
+    "list_playlist",
+]
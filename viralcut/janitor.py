@@ -0,0 +1,317 @@
+"""Background housekeeping that keeps ``output/`` within a disk quota and age limit."""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+from . import locks, metrics
+from .checkpoint import MANIFEST_NAME
+from .downloader import DownloadStore, get_download_store
+
+LOGGER = logging.getLogger(__name__)
+
+OUTPUT_BYTES = metrics.gauge(
+    "viralcut_output_bytes",
+    "Bytes used by working directories and stored downloads at the last janitor pass.",
+)
+EVICTIONS = metrics.counter(
+    "viralcut_janitor_evictions_total",
+    "Working directories and stored downloads removed by the janitor.",
+    ("kind", "reason"),
+)
+
+_leases: Counter[Path] = Counter()
+_last_used: dict[Path, float] = {}
+_registry_lock = threading.Lock()
+
+
+def _working_dir_lock(key: Path) -> locks.FileLock:
+    return locks.FileLock(locks.lock_path("workdir", str(key)))
+
+
+@contextmanager
+def hold_working_dir(path: Path) -> Iterator[None]:
+    """Own the working directory ``path`` for the duration of the block.
+
+    Only one holder at a time, in any process sharing the lock directory, may
+    own a working directory; others wait here. Owned directories are never
+    removed by the janitor.
+    """
+
+    key = path.resolve()
+    lock = _working_dir_lock(key)
+    if not lock.acquire(blocking=False):
+        LOGGER.info("Waiting for another worker to finish with %s", path)
+        lock.acquire()
+    try:
+        with _registry_lock:
+            _leases[key] += 1
+        try:
+            yield
+        finally:
+            with _registry_lock:
+                _leases[key] -= 1
+                if _leases[key] <= 0:
+                    del _leases[key]
+                _last_used[key] = time.time()
+    finally:
+        lock.release()
+
+
+def mark_used(path: Path) -> None:
+    """Record that the working directory ``path`` was just read, e.g. a clip was served.
+
+    The directory's mtime is touched as well, so janitors of other worker
+    processes see the access.
+    """
+
+    with _registry_lock:
+        _last_used[path.resolve()] = time.time()
+    try:
+        os.utime(path)
+    except OSError:  # pragma: no cover - removed concurrently
+        pass
+
+
+@dataclass(slots=True)
+class _Entry:
+    kind: str
+    path: Path
+    size: int
+    last_used: float
+    remove: Callable[[], bool]
+
+
+class OutputJanitor:
+    """Periodically evict working directories and stored downloads.
+
+    A working directory is any directory below ``root`` holding a ``clips``
+    directory or a checkpoint manifest. Together with the entries of the
+    :class:`DownloadStore` they are removed least recently used first once
+    older than ``max_age`` seconds, and then until their combined size fits
+    ``quota_bytes``. Directories held through :func:`hold_working_dir` and
+    downloads leased by a running pipeline are never removed.
+
+    Every worker process may run a janitor; a pass is skipped while another
+    process is sweeping the same ``root``. Each pass also prunes unused lock
+    files (see :mod:`viralcut.locks`).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        quota_bytes: int,
+        max_age: float | None = None,
+        interval: float = 300.0,
+        store: DownloadStore | None = None,
+    ) -> None:
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.store = store
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls, root: Path = Path("output")) -> "OutputJanitor":
+        """Build a janitor configured through ``VIRALCUT_OUTPUT_*`` and ``VIRALCUT_JANITOR_INTERVAL``."""
+
+        max_age_hours = float(os.environ.get("VIRALCUT_OUTPUT_MAX_AGE_HOURS", "168"))
+        return cls(
+            root,
+            quota_bytes=int(float(os.environ.get("VIRALCUT_OUTPUT_QUOTA_MB", "40960")) * 1024**2),
+            max_age=max_age_hours * 3600 if max_age_hours > 0 else None,
+            interval=float(os.environ.get("VIRALCUT_JANITOR_INTERVAL", "300")),
+            store=get_download_store(),
+        )
+
+    def start(self) -> None:
+        """Run :meth:`sweep` every ``interval`` seconds on a daemon thread."""
+
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="viralcut-janitor", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop the background thread after the current pass."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:  # pragma: no cover - keep housekeeping alive
+                LOGGER.exception("Janitor pass failed")
+            self._stop.wait(self.interval)
+
+    def sweep(self) -> list[Path]:
+        """Run one eviction pass and return the removed paths."""
+
+        sweeping = locks.FileLock(locks.lock_path("janitor", str(self.root.resolve())))
+        if not sweeping.acquire(blocking=False):
+            LOGGER.debug("Another worker is sweeping %s; skipping this pass", self.root)
+            return []
+        try:
+            removed = self._sweep()
+        finally:
+            sweeping.release()
+        locks.prune()
+        return removed
+
+    def _sweep(self) -> list[Path]:
+        if self.store is not None:
+            self.store.evict()
+
+        entries = sorted(self._entries(), key=lambda entry: entry.last_used)
+        total = sum(entry.size for entry in entries)
+        cutoff = time.time() - self.max_age if self.max_age is not None else None
+
+        removed: list[Path] = []
+        for entry in entries:
+            expired = cutoff is not None and entry.last_used < cutoff
+            if not expired and total <= self.quota_bytes:
+                continue
+            if not entry.remove():
+                continue
+            total -= entry.size
+            removed.append(entry.path)
+            reason = "age" if expired else "quota"
+            EVICTIONS.inc(kind=entry.kind, reason=reason)
+            LOGGER.info("Evicted %s %s (%d bytes, %s)", entry.kind, entry.path, entry.size, reason)
+
+        OUTPUT_BYTES.set(total)
+        return removed
+
+    def _entries(self) -> list[_Entry]:
+        entries = [self._working_dir_entry(path) for path in _working_dirs(self.root)]
+        if self.store is not None:
+            store = self.store
+            for key, size, last_used in store.entries():
+                entries.append(
+                    _Entry(
+                        kind="download",
+                        path=store.root / key,
+                        size=size,
+                        last_used=last_used,
+                        remove=lambda key=key: store.discard(key),
+                    )
+                )
+        return entries
+
+    def _working_dir_entry(self, path: Path) -> _Entry:
+        key = path.resolve()
+        size, last_modified = _own_usage(path)
+        with _registry_lock:
+            last_used = max(last_modified, _last_used.get(key, 0.0))
+
+        def remove() -> bool:
+            with _registry_lock:
+                if _leases.get(key):
+                    return False
+                lock = _working_dir_lock(key)
+                if not lock.acquire(blocking=False):
+                    return False
+                try:
+                    _remove_working_dir(path, self.root)
+                finally:
+                    lock.release()
+                _last_used.pop(key, None)
+            return True
+
+        return _Entry(kind="working_dir", path=path, size=size, last_used=last_used, remove=remove)
+
+
+def _is_working_dir(path: Path) -> bool:
+    return (path / "clips").is_dir() or (path / MANIFEST_NAME).is_file()
+
+
+def _working_dirs(root: Path) -> list[Path]:
+    """Return ``output/<video_id>`` and ``output/<video_id>/<config>`` working directories."""
+
+    found: list[Path] = []
+    try:
+        videos = [child for child in root.iterdir() if child.is_dir() and not child.name.startswith(".")]
+    except OSError:
+        return found
+    for video in videos:
+        if _is_working_dir(video):
+            found.append(video)
+        try:
+            found.extend(
+                child
+                for child in video.iterdir()
+                if child.is_dir() and child.name != "clips" and _is_working_dir(child)
+            )
+        except OSError:  # pragma: no cover - removed concurrently
+            continue
+    return found
+
+
+def _own_usage(path: Path) -> tuple[int, float]:
+    """Return size and newest mtime of ``path``, its files and ``clips``, excluding nested working dirs."""
+
+    size = 0
+    try:
+        last_modified = path.stat().st_mtime
+        children = list(path.iterdir())
+    except OSError:  # pragma: no cover - removed concurrently
+        return 0, 0.0
+    for child in children:
+        try:
+            if child.is_dir():
+                if child.name != "clips":
+                    continue
+                for clip in child.iterdir():
+                    stat = clip.stat()
+                    size += stat.st_size
+                    last_modified = max(last_modified, stat.st_mtime)
+            else:
+                stat = child.stat()
+                size += stat.st_size
+                last_modified = max(last_modified, stat.st_mtime)
+        except OSError:  # pragma: no cover - removed concurrently
+            continue
+    return size, last_modified
+
+
+def _remove_working_dir(path: Path, root: Path) -> None:
+    """Delete ``path``'s clips and files, then the directory and its parent if left empty.
+
+    ``root`` itself is never removed.
+    """
+
+    shutil.rmtree(path / "clips", ignore_errors=True)
+    try:
+        children = list(path.iterdir())
+    except OSError:
+        return
+    for child in children:
+        if child.is_file() or child.is_symlink():
+            child.unlink(missing_ok=True)
+    for directory in (path, path.parent):
+        if directory.resolve() == root.resolve():
+            break
+        try:
+            directory.rmdir()
+        except OSError:
+            break
+
+
+__all__ = ["OutputJanitor", "hold_working_dir", "mark_used"]
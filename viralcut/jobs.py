@@ -0,0 +1,304 @@
+"""Background job execution backed by a persistent SQLite job store."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from . import locks
+from .models import PipelineResult
+
+LOGGER = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT
+)
+"""
+
+
+@dataclass(slots=True)
+class JobRecord:
+    """Snapshot of a job as persisted in the :class:`JobStore`."""
+
+    id: str
+    status: str
+    params: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    attempts: int
+    created_at: float
+    updated_at: float
+
+
+def pipeline_result_to_dict(result: PipelineResult) -> dict[str, Any]:
+    """Return a JSON-serializable representation of ``result``."""
+
+    return {
+        "video_id": result.video_id,
+        "source_video": str(result.source_video),
+        "output_directory": str(result.output_dir),
+        "clips": [
+            {
+                "start": clip.start,
+                "end": clip.end,
+                "score": clip.score,
+                "transcript": clip.transcript,
+                "file_path": str(clip.path),
+            }
+            for clip in result.clips
+        ],
+        "stage_seconds": dict(result.stage_seconds),
+    }
+
+
+class JobStore:
+    """Jobs persisted in SQLite so they survive a server restart.
+
+    Each operation opens its own short-lived connection, which keeps the store
+    safe to use from the worker threads and from several processes at once.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """Build a store at ``VIRALCUT_JOB_DB`` (default ``output/jobs.sqlite3``)."""
+
+        return cls(Path(os.environ.get("VIRALCUT_JOB_DB", "output/jobs.sqlite3")))
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def create(self, params: dict[str, Any]) -> JobRecord:
+        """Persist a new queued job for ``params`` and return it."""
+
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), now, now),
+            )
+        return JobRecord(
+            id=job_id,
+            status=QUEUED,
+            params=params,
+            result=None,
+            error=None,
+            attempts=0,
+            created_at=now,
+            updated_at=now,
+        )
+
+    def get(self, job_id: str) -> JobRecord | None:
+        """Return the job named ``job_id`` or ``None`` if it does not exist."""
+
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _record(row) if row is not None else None
+
+    def claim(self, job_id: str, owner: str | None = None) -> JobRecord | None:
+        """Atomically move a queued job to running; ``None`` if someone else has it.
+
+        ``owner`` is a :func:`viralcut.locks.process_token` of the claiming process.
+        """
+
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?, owner = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), owner, job_id, QUEUED),
+            )
+            if cursor.rowcount != 1:
+                return None
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _record(row)
+
+    def finish(self, job_id: str, *, result: dict[str, Any] | None = None, error: str | None = None) -> None:
+        """Record the outcome of a running job."""
+
+        status = FAILED if error is not None else SUCCEEDED
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def count_by_status(self) -> dict[str, int]:
+        """Return the number of jobs in each status."""
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["total"] for row in rows}
+
+    def requeue_interrupted(self, *, max_attempts: int = 3) -> list[str]:
+        """Mark jobs left running by a dead process as queued and return all queued ids.
+
+        Jobs whose owning process is still alive (another server worker) are
+        left alone. Jobs that were already interrupted ``max_attempts`` times
+        are failed instead, so a video that crashes the server cannot do so
+        forever.
+        """
+
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            running = connection.execute(
+                "SELECT id, owner, attempts FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            for row in running:
+                if row["owner"] is not None and locks.process_alive(row["owner"]):
+                    continue
+                if row["attempts"] >= max_attempts:
+                    status, error = FAILED, "Job was interrupted too many times"
+                else:
+                    status, error = QUEUED, None
+                connection.execute(
+                    "UPDATE jobs SET status = ?, error = ?, owner = NULL, updated_at = ? "
+                    "WHERE id = ? AND status = ? AND owner IS ?",
+                    (status, error, now, row["id"], RUNNING, row["owner"]),
+                )
+            rows = connection.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+def _record(row: sqlite3.Row) -> JobRecord:
+    return JobRecord(
+        id=row["id"],
+        status=row["status"],
+        params=json.loads(row["params"]),
+        result=json.loads(row["result"]) if row["result"] else None,
+        error=row["error"],
+        attempts=row["attempts"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+class JobManager:
+    """Run queued jobs on a bounded worker pool and persist their outcome.
+
+    ``runner`` receives each job's stored parameters as keyword arguments and
+    must return a :class:`PipelineResult`. Exceptions become the job's error
+    message, so a failing video never takes a worker down. Several server
+    processes may run a manager on the same store; each job is claimed by
+    exactly one of them.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: Callable[..., PipelineResult],
+        *,
+        max_workers: int = 2,
+    ) -> None:
+        self.store = store
+        self.runner = runner
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker pool and re-queue jobs interrupted by a restart."""
+
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="viralcut-job",
+            )
+
+        interrupted = self.store.requeue_interrupted()
+        if interrupted:
+            LOGGER.info("Re-queueing %d interrupted jobs", len(interrupted))
+        for job_id in interrupted:
+            self._schedule(job_id)
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running jobs finish, queued ones resume on restart."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, params: dict[str, Any]) -> JobRecord:
+        """Persist a job for ``params`` and queue it for execution."""
+
+        record = self.store.create(params)
+        self._schedule(record.id)
+        return record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        """Return the current state of ``job_id``."""
+
+        return self.store.get(job_id)
+
+    def _schedule(self, job_id: str) -> None:
+        with self._lock:
+            if self._executor is None:
+                raise RuntimeError("JobManager.start() must be called before submitting jobs")
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        record = self.store.claim(job_id, locks.process_token())
+        if record is None:
+            return
+
+        LOGGER.info("Running job %s (attempt %d)", job_id, record.attempts)
+        try:
+            result = self.runner(**record.params)
+        except Exception as exc:
+            LOGGER.warning("Job %s failed: %s", job_id, exc)
+            self.store.finish(job_id, error=str(exc) or exc.__class__.__name__)
+            return
+
+        self.store.finish(job_id, result=pipeline_result_to_dict(result))
+
+
+__all__ = [
+    "FAILED",
+    "JobManager",
+    "JobRecord",
+    "JobStore",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "pipeline_result_to_dict",
+]
@@ -0,0 +1,199 @@
+"""Keyframe indexing helpers built on ``ffprobe``."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .models import ClipCandidate
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".keyframes.json"
+
+
+class KeyframeIndexError(RuntimeError):
+    """Raised when the keyframes of a video cannot be determined."""
+
+
+@dataclass(slots=True)
+class KeyframeIndex:
+    """Sorted keyframe timestamps and codec of a source's first video stream."""
+
+    codec: str
+    times: list[float]
+
+    def previous(self, timestamp: float) -> float:
+        """Return the last keyframe at or before ``timestamp`` (``timestamp`` if none)."""
+
+        position = bisect.bisect_right(self.times, timestamp + 1e-3)
+        return self.times[position - 1] if position else timestamp
+
+    def following(self, timestamp: float) -> float | None:
+        """Return the first keyframe at or after ``timestamp``, if any."""
+
+        position = bisect.bisect_left(self.times, timestamp - 1e-3)
+        return self.times[position] if position < len(self.times) else None
+
+
+@dataclass(slots=True)
+class StreamParameters:
+    """Coding parameters of a video stream that must agree for its packets to be spliced."""
+
+    codec: str
+    profile: str
+    level: int
+    pix_fmt: str
+    width: int
+    height: int
+    time_base: str
+
+
+def index_path(source: Path) -> Path:
+    """Return the sidecar file caching the keyframe index of ``source``."""
+
+    return source.with_name(source.name + INDEX_SUFFIX)
+
+
+def _ffprobe(arguments: list[str]) -> str:
+    try:
+        completed = subprocess.run(
+            ["ffprobe", "-v", "error", *arguments],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError as exc:  # pragma: no cover - environment guard
+        raise KeyframeIndexError(
+            "ffprobe is required to index keyframes. Please install ffmpeg and ensure it is on your PATH."
+        ) from exc
+    except subprocess.CalledProcessError as exc:  # pragma: no cover - passthrough
+        raise KeyframeIndexError(exc.stderr.strip() or "ffprobe failed") from exc
+    return completed.stdout
+
+
+def _probe(source: Path) -> KeyframeIndex:
+    codec = _ffprobe(
+        ["-select_streams", "v:0", "-show_entries", "stream=codec_name", "-of", "csv=p=0", str(source)]
+    ).strip()
+    packets = _ffprobe(
+        [
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(source),
+        ]
+    )
+
+    times: list[float] = []
+    for line in packets.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            times.append(float(pts_time))
+        except ValueError:
+            continue
+
+    if not times:
+        raise KeyframeIndexError(f"No keyframes found in {source.name}")
+
+    times.sort()
+    return KeyframeIndex(codec=codec, times=times)
+
+
+def probe_stream_parameters(source: Path) -> StreamParameters:
+    """Return the :class:`StreamParameters` of the first video stream of ``source``."""
+
+    output = _ffprobe(
+        [
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=codec_name,profile,level,pix_fmt,width,height,time_base",
+            "-of",
+            "json",
+            str(source),
+        ]
+    )
+    try:
+        [stream] = json.loads(output)["streams"]
+        return StreamParameters(
+            codec=stream["codec_name"],
+            profile=stream.get("profile", ""),
+            level=int(stream.get("level", 0)),
+            pix_fmt=stream["pix_fmt"],
+            width=int(stream["width"]),
+            height=int(stream["height"]),
+            time_base=stream["time_base"],
+        )
+    except (ValueError, KeyError, TypeError) as exc:
+        raise KeyframeIndexError(f"Unable to read the video stream parameters of {source.name}") from exc
+
+
+def load_keyframe_index(source: Path) -> KeyframeIndex:
+    """Return the keyframe index of ``source``, probing it once and caching it alongside.
+
+    The sidecar records the source size, so a replaced download is re-indexed.
+    """
+
+    sidecar = index_path(source)
+    try:
+        size = source.stat().st_size
+    except OSError as exc:
+        raise KeyframeIndexError(f"Unable to read {source}: {exc}") from exc
+    try:
+        payload = json.loads(sidecar.read_text(encoding="utf-8"))
+        if payload.get("size") == size:
+            return KeyframeIndex(codec=payload["codec"], times=payload["times"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    LOGGER.info("Indexing keyframes of %s", source.name)
+    index = _probe(source)
+    payload = {"size": size, "codec": index.codec, "times": index.times}
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=sidecar.parent,
+            suffix=".tmp",
+            delete=False,
+        ) as handle:
+            json.dump(payload, handle)
+        os.replace(handle.name, sidecar)
+    except OSError as exc:  # pragma: no cover - cache is best effort
+        LOGGER.warning("Unable to cache keyframe index for %s: %s", source.name, exc)
+
+    return index
+
+
+def align_to_keyframes(candidates: list[ClipCandidate], index: KeyframeIndex) -> list[ClipCandidate]:
+    """Move each candidate start back to the keyframe a stream copy would begin at.
+
+    Ends are left in place so the scored content is still fully covered.
+    """
+
+    for candidate in candidates:
+        candidate.start = round(index.previous(candidate.start), 3)
+    return candidates
+
+
+__all__ = [
+    "KeyframeIndex",
+    "KeyframeIndexError",
+    "StreamParameters",
+    "align_to_keyframes",
+    "index_path",
+    "load_keyframe_index",
+    "probe_stream_parameters",
+]
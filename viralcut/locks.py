@@ -0,0 +1,172 @@
+"""Advisory file locks that coordinate threads and worker processes sharing ``output/``."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+LOGGER = logging.getLogger(__name__)
+
+_process_guard = threading.Lock()
+_process_lock: "FileLock | None" = None
+_process_token: str | None = None
+_process_pid: int | None = None
+
+
+def get_lock_dir() -> Path:
+    """Return the directory holding lock files (``VIRALCUT_LOCK_DIR``, default ``output/.locks``)."""
+
+    return Path(os.environ.get("VIRALCUT_LOCK_DIR", "output/.locks"))
+
+
+def lock_path(namespace: str, name: str) -> Path:
+    """Return the lock file guarding ``name`` (a path, key or token) within ``namespace``."""
+
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:24]
+    return get_lock_dir() / f"{namespace}-{digest}.lock"
+
+
+class FileLock:
+    """An exclusive or shared ``flock`` on ``path``.
+
+    Locks belong to the open file, so two instances for the same path exclude
+    each other whether they live in different threads or different processes;
+    a single instance must not be shared between threads. Lock files may be
+    removed by :func:`prune` while nobody holds them, so :meth:`acquire`
+    retries until the file it locked is still the one at ``path``. Without
+    ``fcntl`` every lock is granted immediately, which is only safe for a
+    single server process.
+    """
+
+    def __init__(self, path: Path, *, shared: bool = False) -> None:
+        self.path = path
+        self.shared = shared
+        self._fd: int | None = None
+
+    @property
+    def locked(self) -> bool:
+        """``True`` while this instance holds the lock."""
+
+        return self._fd is not None
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """Take the lock, waiting for it unless ``blocking`` is false; return whether it was taken."""
+
+        if self._fd is not None:
+            raise RuntimeError(f"Lock {self.path} is already held by this instance")
+        if fcntl is None:  # pragma: no cover - Windows
+            self._fd = -1
+            return True
+
+        operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        if not blocking:
+            operation |= fcntl.LOCK_NB
+        while True:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, operation)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            except BaseException:
+                os.close(fd)
+                raise
+            try:
+                current = os.path.samestat(os.fstat(fd), os.stat(self.path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                self._fd = fd
+                return True
+            os.close(fd)
+
+    def release(self) -> None:
+        """Release the lock if held."""
+
+        fd, self._fd = self._fd, None
+        if fd is not None and fd >= 0:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+def process_token() -> str:
+    """Return a token identifying this process, valid for as long as the process lives.
+
+    The token's lock file stays locked until the process exits, so any other
+    process can tell through :func:`process_alive` whether work recorded under
+    the token is still owned by a running server.
+    """
+
+    global _process_lock, _process_pid, _process_token
+
+    with _process_guard:
+        if _process_pid != os.getpid():
+            token = uuid.uuid4().hex
+            lock = FileLock(lock_path("process", token))
+            lock.acquire()
+            _process_lock, _process_pid, _process_token = lock, os.getpid(), token
+        assert _process_token is not None
+        return _process_token
+
+
+def process_alive(token: str) -> bool:
+    """Return whether the process that issued ``token`` through :func:`process_token` is still running."""
+
+    probe = FileLock(lock_path("process", token))
+    if not probe.acquire(blocking=False):
+        return True
+    probe.release()
+    return False
+
+
+def prune(directory: Path | None = None) -> int:
+    """Delete lock files that nobody holds and return how many were removed."""
+
+    directory = directory or get_lock_dir()
+    try:
+        candidates = [path for path in directory.iterdir() if path.suffix == ".lock"]
+    except OSError:
+        return 0
+
+    removed = 0
+    for path in candidates:
+        lock = FileLock(path)
+        try:
+            if not lock.acquire(blocking=False):
+                continue
+        except OSError:  # pragma: no cover - removed concurrently
+            continue
+        try:
+            path.unlink(missing_ok=True)
+            removed += 1
+        finally:
+            lock.release()
+    if removed:
+        LOGGER.debug("Pruned %d unused lock files from %s", removed, directory)
+    return removed
+
+
+__all__ = [
+    "FileLock",
+    "get_lock_dir",
+    "lock_path",
+    "process_alive",
+    "process_token",
+    "prune",
+]
@@ -0,0 +1,320 @@
+"""Minimal in-process metrics rendered in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+    1800.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def samples(self) -> list[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """Increment the gauge for the duration of the block."""
+
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations with ``_sum`` and ``_count`` series."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[position] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+
+        lines: list[str] = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose values are read from ``callback`` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        *,
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> list[str]:
+        values = sorted(self.callback().items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Registry:
+    """Collection of metrics rendered together by :meth:`render`."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add ``metric``, replacing any previous metric with the same name."""
+
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: list[str] = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:  # pragma: no cover - a broken collector must not hide the rest
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create and register a :class:`Counter` on :data:`REGISTRY`."""
+
+    metric = Counter(name, documentation, labelnames)
+    REGISTRY.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Create and register a :class:`Gauge` on :data:`REGISTRY`."""
+
+    metric = Gauge(name, documentation, labelnames)
+    REGISTRY.register(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    *,
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    """Create and register a :class:`Histogram` on :data:`REGISTRY`."""
+
+    metric = Histogram(name, documentation, labelnames, buckets=buckets)
+    REGISTRY.register(metric)
+    return metric
+
+
+def register_cache(name: str, stats: Callable[[], dict[str, int]]) -> None:
+    """Expose ``hits``/``misses`` from ``stats()`` as counters and a hit-ratio gauge.
+
+    Each cache gets its own label value on the shared
+    ``viralcut_cache_requests_total`` and ``viralcut_cache_hit_ratio`` series.
+    """
+
+    with _caches_lock:
+        _caches[name] = stats
+
+
+def _cache_requests() -> dict[LabelValues, float]:
+    values: dict[LabelValues, float] = {}
+    for cache, stats in _cache_snapshot():
+        values[(cache, "hit")] = stats.get("hits", 0)
+        values[(cache, "miss")] = stats.get("misses", 0)
+    return values
+
+
+def _cache_hit_ratio() -> dict[LabelValues, float]:
+    values: dict[LabelValues, float] = {}
+    for cache, stats in _cache_snapshot():
+        total = stats.get("hits", 0) + stats.get("misses", 0)
+        values[(cache,)] = stats.get("hits", 0) / total if total else 0.0
+    return values
+
+
+def _cache_snapshot() -> list[tuple[str, dict[str, int]]]:
+    with _caches_lock:
+        caches = list(_caches.items())
+    return [(name, stats()) for name, stats in caches]
+
+
+_caches: dict[str, Callable[[], dict[str, int]]] = {}
+_caches_lock = threading.Lock()
+
+REGISTRY.register(
+    CallbackMetric(
+        "viralcut_cache_requests_total",
+        "Cache lookups by cache and outcome.",
+        _cache_requests,
+        ("cache", "result"),
+        kind="counter",
+    )
+)
+REGISTRY.register(
+    CallbackMetric(
+        "viralcut_cache_hit_ratio",
+        "Fraction of cache lookups served from the cache.",
+        _cache_hit_ratio,
+        ("cache",),
+    )
+)
+
+
+__all__ = [
+    "CallbackMetric",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "REGISTRY",
+    "Registry",
+    "counter",
+    "gauge",
+    "histogram",
+    "register_cache",
+]
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable
 
 
 @dataclass(slots=True)
@@ -50,9 +51,29 @@ class PipelineResult:
     source_video: Path
     clips: list[ClipFile]
     output_dir: Path
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class PipelineEvent:
+    """Progress notification emitted while the pipeline runs.
+
+    ``status`` is one of ``started``, ``progress``, ``completed`` or
+    ``failed``; ``elapsed`` counts seconds since the pipeline started.
+    """
+
+    stage: str
+    status: str
+    elapsed: float
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+ProgressCallback = Callable[[PipelineEvent], None]
 
 
 __all__ = [
+    "PipelineEvent",
+    "ProgressCallback",
     "TranscriptSegment",
     "ClipCandidate",
     "ClipFile",
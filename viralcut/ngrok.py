@@ -6,12 +6,15 @@ import logging
 import os
 from typing import Optional, TYPE_CHECKING
 
+from .locks import FileLock, lock_path
+
 if TYPE_CHECKING:  # pragma: no cover - used only for static analysis
     from pyngrok.ngrok import NgrokTunnel
 
 logger = logging.getLogger(__name__)
 
 _tunnel: Optional["NgrokTunnel"] = None
+_tunnel_lock: Optional[FileLock] = None
 
 
 def _ngrok_enabled() -> bool:
@@ -21,9 +24,13 @@ def _ngrok_enabled() -> bool:
 
 
 def maybe_start_ngrok(port: int) -> Optional[str]:
-    """Start an ngrok tunnel to the given ``port`` when opt-in requirements are met."""
+    """Start an ngrok tunnel to the given ``port`` when opt-in requirements are met.
+
+    When several server workers share the port only the first one opens the
+    tunnel; the others return ``None``.
+    """
 
-    global _tunnel
+    global _tunnel, _tunnel_lock
 
     if _tunnel is not None:
         return _tunnel.public_url
@@ -48,14 +55,22 @@ def maybe_start_ngrok(port: int) -> Optional[str]:
         except Exception as exc:  # pragma: no cover - defensive guard
             logger.error("Failed to set NGROK_AUTHTOKEN: %s", exc)
 
+    lock = FileLock(lock_path("ngrok", str(port)))
+    if not lock.acquire(blocking=False):
+        logger.info("Another worker owns the ngrok tunnel for port %s", port)
+        return None
+
     address = f"http://127.0.0.1:{port}"
 
     try:
         _tunnel = ngrok.connect(address)
     except Exception as exc:  # pragma: no cover - ngrok failures are rare and environment-specific
         logger.error("Unable to start ngrok tunnel: %s", exc)
+        lock.release()
         return None
 
+    _tunnel_lock = lock
+
     logger.info("ngrok tunnel %s -> %s", _tunnel.public_url, address)
     return _tunnel.public_url
 
@@ -63,7 +78,11 @@ def maybe_start_ngrok(port: int) -> Optional[str]:
 def stop_ngrok() -> None:
     """Stop any previously created ngrok tunnel."""
 
-    global _tunnel
+    global _tunnel, _tunnel_lock
+
+    if _tunnel_lock is not None:
+        _tunnel_lock.release()
+        _tunnel_lock = None
 
     if _tunnel is None:
         return
@@ -3,20 +3,60 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import contextlib
+import heapq
+import itertools
 import logging
 import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, Iterator, Sequence
 from urllib.parse import parse_qs, urlparse
 
-from .clipping import ClipGenerationError, render_clips
-from .downloader import DownloadError, download_video
-from .models import ClipCandidate, PipelineResult, TranscriptSegment
-from .transcript import TranscriptError, fetch_transcript
+from . import metrics
+from .audio import AudioEnergyError, AudioEnvelope, audio_weight, read_envelope
+from .checkpoint import CheckpointManifest
+from .clipping import (
+    ClipGenerationError,
+    ClipRendered,
+    RenderProfile,
+    render_clips,
+    render_sections,
+    resolve_render_profile,
+)
+from .downloader import (
+    DownloadError,
+    SectionDownloadUnsupported,
+    download_sections,
+    get_download_store,
+)
+from .janitor import hold_working_dir
+from .keyframes import KeyframeIndex, KeyframeIndexError, align_to_keyframes, load_keyframe_index
+from .models import (
+    ClipCandidate,
+    ClipFile,
+    PipelineEvent,
+    PipelineResult,
+    ProgressCallback,
+)
+from .transcript import TranscriptError, fetch_transcript_table
+from .transcript_table import Transcript, TranscriptTable, _text_features, as_table
 
 LOGGER = logging.getLogger(__name__)
 
+STAGE_SECONDS = metrics.histogram(
+    "viralcut_stage_seconds",
+    "Time each pipeline stage added to the request's critical path.",
+    ("stage",),
+)
+PIPELINES_IN_FLIGHT = metrics.gauge("viralcut_pipelines_in_flight", "Pipeline runs currently executing.")
+
 
 class PipelineError(RuntimeError):
     """Raised when the processing pipeline cannot complete successfully."""
@@ -27,6 +67,20 @@ class _ClipScoringConfig:
     clip_length: float
     step: float
     max_clips: int
+    min_gap: float = 0.0
+
+    @property
+    def pool_size(self) -> int:
+        """Number of best candidates that always contain the greedy selection of :func:`_select_top_clips`.
+
+        Windows start ``step`` apart, so a selected clip conflicts with at most
+        ``2 * ceil((clip_length + min_gap) / step) + 1`` others. Each of the
+        ``max_clips`` picks therefore passes over at most that many better
+        candidates, and the picks never leave the pool.
+        """
+
+        conflicts = 2 * math.ceil((self.clip_length + self.min_gap) / self.step) + 1
+        return self.max_clips * (conflicts + 1)
 
 
 def _extract_video_id(video_url: str) -> str:
@@ -52,60 +106,176 @@ def _extract_video_id(video_url: str) -> str:
     raise PipelineError("Unable to extract YouTube video identifier from URL")
 
 
-def _score_clip(text: str, duration: float) -> float:
-    if not text.strip():
+def _score_features(
+    words: int,
+    exclamations: int,
+    questions: int,
+    emphasis: int,
+    duration: float,
+) -> float:
+    if words == 0:
         return 0.0
 
-    word_count = len(text.split())
-    punctuation_bonus = text.count("!") * 3 + text.count("?") * 2
-    emphasis_bonus = sum(1 for token in text.split() if token.isupper() and len(token) > 1)
-    density_score = word_count / max(duration, 1.0)
-    return density_score * 10 + punctuation_bonus + emphasis_bonus
+    punctuation_bonus = exclamations * 3 + questions * 2
+    density_score = words / max(duration, 1.0)
+    return density_score * 10 + punctuation_bonus + emphasis
+
+
+def _score_clip(text: str, duration: float) -> float:
+    return _score_features(*_text_features(text), duration)
 
 
 def _build_candidates(
-    segments: list[TranscriptSegment],
+    segments: Transcript,
     config: _ClipScoringConfig,
 ) -> list[ClipCandidate]:
-    if not segments:
-        raise PipelineError("Transcript returned no textual segments")
+    """Return every scored window of :func:`_iter_candidates` as a list."""
+
+    return list(_iter_candidates(segments, config))
 
-    total_duration = max(segment.end for segment in segments)
-    if total_duration <= 0:
+
+def _iter_candidates(
+    segments: Transcript,
+    config: _ClipScoringConfig,
+) -> Iterator[ClipCandidate]:
+    """Lazily score every window of ``config.clip_length`` seconds over ``segments``.
+
+    Windows are scanned with two pointers: segments enter the running feature
+    totals once they start before the window end and leave once they end
+    before the window start. Feature counts are additive across segments, so
+    the scores match :func:`_score_clip` on the joined text exactly; they are
+    read from the precomputed columns of a :class:`TranscriptTable`, into
+    which segment lists are converted first. Windows scoring above zero are
+    yielded in start order. Candidate ``text`` is left empty; call
+    :func:`_materialize_text` on the clips that survive selection.
+
+    The transcript is validated up front, so errors surface on the call
+    rather than on the first iteration.
+    """
+
+    table = as_table(segments)
+    if not len(table):
+        raise PipelineError("Transcript returned no textual segments")
+    if table.duration <= 0:
         raise PipelineError("Transcript duration is invalid")
+    return _scan_windows(table, config)
 
+
+def _scan_windows(table: TranscriptTable, config: _ClipScoringConfig) -> Iterator[ClipCandidate]:
+    total_duration = table.duration
     step = config.step
     clip_length = config.clip_length
-    starts: Iterable[float] = [i for i in frange(0, max(total_duration - clip_length, 0) + step, step)]
+    starts = table.starts
+    word_counts, exclamation_counts, question_counts, emphasis_counts = (
+        table.words,
+        table.exclamations,
+        table.questions,
+        table.emphasis,
+    )
+    # Captions arrive in start order; only out-of-order transcripts pay for an index.
+    in_order = all(previous <= current for previous, current in zip(starts, itertools.islice(starts, 1, None)))
+    by_start: Sequence[int] = range(len(table)) if in_order else sorted(range(len(table)), key=starts.__getitem__)
 
-    candidates: list[ClipCandidate] = []
-    for window_start in starts:
-        window_end = min(window_start + clip_length, total_duration)
-        overlapped = [
-            segment
-            for segment in segments
-            if segment.start < window_end and segment.end > window_start
-        ]
-        if not overlapped:
-            continue
+    pending = 0
+    active: list[tuple[float, int]] = []
+    words = exclamations = questions = emphasis = 0
 
-        combined_text = " ".join(segment.text for segment in overlapped).strip()
-        if not combined_text:
-            continue
+    for window_start in frange(0, max(total_duration - clip_length, 0) + step, step):
+        window_end = min(window_start + clip_length, total_duration)
 
-        score = _score_clip(combined_text, window_end - window_start)
+        while pending < len(by_start) and starts[by_start[pending]] < window_end:
+            index = by_start[pending]
+            pending += 1
+            heapq.heappush(active, (table.end(index), index))
+            words += word_counts[index]
+            exclamations += exclamation_counts[index]
+            questions += question_counts[index]
+            emphasis += emphasis_counts[index]
+
+        while active and active[0][0] <= window_start:
+            _, index = heapq.heappop(active)
+            words -= word_counts[index]
+            exclamations -= exclamation_counts[index]
+            questions -= question_counts[index]
+            emphasis -= emphasis_counts[index]
+
+        score = _score_features(words, exclamations, questions, emphasis, window_end - window_start)
         if score <= 0:
             continue
 
-        candidates.append(
-            ClipCandidate(
-                start=window_start,
-                end=window_end,
-                text=combined_text,
-                score=score,
-            )
+        yield ClipCandidate(
+            start=window_start,
+            end=window_end,
+            text="",
+            score=score,
         )
 
+
+# Windows whose audio energy is scored together by :func:`_iter_audio_scores`.
+_AUDIO_BLOCK = 1024
+
+
+def _iter_audio_scores(
+    candidates: Iterable[ClipCandidate],
+    envelope: AudioEnvelope,
+    config: _ClipScoringConfig,
+    weight: float,
+    transcript_duration: float = 0.0,
+) -> Iterator[ClipCandidate]:
+    """Yield every window of ``config`` scored by its transcript plus ``weight`` times its audio energy.
+
+    ``candidates`` are the transcript-scored windows of :func:`_iter_candidates`
+    over a transcript lasting ``transcript_duration`` seconds, possibly none
+    for videos without captions. Both run over the same window grid in start
+    order, so they are merged as they stream; windows missing from
+    ``candidates``, such as music or reactions without speech, are scored by
+    audio alone. Audio energy is scored ``_AUDIO_BLOCK`` windows at a time.
+    """
+
+    total_duration = max(envelope.duration, transcript_duration)
+    transcript = iter(candidates)
+    scored = next(transcript, None)
+    block: list[tuple[float, float, float]] = []
+
+    def flush() -> Iterator[ClipCandidate]:
+        energies = envelope.window_scores([start for start, _, _ in block], [end for _, end, _ in block])
+        for (start, end, score), energy in zip(block, energies):
+            total = score + weight * energy
+            if total > 0:
+                yield ClipCandidate(start=start, end=end, text="", score=total)
+        block.clear()
+
+    for start in frange(0, max(total_duration - config.clip_length, 0) + config.step, config.step):
+        while scored is not None and scored.start < start:
+            scored = next(transcript, None)
+        if scored is not None and scored.start == start:
+            block.append((start, scored.end, scored.score))
+            scored = next(transcript, None)
+        else:
+            block.append((start, min(start + config.clip_length, total_duration), 0.0))
+        if len(block) >= _AUDIO_BLOCK:
+            yield from flush()
+    if block:
+        yield from flush()
+
+
+def _materialize_text(
+    segments: Transcript,
+    candidates: list[ClipCandidate],
+) -> list[ClipCandidate]:
+    """Fill in ``text`` for ``candidates`` from the overlapping ``segments``.
+
+    Only the text of overlapping segments is decoded from a :class:`TranscriptTable`.
+    """
+
+    table = as_table(segments)
+    starts = table.starts
+    for candidate in candidates:
+        candidate.text = " ".join(
+            table.text(index)
+            for index in range(len(table))
+            if starts[index] < candidate.end and table.end(index) > candidate.start
+        ).strip()
     return candidates
 
 
@@ -119,28 +289,256 @@ def frange(start: float, stop: float, step: float) -> Iterable[float]:
         current += step
 
 
-def _select_top_clips(candidates: list[ClipCandidate], limit: int) -> list[ClipCandidate]:
+def _top_candidates(candidates: Iterable[ClipCandidate], keep: int) -> tuple[list[ClipCandidate], int]:
+    """Return the ``keep`` best of ``candidates`` and how many there were.
+
+    Candidates are streamed through a min-heap of at most ``keep`` entries, so
+    memory does not grow with their number. The result is ordered best first,
+    ties in the order the candidates arrived, which is the order
+    :func:`_select_top_clips` considers them in.
+    """
+
+    heap: list[tuple[float, int, ClipCandidate]] = []
+    seen = 0
+    for index, candidate in enumerate(candidates):
+        seen += 1
+        entry = (candidate.score, -index, candidate)
+        if len(heap) < keep:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(reverse=True)
+    return [candidate for _, _, candidate in heap], seen
+
+
+def _select_top_clips(
+    candidates: Iterable[ClipCandidate],
+    limit: int,
+    *,
+    min_gap: float = 0.0,
+) -> list[ClipCandidate]:
+    """Pick up to ``limit`` non-overlapping candidates with the best scores.
+
+    Candidates are popped lazily from a max-heap so only the prefix needed to
+    fill ``limit`` slots is ordered. Accepted clips live in an interval index
+    (two parallel sorted lists of starts and ends), so each overlap check is a
+    single bisect. ``min_gap`` additionally requires that many seconds between
+    any two selected clips.
+
+    ``candidates`` may be any iterable. To bound memory on long videos, pass
+    the pool of :func:`_top_candidates`; with :attr:`_ClipScoringConfig.pool_size`
+    entries the selection is the same as when ranking every candidate.
+    """
+
+    if not isinstance(candidates, list):
+        candidates = list(candidates)
+
     if not candidates:
         raise PipelineError("Unable to identify interesting moments from transcript")
 
-    ordered = sorted(candidates, key=lambda candidate: candidate.score, reverse=True)
+    heap = [(-candidate.score, index) for index, candidate in enumerate(candidates)]
+    heapq.heapify(heap)
+
+    starts: list[float] = []
+    ends: list[float] = []
     selected: list[ClipCandidate] = []
 
-    for candidate in ordered:
-        if any(_overlaps(candidate, existing) for existing in selected):
+    while heap and len(selected) < limit:
+        _, index = heapq.heappop(heap)
+        candidate = candidates[index]
+        if _conflicts(starts, ends, candidate, min_gap):
             continue
-        selected.append(candidate)
-        if len(selected) >= limit:
-            break
+
+        position = bisect.bisect_left(starts, candidate.start)
+        starts.insert(position, candidate.start)
+        ends.insert(position, candidate.end)
+        selected.insert(position, candidate)
 
     if not selected:
         raise PipelineError("Transcript did not contain any high scoring segments")
 
-    return sorted(selected, key=lambda candidate: candidate.start)
+    return selected
 
 
-def _overlaps(first: ClipCandidate, second: ClipCandidate) -> bool:
-    return not (first.end <= second.start or second.end <= first.start)
+def _select_aligned(
+    candidates: list[ClipCandidate],
+    index: KeyframeIndex,
+    limit: int,
+    *,
+    min_gap: float = 0.0,
+) -> tuple[list[ClipCandidate], list[ClipCandidate]]:
+    """Pick up to ``limit`` of ``candidates`` by the windows a stream copy of them covers.
+
+    A stream copy starts on the keyframe preceding each window, so copies of
+    the candidates are aligned with :func:`align_to_keyframes` and overlap
+    and ``min_gap`` are checked on the aligned windows. ``candidates`` are
+    left untouched. Returns the picked candidates and their aligned copies,
+    both in start order.
+    """
+
+    aligned = align_to_keyframes(
+        [
+            ClipCandidate(start=candidate.start, end=candidate.end, text=candidate.text, score=candidate.score)
+            for candidate in candidates
+        ],
+        index,
+    )
+    originals = {id(window): candidate for window, candidate in zip(aligned, candidates)}
+    windows = _select_top_clips(aligned, limit, min_gap=min_gap)
+    return [originals[id(window)] for window in windows], windows
+
+
+def _conflicts(
+    starts: list[float],
+    ends: list[float],
+    candidate: ClipCandidate,
+    min_gap: float,
+) -> bool:
+    """Return ``True`` if ``candidate`` is within ``min_gap`` of an indexed clip.
+
+    Indexed clips never overlap, so their ends are sorted along with their
+    starts and only the last clip starting before ``candidate`` ends can clash.
+    """
+
+    position = bisect.bisect_left(starts, candidate.end + min_gap)
+    return position > 0 and ends[position - 1] + min_gap > candidate.start
+
+
+class _StageTimer:
+    """Accumulate how long the calling thread spends in each pipeline stage.
+
+    Stages running in the background only show up through the time spent
+    waiting on them, so the totals describe the request's critical path.
+    Every stage transition is also reported to ``progress`` as a
+    :class:`PipelineEvent`.
+    """
+
+    def __init__(self, progress: ProgressCallback | None = None) -> None:
+        self.seconds: dict[str, float] = {}
+        self.progress = progress
+        self.started = time.perf_counter()
+
+    def emit(self, stage: str, status: str, **data: Any) -> None:
+        if self.progress is None:
+            return
+        event = PipelineEvent(
+            stage=stage,
+            status=status,
+            elapsed=time.perf_counter() - self.started,
+            data=data,
+        )
+        try:
+            self.progress(event)
+        except Exception:  # pragma: no cover - listeners must not break the pipeline
+            LOGGER.exception("Progress listener failed for %s/%s", stage, status)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, *, announce: bool = True):
+        """Time the block; the yielded dict is attached to the ``completed`` event."""
+
+        details: dict[str, Any] = {}
+        if announce:
+            self.emit(name, "started")
+        started = time.perf_counter()
+        try:
+            yield details
+        except BaseException as exc:
+            self._record(name, started)
+            self.emit(name, "failed", error=str(exc))
+            raise
+        self.emit(name, "completed", seconds=self._record(name, started), **details)
+
+    def _record(self, name: str, started: float) -> float:
+        elapsed = time.perf_counter() - started
+        self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        return elapsed
+
+    def log(self, video_id: str) -> None:
+        LOGGER.info(
+            "Critical path for %s: %s",
+            video_id,
+            ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.seconds.items()),
+        )
+
+
+# Environment variable and default size of each shared stage pool. Rendering
+# is bounded separately by the process-wide ffmpeg slots in ``clipping``.
+_STAGE_POOL_SIZES = {
+    "download": ("VIRALCUT_STAGE_WORKERS", 8),
+    "transcript": ("VIRALCUT_TRANSCRIPT_WORKERS", 8),
+}
+
+_stage_executors: dict[str, ThreadPoolExecutor] = {}
+_stage_executor_lock = threading.Lock()
+
+
+def _stage_pool(stage: str = "download") -> ThreadPoolExecutor:
+    """Return the thread pool shared by every pipeline run for ``stage``.
+
+    Each stage has its own pool, so concurrent runs (single requests, jobs and
+    batch items alike) are limited by bandwidth and transcript API capacity
+    independently rather than by how many requests happen to be open.
+    """
+
+    with _stage_executor_lock:
+        executor = _stage_executors.get(stage)
+        if executor is None:
+            variable, default = _STAGE_POOL_SIZES[stage]
+            executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get(variable, str(default))),
+                thread_name_prefix=f"viralcut-{stage}",
+            )
+            _stage_executors[stage] = executor
+        return executor
+
+
+def _download_clip_sections(
+    video_url: str,
+    candidates: list[ClipCandidate],
+    clips_dir: Path,
+    on_clip: ClipRendered,
+    reuse: dict[int, ClipFile],
+    profile: RenderProfile,
+) -> list[ClipFile] | None:
+    """Download just the ``candidates`` time ranges and turn them into clip files.
+
+    Positions present in ``reuse`` are already on disk and are not downloaded
+    again. Sections become the clips directly, or are first encoded when
+    ``profile`` re-encodes. Returns ``None`` when ranged downloads are not
+    supported so the caller can fall back to downloading and cutting the
+    full source.
+    """
+
+    positions = [index for index in range(1, len(candidates) + 1) if index not in reuse]
+    sections = [(candidates[index - 1].start, candidates[index - 1].end) for index in positions]
+    target = clips_dir / ".sections" if profile.reencodes else clips_dir
+    downloaded: list[Path] = []
+    if sections:
+        try:
+            downloaded = _stage_pool("download").submit(download_sections, video_url, target, sections).result()
+        except SectionDownloadUnsupported as exc:
+            LOGGER.warning("Section download unavailable, falling back to full download: %s", exc)
+            return None
+        except DownloadError as exc:
+            raise PipelineError(str(exc)) from exc
+
+    clips = dict(reuse)
+    try:
+        clips.update(
+            render_sections(
+                {index: (path, candidates[index - 1]) for index, path in zip(positions, downloaded)},
+                clips_dir,
+                profile=profile,
+                on_clip=on_clip,
+            )
+        )
+    except ClipGenerationError as exc:
+        raise PipelineError(str(exc)) from exc
+    finally:
+        if profile.reencodes:
+            shutil.rmtree(target, ignore_errors=True)
+    return [clips[index] for index in range(1, len(candidates) + 1)]
 
 
 def process_video_to_clips(
@@ -149,9 +547,48 @@ def process_video_to_clips(
     clip_length: float = 60.0,
     max_clips: int = 3,
     step: float = 5.0,
+    min_gap: float = 0.0,
+    sections_only: bool = False,
+    smart_cut: bool = False,
+    profile: str | None = None,
+    audio: bool = False,
     working_dir: Path | None = None,
+    progress: ProgressCallback | None = None,
 ) -> PipelineResult:
-    """Run the entire pipeline, returning generated clip metadata."""
+    """Run the entire pipeline, returning generated clip metadata.
+
+    The source download runs on a background thread while the transcript is
+    fetched and scored; if that fails the download is cancelled. With
+    ``sections_only`` nothing is downloaded until the clips are chosen, so
+    videos without captions fail before any video bytes are transferred.
+    Only the selected time ranges are then downloaded and become the clips
+    directly; ``source_video`` points at the clips directory. When ranged
+    downloads are unavailable the full source is downloaded instead.
+
+    Stream-copied clips start on the keyframe preceding each selected window,
+    so once the source is indexed the clips are selected again on windows
+    moved back to it, keeping them apart by ``min_gap``. ``smart_cut`` keeps
+    the exact window and re-encodes only the partial head GOP.
+
+    ``profile`` names one of ``RENDER_PROFILES`` (``None`` uses
+    ``VIRALCUT_RENDER_PROFILE``). Profiles that re-encode, such as the
+    vertical 9:16 ones, cut exact windows and need no keyframe alignment.
+
+    With ``audio`` every window's transcript score is combined with its audio
+    energy (see :func:`viralcut.audio.read_envelope`), so videos without
+    captions can still be clipped. Selection then waits for the full download;
+    ``audio`` cannot be combined with ``sections_only``.
+
+    ``progress`` receives a :class:`PipelineEvent` for every stage transition,
+    throttled download progress and each clip as soon as it is rendered.
+
+    Progress is checkpointed in ``<working_dir>/manifest.json`` (see
+    :class:`CheckpointManifest`). A retry with the same parameters skips the
+    stages that already selected the clip windows, verifies the source
+    checksum and re-renders only clips that are missing or corrupt. Selected
+    windows are checkpointed as scored and aligned to the keyframes of the
+    current source on every run.
+    """
 
     if clip_length <= 0 or math.isinf(clip_length):
         raise PipelineError("Clip length must be a positive finite value")
@@ -159,39 +596,260 @@ def process_video_to_clips(
         raise PipelineError("max_clips must be greater than zero")
     if step <= 0:
         raise PipelineError("step must be greater than zero")
+    if min_gap < 0:
+        raise PipelineError("min_gap must not be negative")
+    if audio and sections_only:
+        raise PipelineError("Audio scoring needs the full video and cannot be combined with sections_only")
+    try:
+        render_profile = resolve_render_profile(profile)
+    except ClipGenerationError as exc:
+        raise PipelineError(str(exc)) from exc
 
     video_id = _extract_video_id(video_url)
     working_directory = working_dir or Path("output") / video_id
-    downloads_dir = working_directory / "downloads"
     clips_dir = working_directory / "clips"
+    timer = _StageTimer(progress)
+    store = get_download_store()
+    transcript_segments: TranscriptTable | None = None
+
+    def load_transcript() -> TranscriptTable:
+        try:
+            return _stage_pool("transcript").submit(fetch_transcript_table, video_id).result()
+        except TranscriptError as exc:
+            if audio:
+                LOGGER.warning("Scoring %s by audio only: %s", video_id, exc)
+                return TranscriptTable.from_segments([])
+            raise PipelineError(str(exc)) from exc
+
+    def select() -> list[ClipCandidate]:
+        with timer.stage("selection") as details:
+            selected = _select_top_clips(pool, max_clips, min_gap=min_gap)
+            details["selected"] = [[clip.start, clip.end, clip.score] for clip in selected]
+        manifest.complete("selection")
+        return selected
+
+    def download_progress(data: dict[str, Any]) -> None:
+        timer.emit("download", "progress", **data)
+
+    def clip_rendered(index: int, clip: ClipFile) -> None:
+        manifest.record_clip(index, clip)
+        timer.emit(
+            "render",
+            "progress",
+            clip=index,
+            start=clip.start,
+            end=clip.end,
+            score=clip.score,
+            path=str(clip.path),
+        )
 
-    LOGGER.info("Downloading YouTube video %s", video_id)
-    try:
-        source_video = download_video(video_url, downloads_dir)
-    except DownloadError as exc:
-        raise PipelineError(str(exc)) from exc
-
-    LOGGER.info("Fetching transcript for %s", video_id)
-    try:
-        transcript_segments = fetch_transcript(video_id)
-    except TranscriptError as exc:
-        raise PipelineError(str(exc)) from exc
-
-    config = _ClipScoringConfig(clip_length=clip_length, step=step, max_clips=max_clips)
-    candidates = _build_candidates(transcript_segments, config)
-    top_candidates = _select_top_clips(candidates, max_clips)
-
-    LOGGER.info("Rendering %d clips for %s", len(top_candidates), video_id)
-    try:
-        clips = render_clips(source_video, top_candidates, clips_dir)
-    except ClipGenerationError as exc:
-        raise PipelineError(str(exc)) from exc
+    def verified_clips(windows: list[ClipCandidate] | None = None) -> dict[int, ClipFile]:
+        reuse = manifest.verified_clips(clips_dir, windows)
+        for index, clip in sorted(reuse.items()):
+            timer.emit(
+                "render",
+                "progress",
+                clip=index,
+                start=clip.start,
+                end=clip.end,
+                score=clip.score,
+                path=str(clip.path),
+                reused=True,
+            )
+        return reuse
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(PIPELINES_IN_FLIGHT.track_inprogress())
+        stack.enter_context(hold_working_dir(working_directory))
+        manifest = CheckpointManifest.load(
+            working_directory,
+            video_id,
+            {
+                "clip_length": clip_length,
+                "max_clips": max_clips,
+                "step": step,
+                "min_gap": min_gap,
+                "sections_only": sections_only,
+                "smart_cut": smart_cut,
+                "profile": render_profile.name,
+                "audio": audio,
+            },
+        )
+        download: Future[Path] | None = None
+        cancel_download = threading.Event()
+        if not sections_only:
+            LOGGER.info("Downloading YouTube video %s", video_id)
+            stack.enter_context(store.hold(video_id))
+            timer.emit("download", "started", mode="full")
+            download = _stage_pool("download").submit(
+                store.fetch,
+                video_url,
+                video_id,
+                cancel=cancel_download,
+                progress=download_progress,
+            )
 
+        config = _ClipScoringConfig(
+            clip_length=clip_length,
+            step=step,
+            max_clips=max_clips,
+            min_gap=min_gap,
+        )
+        top_candidates: list[ClipCandidate] | None = None
+        # Only the ``config.pool_size`` best windows are kept; see ``_top_candidates``.
+        pool: list[ClipCandidate] = []
+        try:
+            if manifest.candidates is not None:
+                LOGGER.info("Resuming %s from checkpoint %s", video_id, manifest.path)
+                top_candidates = manifest.candidates
+                for name in ("transcript", "candidates", *(("audio",) if audio else ()), "selection"):
+                    timer.emit(name, "skipped")
+            else:
+                LOGGER.info("Fetching transcript for %s", video_id)
+                with timer.stage("transcript") as details:
+                    transcript_segments = load_transcript()
+                    # Memory-mapped from the cache; unmap it once the run no longer needs the text.
+                    stack.callback(transcript_segments.close)
+                    details["segments"] = len(transcript_segments)
+
+                with timer.stage("candidates") as details:
+                    scored = 0
+                    if transcript_segments or not audio:
+                        pool, scored = _top_candidates(_iter_candidates(transcript_segments, config), config.pool_size)
+                    details["candidates"] = scored
+                for name in ("transcript", "candidates"):
+                    manifest.complete(name)
+                if not audio:
+                    top_candidates = select()
+        except BaseException:
+            if download is not None:
+                cancel_download.set()
+                download.cancel()
+            raise
+
+        if download is None:
+            assert top_candidates is not None
+            if transcript_segments is not None:
+                _materialize_text(transcript_segments, top_candidates)
+                manifest.set_candidates(top_candidates)
+            reuse = verified_clips()
+            LOGGER.info("Downloading %d sections of %s", len(top_candidates) - len(reuse), video_id)
+            with timer.stage("download") as details:
+                details["mode"] = "sections"
+                details["reused"] = len(reuse)
+                details["profile"] = render_profile.name
+                clips = _download_clip_sections(
+                    video_url,
+                    top_candidates,
+                    clips_dir,
+                    clip_rendered,
+                    reuse,
+                    render_profile,
+                )
+            if clips is not None:
+                manifest.complete("download")
+                timer.log(video_id)
+                timer.emit("pipeline", "completed", clips=len(clips))
+                return PipelineResult(
+                    video_id=video_id,
+                    source_video=clips_dir,
+                    clips=clips,
+                    output_dir=clips_dir,
+                    stage_seconds=timer.seconds,
+                )
+
+            LOGGER.info("Downloading YouTube video %s", video_id)
+            stack.enter_context(store.hold(video_id))
+            timer.emit("download", "started", mode="full")
+            download = _stage_pool("download").submit(store.fetch, video_url, video_id, progress=download_progress)
+
+        with timer.stage("download", announce=False):
+            try:
+                source_video = download.result()
+            except DownloadError as exc:
+                raise PipelineError(str(exc)) from exc
+            source_unchanged = manifest.set_source(source_video)
+        manifest.complete("download")
+        if not source_unchanged:
+            LOGGER.warning("Source of %s changed since the checkpoint; rendering all clips again", video_id)
+
+        if top_candidates is None:
+            with timer.stage("audio") as details:
+                try:
+                    envelope = read_envelope(source_video)
+                except AudioEnergyError as exc:
+                    if not pool:
+                        raise PipelineError(str(exc)) from exc
+                    LOGGER.warning("Scoring %s by transcript only: %s", video_id, exc)
+                    details["error"] = str(exc)
+                else:
+                    assert transcript_segments is not None
+                    windows = _iter_audio_scores(
+                        _iter_candidates(transcript_segments, config) if transcript_segments else (),
+                        envelope,
+                        config,
+                        audio_weight(),
+                        transcript_segments.duration,
+                    )
+                    pool, details["candidates"] = _top_candidates(windows, config.pool_size)
+                    details["seconds_decoded"] = envelope.duration
+            manifest.complete("audio")
+            top_candidates = select()
+
+        # The manifest keeps the scored windows; keyframe-aligned copies are only used for rendering.
+        windows = top_candidates
+        if not (smart_cut or render_profile.reencodes):
+            with timer.stage("keyframes") as details:
+                try:
+                    index = load_keyframe_index(source_video)
+                except KeyframeIndexError as exc:
+                    LOGGER.warning("Keeping unaligned clip windows for %s: %s", video_id, exc)
+                else:
+                    # Aligning moves starts back by up to a GOP, so select again on the aligned windows.
+                    top_candidates, windows = _select_aligned(
+                        pool or top_candidates,
+                        index,
+                        max_clips,
+                        min_gap=min_gap,
+                    )
+                    details["selected"] = [[clip.start, clip.end, clip.score] for clip in windows]
+            manifest.complete("keyframes")
+        else:
+            timer.emit("keyframes", "skipped")
+        if transcript_segments is not None:
+            _materialize_text(transcript_segments, top_candidates)
+            for window, candidate in zip(windows, top_candidates):
+                window.text = candidate.text
+        if manifest.candidates != top_candidates:
+            manifest.set_candidates(top_candidates)
+
+        reuse = verified_clips(windows)
+        LOGGER.info("Rendering %d clips for %s", len(windows) - len(reuse), video_id)
+        with timer.stage("render") as details:
+            details["reused"] = len(reuse)
+            details["profile"] = render_profile.name
+            try:
+                clips = render_clips(
+                    source_video,
+                    windows,
+                    clips_dir,
+                    smart_cut=smart_cut,
+                    on_clip=clip_rendered,
+                    reuse=reuse,
+                    profile=render_profile,
+                )
+            except ClipGenerationError as exc:
+                raise PipelineError(str(exc)) from exc
+        manifest.complete("render")
+
+    timer.log(video_id)
+    timer.emit("pipeline", "completed", clips=len(clips))
     return PipelineResult(
         video_id=video_id,
         source_video=source_video,
         clips=clips,
         output_dir=clips_dir,
+        stage_seconds=timer.seconds,
     )
 
 
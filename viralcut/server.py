@@ -0,0 +1,91 @@
+"""Launch the FastAPI app with uvicorn, either for development or in production mode.
+
+``python -m viralcut.server`` (or ``VIRALCUT_SERVER_MODE=production python main.py``)
+serves ``main:app`` from ``VIRALCUT_WEB_WORKERS`` pre-forked worker processes
+without the reloader. The supervisor only imports this module, so it starts
+quickly and every worker imports the application exactly once. Workers share
+``output/`` and coordinate through :mod:`viralcut.locks`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import NoReturn
+
+from .system import available_cores, resolve_listen_port
+
+LOGGER = logging.getLogger(__name__)
+
+DEVELOPMENT = "development"
+PRODUCTION = "production"
+
+APP = "main:app"
+
+
+def server_mode() -> str:
+    """Return ``VIRALCUT_SERVER_MODE``: ``development`` (default) or ``production``."""
+
+    mode = os.environ.get("VIRALCUT_SERVER_MODE", DEVELOPMENT).strip().lower()
+    if mode not in {DEVELOPMENT, PRODUCTION}:
+        LOGGER.warning("Ignoring unknown VIRALCUT_SERVER_MODE=%s; using %s", mode, DEVELOPMENT)
+        return DEVELOPMENT
+    return mode
+
+
+def web_workers() -> int:
+    """Return ``VIRALCUT_WEB_WORKERS``, defaulting to the available cores."""
+
+    raw = os.environ.get("VIRALCUT_WEB_WORKERS")
+    if raw:
+        try:
+            return max(int(raw), 1)
+        except ValueError:
+            LOGGER.warning("Ignoring invalid VIRALCUT_WEB_WORKERS=%s", raw)
+    return available_cores()
+
+
+def run_production(*, host: str = "0.0.0.0", port: int | None = None, workers: int | None = None) -> None:
+    """Serve :data:`APP` from ``workers`` processes until interrupted."""
+
+    workers = workers or web_workers()
+    port = port or resolve_listen_port()
+    if "VIRALCUT_RENDER_CONCURRENCY" not in os.environ:
+        # The ffmpeg budget is per process; split the host's cores between the workers.
+        os.environ["VIRALCUT_RENDER_CONCURRENCY"] = str(max(available_cores() // workers, 1))
+
+    import uvicorn
+
+    LOGGER.info("Starting %d production workers on %s:%d", workers, host, port)
+    uvicorn.run(APP, host=host, port=port, workers=workers, reload=False)
+
+
+def exec_production(app_dir: Path) -> NoReturn:
+    """Replace the current process with the production launcher serving ``app_dir/main.py``.
+
+    Used by ``main.main()`` so that neither the supervisor nor its workers
+    keep a copy of the already imported ``__main__`` module.
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (str(app_dir), env.get("PYTHONPATH"))))
+    os.execve(sys.executable, [sys.executable, "-m", __name__], env)
+
+
+__all__ = [
+    "APP",
+    "DEVELOPMENT",
+    "PRODUCTION",
+    "exec_production",
+    "resolve_listen_port",
+    "run_production",
+    "server_mode",
+    "web_workers",
+]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
+    run_production()
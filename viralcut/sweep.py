@@ -0,0 +1,157 @@
+"""Score several clip configurations over one transcript in a single pass."""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Iterable, Sequence
+
+from .models import ClipCandidate
+from .pipeline import (
+    PipelineError,
+    _build_candidates,
+    _ClipScoringConfig,
+    _extract_video_id,
+    _materialize_text,
+    _select_top_clips,
+    frange,
+)
+from .transcript import TranscriptError, fetch_transcript_table
+from .transcript_table import Transcript, as_table
+
+LOGGER = logging.getLogger(__name__)
+
+# ``(clip_length, step)`` in seconds.
+SweepConfig = tuple[float, float]
+
+
+def sweep_candidates(
+    segments: Transcript,
+    configs: Iterable[SweepConfig],
+) -> dict[SweepConfig, list[ClipCandidate]]:
+    """Score the windows of every ``(clip_length, step)`` config over ``segments``.
+
+    With NumPy installed, per-segment feature counts are turned into prefix
+    sums once (ordered by segment start and by segment end) and the windows
+    of all configs are scored together: the segments overlapping ``[s, e)``
+    are those starting before ``e`` minus those ending at or before ``s``, so
+    each window costs two binary searches. Scores are identical to
+    :func:`viralcut.pipeline._build_candidates`, which is used per config when
+    NumPy is unavailable. The columns of a :class:`TranscriptTable` are read
+    without copying.
+    """
+
+    configs = list(dict.fromkeys(configs))
+    segments = as_table(segments)
+    if not len(segments):
+        raise PipelineError("Transcript returned no textual segments")
+    if not configs:
+        return {}
+
+    try:
+        import numpy as np
+    except ModuleNotFoundError:
+        LOGGER.debug("NumPy unavailable; scoring %d configs one at a time", len(configs))
+        return {
+            config: _build_candidates(segments, _ClipScoringConfig(clip_length=config[0], step=config[1], max_clips=1))
+            for config in configs
+        }
+
+    total_duration = segments.duration
+    if total_duration <= 0:
+        raise PipelineError("Transcript duration is invalid")
+
+    features = np.stack(
+        [
+            np.frombuffer(column, dtype=np.uint32)
+            for column in (segments.words, segments.exclamations, segments.questions, segments.emphasis)
+        ],
+        axis=1,
+    ).astype(np.int64)
+    starts = np.frombuffer(segments.starts, dtype=np.float64)
+    ends = starts + np.frombuffer(segments.durations, dtype=np.float64)
+    start_order = np.argsort(starts, kind="stable")
+    end_order = np.argsort(ends, kind="stable")
+    zero = np.zeros((1, features.shape[1]), dtype=np.int64)
+    started_totals = np.concatenate([zero, np.cumsum(features[start_order], axis=0)])
+    ended_totals = np.concatenate([zero, np.cumsum(features[end_order], axis=0)])
+    sorted_starts = starts[start_order]
+    sorted_ends = ends[end_order]
+
+    window_starts = [
+        np.fromiter(frange(0, max(total_duration - clip_length, 0) + step, step), dtype=np.float64)
+        for clip_length, step in configs
+    ]
+    lengths = np.concatenate(
+        [np.full(len(windows), clip_length) for windows, (clip_length, _) in zip(window_starts, configs)]
+    )
+    window_start = np.concatenate(window_starts)
+    window_end = np.minimum(window_start + lengths, total_duration)
+
+    totals = (
+        started_totals[np.searchsorted(sorted_starts, window_end, side="left")]
+        - ended_totals[np.searchsorted(sorted_ends, window_start, side="right")]
+    )
+    words, exclamations, questions, emphasis = totals.T
+    density = words / np.maximum(window_end - window_start, 1.0)
+    scores = density * 10 + (exclamations * 3 + questions * 2) + emphasis
+    scores[words == 0] = 0.0
+
+    results: dict[SweepConfig, list[ClipCandidate]] = {}
+    offset = 0
+    for config, windows in zip(configs, window_starts):
+        span = slice(offset, offset + len(windows))
+        offset += len(windows)
+        keep = np.flatnonzero(scores[span] > 0) + span.start
+        results[config] = [
+            ClipCandidate(start=start, end=end, text="", score=score)
+            for start, end, score in zip(
+                window_start[keep].tolist(),
+                window_end[keep].tolist(),
+                scores[keep].tolist(),
+            )
+        ]
+    return results
+
+
+def sweep_video_clips(
+    video_url: str,
+    configs: Sequence[SweepConfig],
+    *,
+    max_clips: int = 3,
+    min_gap: float = 0.0,
+) -> tuple[str, dict[SweepConfig, list[ClipCandidate]]]:
+    """Return the video id and the top clips of ``video_url`` for every config.
+
+    The transcript is loaded once and nothing is downloaded or rendered, so
+    editors can compare clip lengths and steps before committing to one. A
+    config whose windows all score zero maps to an empty list.
+    """
+
+    if not configs:
+        raise PipelineError("At least one configuration is required")
+    for clip_length, step in configs:
+        if clip_length <= 0 or math.isinf(clip_length):
+            raise PipelineError("Clip length must be a positive finite value")
+        if step <= 0:
+            raise PipelineError("step must be greater than zero")
+    if max_clips <= 0:
+        raise PipelineError("max_clips must be greater than zero")
+    if min_gap < 0:
+        raise PipelineError("min_gap must not be negative")
+
+    video_id = _extract_video_id(video_url)
+    try:
+        table = fetch_transcript_table(video_id)
+    except TranscriptError as exc:
+        raise PipelineError(str(exc)) from exc
+
+    selections: dict[SweepConfig, list[ClipCandidate]] = {}
+    with table:
+        for config, candidates in sweep_candidates(table, configs).items():
+            selected = _select_top_clips(candidates, max_clips, min_gap=min_gap) if candidates else []
+            selections[config] = _materialize_text(table, selected)
+    return video_id, selections
+
+
+__all__ = ["SweepConfig", "sweep_candidates", "sweep_video_clips"]
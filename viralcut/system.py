@@ -0,0 +1,44 @@
+"""Host facts needed before anything heavy is imported.
+
+Only the standard library is used here, so the production supervisor and
+``main.py`` can size workers and pick a port without importing the pipeline.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+LOGGER = logging.getLogger(__name__)
+
+
+def available_cores() -> int:
+    """Return the number of cores this process may run on."""
+
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux platforms
+        return os.cpu_count() or 1
+
+
+def resolve_listen_port(default: int = 8000) -> int:
+    """Return the port the API should listen on, honoring the ``PORT`` env var."""
+
+    raw_port = os.environ.get("PORT")
+    if raw_port is None:
+        return default
+
+    try:
+        port = int(raw_port)
+    except ValueError:
+        LOGGER.warning("Ignoring invalid PORT=%s; falling back to %s", raw_port, default)
+        return default
+
+    if not (0 < port < 65536):
+        LOGGER.warning("Ignoring out-of-range PORT=%s; falling back to %s", raw_port, default)
+        return default
+
+    return port
+
+
+__all__ = ["available_cores", "resolve_listen_port"]
@@ -2,18 +2,242 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
+from . import metrics
 from .models import TranscriptSegment
+from .transcript_table import TranscriptTable, TranscriptTableError
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGES: tuple[str, ...] = ("pt-BR", "pt", "en")
+
+THROTTLED = metrics.counter(
+    "viralcut_transcript_throttled_total",
+    "Batched transcript requests retried after YouTube throttled them.",
+)
+
+# Errors the YouTube Transcript API raises for a missing transcript and for
+# throttling, matched by name because they moved between library versions.
+_UNAVAILABLE_ERRORS = frozenset({"NoTranscriptFound", "TranscriptsDisabled", "NoTranscriptAvailable"})
+_THROTTLED_ERRORS = frozenset({"TooManyRequests", "RequestBlocked", "IpBlocked"})
+_THROTTLED_STATUSES = frozenset({429, 503})
+
+_BACKOFF_SECONDS = 1.0
+_MAX_BACKOFF_SECONDS = 60.0
+
+_inflight: dict[tuple[str, tuple[str, ...]], "Future[list[TranscriptSegment]]"] = {}
+_inflight_lock = threading.Lock()
 
 
 class TranscriptError(RuntimeError):
     """Raised when a transcript cannot be retrieved for a video."""
 
 
-def fetch_transcript(video_id: str, languages: Sequence[str] | None = None) -> list[TranscriptSegment]:
-    """Retrieve the transcript for ``video_id`` as a list of segments."""
+class TranscriptCache:
+    """On-disk transcript cache with a TTL and least-recently-used eviction.
+
+    Entries are :class:`TranscriptTable` files keyed by the video id and the
+    language preference order, which readers memory-map instead of parsing,
+    so every process using ``directory`` shares one copy of each transcript.
+    A file's modification time records its last use, so the LRU order
+    survives restarts and is shared by every process using ``directory``.
+    Writes go through a temporary file and :func:`os.replace`, which keeps
+    readers from ever seeing a partial entry.
+    """
+
+    def __init__(self, directory: Path, *, ttl: float = 86400.0, max_entries: int = 512) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TranscriptCache":
+        """Build a cache configured through ``VIRALCUT_TRANSCRIPT_CACHE_*`` variables."""
+
+        return cls(
+            Path(os.environ.get("VIRALCUT_TRANSCRIPT_CACHE_DIR", "output/.cache/transcripts")),
+            ttl=float(os.environ.get("VIRALCUT_TRANSCRIPT_CACHE_TTL", "86400")),
+            max_entries=int(os.environ.get("VIRALCUT_TRANSCRIPT_CACHE_MAX_ENTRIES", "512")),
+        )
+
+    def _path_for(self, video_id: str, languages: Sequence[str]) -> Path:
+        key = json.dumps([video_id, list(languages)]).encode("utf-8")
+        return self.directory / f"{hashlib.sha256(key).hexdigest()}.table"
+
+    def get_table(self, video_id: str, languages: Sequence[str]) -> TranscriptTable | None:
+        """Return the cached transcript memory-mapped, or ``None`` when missing or expired."""
+
+        path = self._path_for(video_id, languages)
+        with self._lock:
+            try:
+                table = TranscriptTable.open(path)
+            except (OSError, TranscriptTableError):
+                self.misses += 1
+                return None
+
+            if time.time() - table.created_at > self.ttl:
+                table.close()
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+
+            try:
+                os.utime(path)
+            except OSError:  # pragma: no cover - evicted by another process
+                pass
+            self.hits += 1
+        return table
+
+    def get(self, video_id: str, languages: Sequence[str]) -> list[TranscriptSegment] | None:
+        """Return the cached transcript as segments, or ``None`` when missing or expired."""
+
+        table = self.get_table(video_id, languages)
+        if table is None:
+            return None
+        try:
+            return table.to_segments()
+        finally:
+            table.close()
+
+    def put(
+        self,
+        video_id: str,
+        languages: Sequence[str],
+        segments: list[TranscriptSegment] | TranscriptTable,
+    ) -> Path:
+        """Store ``segments``, evict the least recently used entries over the limit and return the entry's path."""
+
+        table = segments if isinstance(segments, TranscriptTable) else TranscriptTable.from_segments(segments)
+        path = self._path_for(video_id, languages)
+        with self._lock:
+            table.write(path)
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        entries: list[tuple[float, Path]] = []
+        for entry in self.directory.iterdir():
+            # ``.json`` entries were written by earlier versions and are no longer read.
+            if entry.suffix not in {".table", ".json"}:
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except OSError:  # pragma: no cover - removed concurrently
+                continue
+
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+
+        entries.sort()
+        for _, entry in entries[:excess]:
+            entry.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit and miss counters collected so far."""
 
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: TranscriptCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Return the process-wide transcript cache, creating it on first use."""
+
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptCache.from_env()
+        return _cache
+
+
+metrics.register_cache("transcript", lambda: get_transcript_cache().stats())
+
+
+def fetch_transcript(
+    video_id: str,
+    languages: Sequence[str] | None = None,
+    *,
+    use_cache: bool = True,
+) -> list[TranscriptSegment]:
+    """Retrieve the transcript for ``video_id`` as a list of segments.
+
+    Results are served from :func:`get_transcript_cache` when ``use_cache`` is
+    set, so repeated requests for the same video skip the network round trip.
+    """
+
+    table = fetch_transcript_table(video_id, languages, use_cache=use_cache)
+    try:
+        return table.to_segments()
+    finally:
+        table.close()
+
+
+def fetch_transcript_table(
+    video_id: str,
+    languages: Sequence[str] | None = None,
+    *,
+    use_cache: bool = True,
+) -> TranscriptTable:
+    """Retrieve the transcript for ``video_id`` as a :class:`TranscriptTable`.
+
+    With ``use_cache`` the table is memory-mapped from its
+    :func:`get_transcript_cache` entry, fetching and storing it first when
+    missing, so concurrent pipelines and worker processes share one copy.
+    """
+
+    language_preferences = tuple(languages or DEFAULT_LANGUAGES)
+
+    cache = get_transcript_cache() if use_cache else None
+    if cache is None:
+        return TranscriptTable.from_segments(_request_transcript(video_id, language_preferences))
+
+    cached = cache.get_table(video_id, language_preferences)
+    if cached is not None:
+        LOGGER.debug("Transcript cache hit for %s", video_id)
+        return cached
+
+    segments: list[TranscriptSegment] | None = None
+    with _inflight_lock:
+        prefetch = _inflight.get((video_id, language_preferences))
+    if prefetch is not None:
+        LOGGER.debug("Waiting for the prefetch of %s", video_id)
+        try:
+            segments = prefetch.result()
+        except CancelledError:
+            pass
+    if segments is None:
+        segments = _request_transcript(video_id, language_preferences)
+        path = _store(cache, video_id, language_preferences, segments)
+    else:
+        path = cache._path_for(video_id, language_preferences)
+
+    if path is not None:
+        try:
+            return TranscriptTable.open(path)
+        except (OSError, TranscriptTableError):  # pragma: no cover - evicted or replaced concurrently
+            pass
+    return TranscriptTable.from_segments(segments)
+
+
+def _request_transcript(video_id: str, languages: tuple[str, ...]) -> list[TranscriptSegment]:
     try:
         from youtube_transcript_api import (  # type: ignore[import]
             NoTranscriptFound,
@@ -26,22 +250,234 @@ def fetch_transcript(video_id: str, languages: Sequence[str] | None = None) -> l
             " Install it with 'pip install youtube-transcript-api'."
         ) from exc
 
-    language_preferences: Iterable[str] = languages or (
-        "pt-BR",
-        "pt",
-        "en",
-    )
-
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=list(language_preferences))
+        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
     except (NoTranscriptFound, TranscriptsDisabled) as exc:  # pragma: no cover - passthrough
         raise TranscriptError("Transcript not available for this video") from exc
+    return _to_segments(transcript)
 
+
+def _to_segments(entries: Iterable[dict[str, Any]]) -> list[TranscriptSegment]:
     return [
         TranscriptSegment(start=entry["start"], duration=entry["duration"], text=entry["text"].strip())
-        for entry in transcript
+        for entry in entries
         if entry.get("text")
     ]
 
 
-__all__ = ["TranscriptError", "fetch_transcript"]
+def _store(
+    cache: TranscriptCache,
+    video_id: str,
+    languages: tuple[str, ...],
+    segments: list[TranscriptSegment],
+) -> Path | None:
+    try:
+        return cache.put(video_id, languages, segments)
+    except OSError as exc:  # pragma: no cover - cache is best effort
+        LOGGER.warning("Unable to cache transcript for %s: %s", video_id, exc)
+        return None
+
+
+def batch_concurrency() -> int:
+    """Return ``VIRALCUT_TRANSCRIPT_BATCH_CONCURRENCY``, the requests in flight per batch (default ``8``)."""
+
+    return max(int(os.environ.get("VIRALCUT_TRANSCRIPT_BATCH_CONCURRENCY", "8")), 1)
+
+
+def batch_retries() -> int:
+    """Return ``VIRALCUT_TRANSCRIPT_RETRIES``, the retries of a throttled request (default ``4``)."""
+
+    return max(int(os.environ.get("VIRALCUT_TRANSCRIPT_RETRIES", "4")), 0)
+
+
+class _Throttle:
+    """Exponential backoff shared by every request of one batch.
+
+    Once any request is throttled, all of them pause until the backoff has
+    elapsed instead of hammering YouTube in parallel.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def back_off(self, attempt: int) -> float:
+        delay = min(_BACKOFF_SECONDS * 2**attempt, _MAX_BACKOFF_SECONDS) * random.uniform(1.0, 1.25)
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return delay
+
+
+def _is_throttled(exc: BaseException) -> bool:
+    seen: set[int] = set()
+    current: BaseException | None = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if type(current).__name__ in _THROTTLED_ERRORS:
+            return True
+        response = getattr(current, "response", None)
+        if getattr(response, "status_code", None) in _THROTTLED_STATUSES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def _pooled_session(size: int) -> Any:
+    """Return a ``requests`` session keeping up to ``size`` connections alive per host."""
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _session_client(session: Any) -> Callable[[str, list[str]], list[dict[str, Any]]]:
+    """Return a function fetching raw transcript entries through ``session``."""
+
+    from youtube_transcript_api import YouTubeTranscriptApi  # type: ignore[import]
+
+    try:
+        api = YouTubeTranscriptApi(http_client=session)
+    except TypeError:
+        # youtube-transcript-api < 1.0 has no instances; its list fetcher accepts a session.
+        from youtube_transcript_api._transcripts import TranscriptListFetcher  # type: ignore[import]
+
+        fetcher = TranscriptListFetcher(session)
+        return lambda video_id, languages: fetcher.fetch(video_id).find_transcript(languages).fetch()
+    return lambda video_id, languages: api.fetch(video_id, languages=languages).to_raw_data()
+
+
+def fetch_transcripts(
+    video_ids: Iterable[str],
+    languages: Sequence[str] | None = None,
+    *,
+    concurrency: int | None = None,
+    retries: int | None = None,
+    use_cache: bool = True,
+) -> Iterator[tuple[str, list[TranscriptSegment] | TranscriptError]]:
+    """Fetch the transcripts of many videos concurrently, yielding each one as it completes.
+
+    All requests share one connection-pooled HTTP session, and at most
+    ``concurrency`` of them (``VIRALCUT_TRANSCRIPT_BATCH_CONCURRENCY``) are in
+    flight. ``video_ids`` is consumed lazily, only as fast as slots free up.
+    A throttled request makes every request of the batch pause with an
+    exponential, jittered backoff. It is retried up to ``retries`` times
+    (``VIRALCUT_TRANSCRIPT_RETRIES``).
+
+    Yields ``(video_id, segments)`` pairs in completion order; cached
+    transcripts come back at once. A video that cannot be fetched yields its
+    :class:`TranscriptError` instead of stopping the batch. While a fetch is
+    in flight, :func:`fetch_transcript` calls for the same video wait for it
+    instead of issuing their own request.
+
+    Raises
+    ------
+    TranscriptError
+        When the YouTube Transcript API (and ``requests``) are not installed.
+    """
+
+    language_preferences = tuple(languages or DEFAULT_LANGUAGES)
+    concurrency = concurrency or batch_concurrency()
+    retries = batch_retries() if retries is None else retries
+    cache = get_transcript_cache() if use_cache else None
+
+    try:
+        session = _pooled_session(concurrency)
+        client = _session_client(session)
+    except ModuleNotFoundError as exc:  # pragma: no cover - environment guard
+        raise TranscriptError(
+            "The 'youtube-transcript-api' package is required to fetch transcripts."
+            " Install it with 'pip install youtube-transcript-api'."
+        ) from exc
+    throttle = _Throttle()
+
+    def fetch(video_id: str) -> list[TranscriptSegment]:
+        attempt = 0
+        while True:
+            throttle.wait()
+            try:
+                entries = client(video_id, list(language_preferences))
+                break
+            except Exception as exc:
+                if not _is_throttled(exc):
+                    if type(exc).__name__ in _UNAVAILABLE_ERRORS:
+                        raise TranscriptError("Transcript not available for this video") from exc
+                    raise TranscriptError(f"Unable to fetch the transcript of {video_id}: {exc}") from exc
+                if attempt >= retries:
+                    raise TranscriptError(f"YouTube kept throttling the transcript of {video_id}") from exc
+                THROTTLED.inc()
+                delay = throttle.back_off(attempt)
+                LOGGER.info("Transcript of %s throttled; retrying in %.1fs", video_id, delay)
+                attempt += 1
+
+        segments = _to_segments(entries)
+        if cache is not None:
+            _store(cache, video_id, language_preferences, segments)
+        return segments
+
+    def forget(key: tuple[str, tuple[str, ...]], future: Future) -> None:
+        with _inflight_lock:
+            if _inflight.get(key) is future:
+                del _inflight[key]
+
+    pending: dict[Future[list[TranscriptSegment]], str] = {}
+    remaining = iter(video_ids)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="viralcut-transcripts")
+    try:
+        while True:
+            while len(pending) < concurrency:
+                video_id = next(remaining, None)
+                if video_id is None:
+                    break
+                cached = cache.get(video_id, language_preferences) if cache is not None else None
+                if cached is not None:
+                    yield video_id, cached
+                    continue
+                future = executor.submit(fetch, video_id)
+                pending[future] = video_id
+                if cache is not None:
+                    key = (video_id, language_preferences)
+                    with _inflight_lock:
+                        _inflight.setdefault(key, future)
+                    future.add_done_callback(lambda done, key=key: forget(key, done))
+            if not pending:
+                return
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                video_id = pending.pop(future)
+                outcome: list[TranscriptSegment] | TranscriptError
+                try:
+                    outcome = future.result()
+                except TranscriptError as exc:
+                    outcome = exc
+                yield video_id, outcome
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        session.close()
+
+
+__all__ = [
+    "TranscriptCache",
+    "TranscriptError",
+    "batch_concurrency",
+    "batch_retries",
+    "fetch_transcript",
+    "fetch_transcript_table",
+    "fetch_transcripts",
+    "get_transcript_cache",
+]
@@ -0,0 +1,239 @@
+"""Column-oriented transcripts with a compact, memory-mappable on-disk format."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, Union
+
+from .models import TranscriptSegment
+
+# File layout (little-endian): the header below, then the columns in
+# ``_COLUMNS`` order, each padded to 8 bytes, then the UTF-8 text buffer.
+_MAGIC = b"VCTT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQQdd")  # magic, version, segments, text bytes, created_at, duration
+_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("starts", "d"),
+    ("durations", "d"),
+    ("offsets", "Q"),
+    ("words", "I"),
+    ("exclamations", "I"),
+    ("questions", "I"),
+    ("emphasis", "I"),
+)
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class TranscriptTableError(RuntimeError):
+    """Raised when a transcript table file is truncated, corrupt or of another version."""
+
+
+def _text_features(text: str) -> tuple[int, int, int, int]:
+    """Return ``(words, exclamations, questions, emphasis)`` counts for ``text``."""
+
+    tokens = text.split()
+    emphasis = sum(1 for token in tokens if token.isupper() and len(token) > 1)
+    return len(tokens), text.count("!"), text.count("?"), emphasis
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+@dataclass(slots=True, eq=False)
+class TranscriptTable:
+    """A transcript stored as parallel typed columns instead of one object per segment.
+
+    ``starts`` and ``durations`` hold seconds as doubles; segment ``i``'s text
+    is ``text_buffer[offsets[i]:offsets[i + 1]]`` in UTF-8. The scoring
+    features of :func:`_text_features` are counted once, up front, into the
+    ``words``, ``exclamations``, ``questions`` and ``emphasis`` columns.
+    Columns are :class:`array.array` objects for tables built in memory and
+    read-only :class:`memoryview` casts over a shared :mod:`mmap` for tables
+    opened with :meth:`open`, so every worker reading the same file shares
+    one copy in the page cache. Used as a context manager, the table is
+    closed on exit.
+    """
+
+    starts: Sequence[float]
+    durations: Sequence[float]
+    offsets: Sequence[int]
+    words: Sequence[int]
+    exclamations: Sequence[int]
+    questions: Sequence[int]
+    emphasis: Sequence[int]
+    text_buffer: bytes | memoryview
+    duration: float
+    created_at: float = field(default_factory=time.time)
+    _mapping: mmap.mmap | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[TranscriptSegment]) -> "TranscriptTable":
+        """Build an in-memory table holding ``segments`` in their given order."""
+
+        starts, durations = array("d"), array("d")
+        offsets = array("Q", [0])
+        counts = [array("I") for _ in range(4)]
+        text = bytearray()
+        duration = 0.0
+        for segment in segments:
+            starts.append(segment.start)
+            durations.append(segment.duration)
+            text += segment.text.encode("utf-8")
+            offsets.append(len(text))
+            for column, value in zip(counts, _text_features(segment.text)):
+                column.append(value)
+            duration = max(duration, segment.end)
+        words, exclamations, questions, emphasis = counts
+        return cls(starts, durations, offsets, words, exclamations, questions, emphasis, bytes(text), duration)
+
+    @classmethod
+    def open(cls, path: Path) -> "TranscriptTable":
+        """Memory-map the table file at ``path`` written by :meth:`write`.
+
+        Raises
+        ------
+        TranscriptTableError
+            When the file is not a complete table of this version.
+        """
+
+        with open(path, "rb") as handle:
+            try:
+                mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # empty file
+                raise TranscriptTableError(f"{path} is empty") from exc
+        try:
+            return cls._from_buffer(mapping, path)
+        except BaseException:
+            mapping.close()
+            raise
+
+    @classmethod
+    def _from_buffer(cls, mapping: mmap.mmap, path: Path) -> "TranscriptTable":
+        if len(mapping) < _HEADER.size:
+            raise TranscriptTableError(f"{path} is truncated")
+        magic, version, count, text_bytes, created_at, duration = _HEADER.unpack_from(mapping)
+        if magic != _MAGIC or version != _VERSION:
+            raise TranscriptTableError(f"{path} is not a version {_VERSION} transcript table")
+
+        # Validate the layout before exporting any buffer, so a bad file leaves the mapping closable.
+        layout: list[tuple[str, str, int, int]] = []
+        position = _HEADER.size
+        for name, typecode in _COLUMNS:
+            size = (count + 1 if name == "offsets" else count) * array(typecode).itemsize
+            layout.append((name, typecode, position, size))
+            if name == "offsets":
+                last_offset = position + count * 8
+            position += _padded(size)
+        if position + text_bytes != len(mapping) or struct.unpack_from("<Q", mapping, last_offset)[0] != text_bytes:
+            raise TranscriptTableError(f"{path} is truncated or corrupt")
+
+        view = memoryview(mapping)
+        columns: dict[str, Sequence[float] | Sequence[int]] = {}
+        for name, typecode, start, size in layout:
+            if _LITTLE_ENDIAN:
+                columns[name] = view[start : start + size].cast(typecode)
+            else:  # pragma: no cover - big-endian hosts read a converted copy
+                column = array(typecode, view[start : start + size].tobytes())
+                column.byteswap()
+                columns[name] = column
+
+        return cls(
+            text_buffer=view[position : position + text_bytes],
+            duration=duration,
+            created_at=created_at,
+            _mapping=mapping,
+            **columns,  # type: ignore[arg-type]
+        )
+
+    def write(self, path: Path) -> None:
+        """Write the table to ``path`` atomically, through a temporary file and :func:`os.replace`."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as handle:
+            try:
+                handle.write(
+                    _HEADER.pack(_MAGIC, _VERSION, len(self), len(self.text_buffer), self.created_at, self.duration)
+                )
+                for name, typecode in _COLUMNS:
+                    column = getattr(self, name)
+                    if _LITTLE_ENDIAN:
+                        data = column.tobytes()
+                    else:  # pragma: no cover - big-endian hosts
+                        swapped = array(typecode, column)
+                        swapped.byteswap()
+                        data = swapped.tobytes()
+                    handle.write(data)
+                    handle.write(b"\0" * (_padded(len(data)) - len(data)))
+                handle.write(self.text_buffer)
+            except BaseException:
+                handle.close()
+                os.unlink(handle.name)
+                raise
+        os.replace(handle.name, path)
+
+    def close(self) -> None:
+        """Release the memory map of a table returned by :meth:`open`; the table is unusable afterwards."""
+
+        mapping, self._mapping = self._mapping, None
+        if mapping is None:
+            return
+        for name, _ in _COLUMNS:
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+        if isinstance(self.text_buffer, memoryview):
+            self.text_buffer.release()
+        mapping.close()
+
+    def __enter__(self) -> "TranscriptTable":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> TranscriptSegment:
+        return TranscriptSegment(start=self.starts[index], duration=self.durations[index], text=self.text(index))
+
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        return (self[index] for index in range(len(self)))
+
+    def end(self, index: int) -> float:
+        """Return the end timestamp of segment ``index``."""
+
+        return self.starts[index] + self.durations[index]
+
+    def text(self, index: int) -> str:
+        """Decode the text of segment ``index``."""
+
+        return bytes(self.text_buffer[self.offsets[index] : self.offsets[index + 1]]).decode("utf-8")
+
+    def to_segments(self) -> list[TranscriptSegment]:
+        """Return the table as :class:`TranscriptSegment` objects."""
+
+        return list(self)
+
+
+Transcript = Union[TranscriptTable, Sequence[TranscriptSegment]]
+
+
+def as_table(transcript: Transcript) -> TranscriptTable:
+    """Return ``transcript`` as a :class:`TranscriptTable`, converting segment lists."""
+
+    if isinstance(transcript, TranscriptTable):
+        return transcript
+    return TranscriptTable.from_segments(transcript)
+
+
+__all__ = ["Transcript", "TranscriptTable", "TranscriptTableError", "as_table"]